@@ -0,0 +1,102 @@
+"""Throughput and latency of the inference backends at 1, 1k and 1M rows.
+
+Compares ``keras.Model.predict`` on the notebook's ``model.h5`` (when
+TensorFlow is installed), the NumPy engine and onnxruntime. Keras is fed
+pre-standardized rows, since its graph has no scaler; the other two take
+raw clinical values. Each cell is the median of ``--repeat`` timed calls
+after one warm-up call::
+
+    python benchmarks/backends.py --onnx-threads 4
+    python benchmarks/backends.py --sizes 1 1000 --json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from heart_failure.bundle import get_bundle  # noqa: E402
+from heart_failure.model import DATASET_PATH, FEATURE_COLUMNS, MODEL_PATH  # noqa: E402
+
+DEFAULT_SIZES = (1, 1000, 1_000_000)
+
+
+def sample_rows(n_rows, seed=0):
+    """``n_rows`` patients resampled from the bundled dataset."""
+    import pandas as pd
+
+    raw = pd.read_csv(DATASET_PATH)[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+    return raw[np.random.default_rng(seed).integers(0, len(raw), n_rows)]
+
+
+def time_calls(fn, X, repeat):
+    fn(X)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def backends(onnx_threads=None):
+    """``{name: (predict_fn, takes_raw_features)}`` for every installed backend."""
+    bundle = get_bundle()
+    found = {}
+    if importlib.util.find_spec('tensorflow') is not None:
+        from tensorflow import keras
+
+        model = keras.models.load_model(MODEL_PATH, compile=False)
+        found['keras'] = (lambda X: model.predict(X, batch_size=min(len(X), 65536), verbose=0), False)
+    found['numpy'] = (bundle.backend_model('numpy').predict_proba, True)
+    if importlib.util.find_spec('onnxruntime') is not None:
+        found['onnx'] = (bundle.backend_model('onnx', onnx_threads).predict_proba, True)
+    return found
+
+
+def run(sizes=DEFAULT_SIZES, onnx_threads=None, seed=0):
+    bundle = get_bundle()
+    engines = backends(onnx_threads)
+    results = []
+    for n_rows in sizes:
+        raw = sample_rows(n_rows, seed)
+        standardized = bundle.standardize(raw).astype(np.float32)
+        # Aim for about a second per cell, bounded either way
+        repeat = 3 if n_rows >= 100_000 else 20 if n_rows >= 1000 else 200
+        for name, (predict, takes_raw) in engines.items():
+            seconds = time_calls(predict, raw if takes_raw else standardized, repeat)
+            results.append({
+                'backend': name,
+                'rows': n_rows,
+                'latency_ms': seconds * 1000,
+                'rows_per_second': n_rows / seconds,
+            })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare Keras, NumPy and onnxruntime inference")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--onnx-threads', type=int, help="onnxruntime intra-op threads (default: all cores)")
+    parser.add_argument('--json', action='store_true', help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.onnx_threads)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'backend':<8}{'rows':>10}{'latency ms':>14}{'rows/s':>16}")
+    for r in results:
+        print(f"{r['backend']:<8}{r['rows']:>10,}{r['latency_ms']:>14.3f}{r['rows_per_second']:>16,.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
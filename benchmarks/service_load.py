@@ -0,0 +1,166 @@
+"""Load generator for the micro-batching prediction service.
+
+Starts ``python -m heart_failure.service`` in a subprocess (or targets a
+running one with ``--port``), then keeps ``--concurrency`` keep-alive
+connections busy sending single-patient requests drawn from the bundled
+dataset. Reports client-side p50/p99 latency, throughput and the server's
+mean batch size::
+
+    python benchmarks/service_load.py --requests 20000 --concurrency 64
+    python benchmarks/service_load.py --max-batch-size 1   # no batching, for comparison
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from heart_failure.model import DATASET_PATH, FEATURE_COLUMNS  # noqa: E402
+from heart_failure.service import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS  # noqa: E402
+
+
+def _request(method, path, body=b''):
+    return (f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+async def _read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _get(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(_request('GET', path))
+    status, body = await _read_response(reader)
+    writer.close()
+    return status, json.loads(body)
+
+
+async def _client(host, port, bodies, counter, total, latencies, failures):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] < total:
+            i = counter[0]
+            counter[0] += 1
+            start = time.perf_counter()
+            writer.write(_request('POST', '/predict', bodies[i % len(bodies)]))
+            status, _ = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            failures[0] += status != 200
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, n_requests, concurrency):
+    import pandas as pd
+
+    records = pd.read_csv(DATASET_PATH)[FEATURE_COLUMNS].to_dict('records')
+    bodies = [json.dumps(record).encode() for record in records]
+    latencies, counter, failures = [], [0], [0]
+
+    await _get(host, port, '/health')
+    _, before = await _get(host, port, '/stats')
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, bodies, counter, n_requests, latencies, failures) for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    _, after = await _get(host, port, '/stats')
+
+    latencies = np.array(latencies) * 1000
+    batches = after['batches'] - before['batches']
+    return {
+        'requests': len(latencies),
+        'failures': failures[0],
+        'concurrency': concurrency,
+        'elapsed_seconds': elapsed,
+        'throughput_rps': len(latencies) / elapsed,
+        'latency_ms': {
+            'p50': float(np.percentile(latencies, 50)),
+            'p99': float(np.percentile(latencies, 99)),
+            'max': float(latencies.max()),
+        },
+        'batches': batches,
+        'mean_batch_rows': (after['rows'] - before['rows']) / max(batches, 1),
+        'max_batch_size': after['max_batch_size'],
+        'max_wait_ms': after['max_wait_ms'],
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"service did not start on {host}:{port}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="Use a running service instead of starting one")
+    parser.add_argument('--requests', type=int, default=10_000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    port = args.port
+    if port is None:
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'heart_failure.service', '--host', args.host, '--port', str(port),
+             '--max-batch-size', str(args.max_batch_size), '--max-wait-ms', str(args.max_wait_ms)],
+            cwd=ROOT_DIR, stdout=subprocess.DEVNULL,
+        )
+    try:
+        _wait_until_up(args.host, port)
+        report = asyncio.run(run_load(args.host, port, args.requests, args.concurrency))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        latency = report['latency_ms']
+        print(f"{report['requests']:,} requests ({report['failures']} failed), "
+              f"concurrency {report['concurrency']}: {report['throughput_rps']:,.0f} req/s")
+        print(f"latency p50 {latency['p50']:.2f} ms, p99 {latency['p99']:.2f} ms, max {latency['max']:.2f} ms")
+        print(f"{report['batches']:,} inference calls, {report['mean_batch_rows']:.1f} rows each "
+              f"(max batch {report['max_batch_size']}, max wait {report['max_wait_ms']} ms)")
+    return 1 if report['failures'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
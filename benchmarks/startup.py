@@ -0,0 +1,101 @@
+"""Cold-start budget check for the Streamlit app.
+
+Every sidebar page is measured in fresh interpreters:
+
+* import: ``import heart_failure.pages.<page>`` after Streamlit itself is
+  loaded, i.e. what selecting the page adds to the first script run;
+* render: one full script run of ``heart_failure_app.py?page=<slug>``
+  through Streamlit's headless AppTest harness.
+
+Exits with status 1 when any page exceeds its budget::
+
+    python benchmarks/startup.py --import-budget-ms 1500 --render-budget-ms 4000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT_DIR, 'heart_failure_app.py')
+sys.path.insert(0, ROOT_DIR)
+
+from heart_failure.pages import PAGES  # noqa: E402
+
+_IMPORT_PROBE = """
+import importlib, json, time
+import streamlit
+start = time.perf_counter()
+importlib.import_module('heart_failure.pages.{module}')
+print(json.dumps(time.perf_counter() - start))
+"""
+
+_RENDER_PROBE = """
+import json, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.query_params['page'] = {slug!r}
+start = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - start
+assert not at.exception, [e.value for e in at.exception]
+print(json.dumps(elapsed))
+"""
+
+
+def _probe(code):
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1]) * 1000
+
+
+def measure(repeat=1):
+    """Best-of-``repeat`` cold import and first-render milliseconds per page."""
+    results = {}
+    for label, (slug, module) in PAGES.items():
+        results[slug] = {
+            'label': label,
+            'import_ms': min(_probe(_IMPORT_PROBE.format(module=module)) for _ in range(repeat)),
+            'render_ms': min(_probe(_RENDER_PROBE.format(app=APP_PATH, slug=slug)) for _ in range(repeat)),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure per-page cold import and first-render time")
+    parser.add_argument('--import-budget-ms', type=float, default=1500)
+    parser.add_argument('--render-budget-ms', type=float, default=4000)
+    parser.add_argument('--repeat', type=int, default=1, help="Fresh-process runs per measurement")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = measure(args.repeat)
+    failed = False
+    print(f"{'page':<16}{'import ms':>12}{'render ms':>12}")
+    for slug, row in results.items():
+        over = []
+        if row['import_ms'] > args.import_budget_ms:
+            over.append('import')
+        if row['render_ms'] > args.render_budget_ms:
+            over.append('render')
+        failed = failed or bool(over)
+        flag = f"  OVER BUDGET ({', '.join(over)})" if over else ''
+        print(f"{slug:<16}{row['import_ms']:>12.1f}{row['render_ms']:>12.1f}{flag}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'budgets': {'import_ms': args.import_budget_ms, 'render_ms': args.render_budget_ms},
+                'pages': results,
+            }, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
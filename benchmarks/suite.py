@@ -0,0 +1,416 @@
+"""Reproducible benchmark suite with a stored baseline.
+
+Covers the paths users wait on:
+
+* ingestion: ``read_patient_csv`` and Parquet ``read_table``;
+* scoring as the "Make Prediction" page does it: one patient through
+  ``assess_patient`` (and a memo-cache hit), and a batch through
+  ``stream_score`` at 1, 10k, 1M and 10M rows, and with per-row
+  attributions (``Top_Drivers``) at 10k and 1M;
+* similar-patient lookups in a saved neighbor index of 10k and 1M records;
+* the Data Analysis statistics (``corr``, ``describe``, per-class stats);
+* construction of every Data Analysis and prediction figure;
+* app cold start (fresh interpreter, first script run of the home page).
+
+Each case runs in its own interpreter so its peak RSS is not inflated by
+earlier cases; setup (loading the input) is outside the timed region.
+Inputs are synthetic populations (:mod:`heart_failure.synthetic`) with a
+fixed seed, kept in ``--data-dir`` between runs. Results go to JSON and
+are compared with ``benchmarks/baseline.json``; exits with status 1 when
+any case got slower or bigger than ``--tolerance``::
+
+    python benchmarks/suite.py --max-rows 1000000
+    python benchmarks/suite.py --cases score_batch --json results.json
+    python benchmarks/suite.py --save-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'heart_failure_bench')
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+DEFAULT_TOLERANCE = 0.25
+# Timing changes smaller than this are scheduler noise, whatever their ratio
+MIN_DELTA_SECONDS = 0.005
+
+
+# ======================== INPUT FILES ========================
+
+def dataset_file(data_dir, n_rows, fmt, seed=0):
+    """Path of an ``n_rows`` synthetic population in CSV or Parquet, generated once."""
+    from heart_failure.synthetic import write_population
+
+    path = os.path.join(data_dir, f"synthetic_{n_rows}_{seed}.{fmt}")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        partial = f"{path}.partial.{fmt}"
+        write_population(partial, n_rows, seed)
+        os.replace(partial, path)
+    return path
+
+
+# ======================== CASES ========================
+# Each case does its setup and returns (timed_fn, size, unit).
+
+def ingest_csv(data_dir, n_rows):
+    from heart_failure.schema import read_patient_csv
+
+    path = dataset_file(data_dir, n_rows, 'csv')
+    return (lambda: read_patient_csv(path)), n_rows, 'rows'
+
+
+def ingest_parquet(data_dir, n_rows):
+    from heart_failure.columnar import read_table
+
+    path = dataset_file(data_dir, n_rows, 'parquet')
+    return (lambda: read_table(path, 'parquet')), n_rows, 'rows'
+
+
+def _patients(n):
+    import pandas as pd
+
+    from heart_failure.model import DATASET_PATH, FEATURE_COLUMNS
+
+    return pd.read_csv(DATASET_PATH, nrows=n)[FEATURE_COLUMNS].to_dict('records')
+
+
+def score_single(data_dir, n_rows):
+    from heart_failure.assessment import assess_patient
+    from heart_failure.bundle import get_bundle
+
+    bundle = get_bundle()
+    model, explainer = bundle.model, bundle.explainer()
+    patients = _patients(n_rows)
+
+    def run():
+        for patient in patients:
+            assess_patient(model, patient, explainer)
+    return run, n_rows, 'patients'
+
+
+def score_single_cached(data_dir, n_rows):
+    from heart_failure.assessment import PredictionCache
+    from heart_failure.bundle import get_bundle
+
+    bundle = get_bundle()
+    model, explainer = bundle.model, bundle.explainer()
+    patients = _patients(n_rows)
+    cache = PredictionCache()
+    for patient in patients:
+        cache.assess(model, 'bench', patient, explainer)
+
+    def run():
+        for patient in patients:
+            cache.assess(model, 'bench', patient, explainer)
+    return run, n_rows, 'patients'
+
+
+def score_batch(data_dir, n_rows):
+    from heart_failure.batch import stream_score
+    from heart_failure.bundle import get_bundle
+
+    model = get_bundle().model
+    path = dataset_file(data_dir, n_rows, 'csv')
+    output = os.path.join(data_dir, f"scored_{n_rows}.csv")
+    return (lambda: stream_score(path, output, model)), n_rows, 'rows'
+
+
+def score_batch_explained(data_dir, n_rows):
+    from heart_failure.batch import stream_score
+    from heart_failure.bundle import get_bundle
+
+    bundle = get_bundle()
+    path = dataset_file(data_dir, n_rows, 'csv')
+    output = os.path.join(data_dir, f"explained_{n_rows}.csv")
+    return (lambda: stream_score(path, output, bundle.model, explainer=bundle.explainer())), n_rows, 'rows'
+
+
+def similar_patients(data_dir, n_rows):
+    """5-NN lookups of the dataset's patients in a saved index over ``n_rows`` records."""
+    from heart_failure.bundle import get_bundle
+    from heart_failure.neighbors import build_index, load_index, save_index
+
+    directory = os.path.join(data_dir, f"neighbor_index_{n_rows}")
+    if not os.path.exists(directory):
+        bundle = get_bundle()
+        save_index(build_index(dataset_file(data_dir, n_rows, 'parquet'),
+                               (bundle.scaler_mean, bundle.scaler_scale)), directory)
+    index = load_index(directory)
+    patients = _patients(None)
+
+    def run():
+        for patient in patients:
+            index.query(patient)
+    return run, len(patients), 'queries'
+
+
+def _analysis(data_dir, n_rows):
+    from heart_failure.columnar import read_table
+
+    return read_table(dataset_file(data_dir, n_rows, 'parquet'), 'parquet')
+
+
+def analysis_stats(data_dir, n_rows):
+    from heart_failure.analytics import DatasetAnalysis
+
+    frame = _analysis(data_dir, n_rows)
+
+    def run():
+        analysis = DatasetAnalysis(frame)
+        for column in analysis.numeric_columns:
+            analysis.distribution(column)
+    return run, n_rows, 'rows'
+
+
+def figures(data_dir, n_rows):
+    """Every Data Analysis figure for one upload (aggregate path) plus the breakdown chart."""
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    from heart_failure.analytics import DatasetAnalysis
+    from heart_failure.assessment import breakdown_figure
+    from heart_failure.figures import box_by_class, count_bar, histogram_with_box
+
+    analysis = DatasetAnalysis(_analysis(data_dir, n_rows))
+    distributions = {column: analysis.distribution(column) for column in analysis.numeric_columns}
+    n_figures = 3 + 2 * len(distributions)
+
+    def run():
+        count_bar(analysis.class_counts, title="Death Event Distribution", x_title='Death Event')
+        for column, distribution in distributions.items():
+            counts, edges = distribution['histogram']
+            histogram_with_box(counts, edges, distribution['box'], title=f"{column} Distribution")
+            box_by_class(distribution['box_by_class'], column, x_title='Death Event')
+        px.imshow(analysis.corr, text_auto='.2f', aspect="auto", color_continuous_scale='RdBu_r')
+        target_corr = analysis.target_corr
+        go.Figure(go.Bar(x=target_corr.values, y=target_corr.index, orientation='h'))
+        breakdown_figure(('Age', 'Ejection Fraction'), (25, 30))
+    return run, n_figures, 'figures'
+
+
+def cold_start(data_dir, n_rows):
+    from startup import APP_PATH, _RENDER_PROBE
+
+    code = _RENDER_PROBE.format(app=APP_PATH, slug='home')
+
+    def run():
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, check=True, capture_output=True)
+    return run, n_rows, 'starts'
+
+
+# name -> (case, sizes, input file format generated beforehand or None)
+CASES = {
+    'ingest_csv': (ingest_csv, (10_000, 1_000_000, 10_000_000), 'csv'),
+    'ingest_parquet': (ingest_parquet, (10_000, 1_000_000, 10_000_000), 'parquet'),
+    'score_single': (score_single, (1,), None),
+    'score_single_cached': (score_single_cached, (1,), None),
+    'score_batch': (score_batch, (1, 10_000, 1_000_000, 10_000_000), 'csv'),
+    'score_batch_explained': (score_batch_explained, (10_000, 1_000_000), 'csv'),
+    'similar_patients': (similar_patients, (10_000, 1_000_000), 'parquet'),
+    'analysis_stats': (analysis_stats, (10_000, 1_000_000, 10_000_000), 'parquet'),
+    'figures': (figures, (1_000_000,), 'parquet'),
+    'cold_start': (cold_start, (1,), None),
+}
+
+
+# ======================== RUNNER ========================
+
+def _reset_peak_rss():
+    """Restart this process's peak-RSS count where Linux allows it.
+
+    ru_maxrss and VmHWM carry over the parent's peak across fork + exec,
+    so a case process would otherwise report at least its parent's peak.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    # VmHWM honours _reset_peak_rss; ru_maxrss (KiB on Linux) is the fallback.
+    # Children covers the cold-start interpreter.
+    try:
+        with open('/proc/self/status') as f:
+            own = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+    except (OSError, StopIteration):
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max(own, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+
+
+def run_case(name, n_rows, data_dir, repeat):
+    """Best-of-``repeat`` wall time of one case, in this process.
+
+    Sub-50 ms cases are looped, timeit-style, so each timing spans at
+    least 50 ms; ``seconds`` is per call either way.
+    """
+    fn, size, unit = CASES[name][0](data_dir, n_rows)
+    setup_rss_mb = _peak_rss_mb()
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    number = max(1, int(0.05 / first)) if first < 0.05 else 1
+    times = [first]
+    deadline = time.perf_counter() + 30
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+        if time.perf_counter() > deadline:
+            break
+    seconds = min(times)
+    return {
+        'case': name,
+        'rows': n_rows,
+        'size': size,
+        'unit': unit,
+        'seconds': seconds,
+        'throughput': size / seconds,
+        'peak_rss_mb': _peak_rss_mb(),
+        'setup_rss_mb': setup_rss_mb,
+        'runs': 1 + (len(times) - 1) * number,
+    }
+
+
+def _run_isolated(name, n_rows, data_dir, repeat, *options):
+    """Run ``--run-case`` (or another internal ``options`` mode) in a fresh interpreter."""
+    args = options or ('--run-case', name, '--repeat', str(repeat))
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *args, '--rows', str(n_rows), '--data-dir', data_dir],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{name}@{n_rows}: {result.stderr.strip().splitlines()[-1]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def environment():
+    import pandas as pd
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def run(cases=None, max_rows=None, data_dir=DEFAULT_DATA_DIR, repeat=3, log=print):
+    results = {}
+    for name in cases or CASES:
+        for n_rows in CASES[name][1]:
+            if max_rows is not None and n_rows > max_rows:
+                continue
+            if CASES[name][2]:
+                # Inputs are generated in a process of their own, so neither this runner
+                # nor the case process (which inherits its peak RSS) grows by the generator
+                _run_isolated(name, n_rows, data_dir, repeat, '--generate', CASES[name][2])
+            row = _run_isolated(name, n_rows, data_dir, repeat)
+            results[f"{name}@{n_rows}"] = row
+            log(_format_row(f"{name}@{n_rows}", row))
+    return {'environment': environment(), 'results': results}
+
+
+def _format_row(key, row):
+    return (f"{key:<32}{row['seconds'] * 1000:>12.2f}{row['throughput']:>16,.0f} {row['unit'] + '/s':<12}"
+            f"{row['peak_rss_mb']:>10.0f}")
+
+
+# ======================== BASELINE ========================
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """``(lines, regressions)`` diffing wall time and peak RSS case by case.
+
+    A case regresses when either metric grew by more than ``tolerance``
+    (and, for time, by more than :data:`MIN_DELTA_SECONDS`). Cases missing from one side are listed but never count as regressions.
+    """
+    lines = [f"{'case':<32}{'base ms':>12}{'now ms':>12}{'time':>9}{'base MB':>10}{'now MB':>9}{'rss':>9}"]
+    regressions = []
+    old, new = baseline['results'], current['results']
+    for key in sorted(set(old) | set(new), key=lambda k: (k.split('@')[0], int(k.split('@')[1]))):
+        if key not in old or key not in new:
+            lines.append(f"{key:<32}  {'only in baseline' if key in old else 'new case'}")
+            continue
+        time_change = new[key]['seconds'] / old[key]['seconds'] - 1
+        rss_change = new[key]['peak_rss_mb'] / old[key]['peak_rss_mb'] - 1
+        flag = ''
+        slower = time_change > tolerance and new[key]['seconds'] - old[key]['seconds'] > MIN_DELTA_SECONDS
+        if slower or rss_change > tolerance:
+            regressions.append(key)
+            flag = '  REGRESSION'
+        lines.append(
+            f"{key:<32}{old[key]['seconds'] * 1000:>12.2f}{new[key]['seconds'] * 1000:>12.2f}"
+            f"{time_change:>+9.0%}{old[key]['peak_rss_mb']:>10.0f}{new[key]['peak_rss_mb']:>9.0f}"
+            f"{rss_change:>+9.0%}{flag}"
+        )
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and diff it against the baseline")
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), help="Default: every case")
+    parser.add_argument('--max-rows', type=int, help="Skip sizes above this many rows")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per case (best is kept)")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="Where generated inputs are kept")
+    parser.add_argument('--json', help="Write the results to this file")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="Overwrite the baseline with this run")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative growth in time or RSS before a case regresses")
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    parser.add_argument('--rows', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--generate', choices=['csv', 'parquet'], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        print(json.dumps(dataset_file(args.data_dir, args.rows, args.generate)))
+        return 0
+    if args.run_case:
+        _reset_peak_rss()
+        print(json.dumps(run_case(args.run_case, args.rows, args.data_dir, args.repeat)))
+        return 0
+
+    print(f"{'case':<32}{'ms':>12}{'throughput':>16} {'':<12}{'peak MB':>10}")
+    current = run(args.cases, args.max_rows, args.data_dir, args.repeat)
+    for path in filter(None, [args.json, args.baseline if args.save_baseline else None]):
+        with open(path, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.save_baseline or not os.path.exists(args.baseline):
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    lines, regressions = compare(current, baseline, args.tolerance)
+    print(f"\nAgainst {os.path.relpath(args.baseline)} (commit {baseline['environment'].get('commit')}):")
+    print('\n'.join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,10 @@
+"""Inference and data utilities shared by the Streamlit app and batch jobs."""
+
+from heart_failure.model import (
+    DATASET_PATH,
+    FEATURE_COLUMNS,
+    MODEL_PATH,
+    TARGET_COLUMN,
+    FoldedANN,
+    load_keras_h5,
+)
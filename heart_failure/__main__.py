@@ -0,0 +1,3 @@
+from heart_failure.cli import main
+
+raise SystemExit(main())
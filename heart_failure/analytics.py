@@ -0,0 +1,227 @@
+"""Cached dataset statistics for the Data Analysis page.
+
+An upload is parsed and summarized once; later reruns (switching tabs or
+the selected feature) look the result up by the SHA-256 of the file's
+bytes. Entries are evicted least-recently-used once either the entry count
+or the estimated memory footprint exceeds its cap.
+
+Large datasets are plotted from server-side aggregates (histogram counts
+and box-plot quantiles) so the payload sent to the browser does not grow
+with the number of rows. Uploads that large are never held as one
+DataFrame either: they are parsed in chunks into the mergeable
+accumulators of :mod:`heart_failure.streaming_stats`.
+"""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from heart_failure.columnar import ColumnarFile, read_table
+from heart_failure.metrics import stage, timed_iter
+from heart_failure.model import TARGET_COLUMN
+from heart_failure.schema import CSV_BYTES_PER_ROW, read_patient_csv
+
+DEFAULT_MAX_ENTRIES = 8
+DEFAULT_MAX_BYTES = 512 << 20
+# Above this many rows the distribution charts are drawn from aggregates
+AGGREGATE_ROW_THRESHOLD = int(os.environ.get('HF_AGGREGATE_ROW_THRESHOLD', 50_000))
+MAX_HISTOGRAM_BINS = 100
+# Rows per chunk when a large upload is summarized without loading it whole
+ANALYSIS_CHUNK_ROWS = 100_000
+
+
+def should_aggregate(n_rows, threshold=None):
+    return n_rows > (AGGREGATE_ROW_THRESHOLD if threshold is None else threshold)
+
+
+def histogram(values, max_bins=MAX_HISTOGRAM_BINS):
+    """``(counts, edges)`` with numpy's 'auto' binning, capped at ``max_bins``."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(1)
+    edges = np.histogram_bin_edges(values, bins='auto')
+    if len(edges) - 1 > max_bins:
+        edges = np.histogram_bin_edges(values, bins=max_bins)
+    counts, edges = np.histogram(values, bins=edges)
+    return counts, edges
+
+
+def box_summary(values):
+    """Box-plot statistics with plotly's 1.5 IQR whisker convention."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return None
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {
+        'count': int(values.size),
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'mean': float(values.mean()),
+        'lowerfence': float(inside.min()),
+        'upperfence': float(inside.max()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+    }
+
+
+class DatasetAnalysis:
+    """A parsed upload plus every statistic the page displays."""
+
+    def __init__(self, frame, target=TARGET_COLUMN):
+        self.frame = frame
+        self.target = target if target in frame.columns else None
+
+        numeric = frame.select_dtypes(include=[np.number])
+        self.numeric_columns = [c for c in numeric.columns if c != self.target]
+        self.missing_count = int(frame.isnull().sum().sum())
+        self.corr = numeric.corr()
+        self.describe = frame.describe()
+        self.class_describe = describe_by_class(frame, self.target) if self.target else {}
+        self.target_rate = float(frame[self.target].mean()) if self.target else None
+        self.class_counts = frame[self.target].value_counts().sort_index() if self.target else None
+        self._distributions = {}
+
+        self.nbytes = int(frame.memory_usage(deep=True).sum()) + sum(
+            stats.memory_usage(deep=True).sum()
+            for stats in [self.corr, self.describe, *self.class_describe.values()]
+        )
+
+    def distribution(self, column):
+        """Histogram plus overall and per-class box statistics for ``column``, memoized."""
+        if column not in self._distributions:
+            values = self.frame[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            by_class = {}
+            if self.target:
+                codes = self.frame[self.target].to_numpy()
+                by_class = {key: box_summary(values[codes == key]) for key in self.class_counts.index}
+            self._distributions[column] = {
+                'histogram': histogram(values),
+                'box': box_summary(values),
+                'box_by_class': by_class,
+            }
+        return self._distributions[column]
+
+    @property
+    def shape(self):
+        return self.frame.shape
+
+    def head(self, n=20):
+        return self.frame.head(n)
+
+    @property
+    def target_corr(self):
+        """Correlation of every other numeric column with the target, descending."""
+        return self.corr[self.target].drop(self.target).sort_values(ascending=False)
+
+
+def describe_by_class(frame, target=TARGET_COLUMN):
+    """``{class: frame[frame[target] == class].describe()}`` from one groupby pass."""
+    grouped = frame.groupby(target).describe()
+    # (class) x (column, statistic) -> statistic x column per class, like DataFrame.describe()
+    return {
+        key: grouped.loc[key].unstack(level=0)[grouped.columns.get_level_values(0).unique()]
+        for key in grouped.index
+    }
+
+
+class AnalysisCache:
+    """Thread-safe LRU of :class:`DatasetAnalysis` keyed by content hash."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def nbytes(self):
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self.nbytes > self.max_bytes
+            ):
+                self._entries.popitem(last=False)
+
+    def analyze(self, key, build):
+        """Analysis stored under ``key``; ``build()`` runs only on a miss.
+
+        A result larger than the memory cap is returned but not kept.
+        """
+        entry = self.get(key)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            entry = build()
+            if entry.nbytes <= self.max_bytes:
+                self.put(key, entry)
+        return entry
+
+
+def content_key(data):
+    """Cache key for an uploaded file's raw bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_upload_bytes(data, fmt='csv'):
+    """Parse an uploaded CSV, Parquet or Arrow file with the compact schema."""
+    with stage('analysis.parse') as timing:
+        frame = read_patient_csv(io.BytesIO(data)) if fmt == 'csv' else read_table(data, fmt)
+        timing.rows = len(frame)
+    return frame
+
+
+def analyze_upload(data, fmt='csv', chunk_rows=ANALYSIS_CHUNK_ROWS):
+    """Statistics of an uploaded file's bytes.
+
+    A file that would be plotted from aggregates anyway is parsed chunk by
+    chunk into a :class:`~heart_failure.streaming_stats.StreamingAnalysis`,
+    so no DataFrame of all its rows is ever built; smaller files get a
+    :class:`DatasetAnalysis` that keeps the rows for plotting.
+    """
+    if fmt == 'csv':
+        large = should_aggregate(len(data) // CSV_BYTES_PER_ROW)
+    else:
+        table = ColumnarFile(data, fmt)
+        large = should_aggregate(table.num_rows)
+    if not large:
+        frame = read_upload_bytes(data, fmt)
+        with stage('analysis.stats', rows=len(frame)):
+            return DatasetAnalysis(frame)
+
+    from heart_failure.streaming_stats import StreamingAnalysis
+
+    if fmt == 'csv':
+        chunks = read_patient_csv(io.BytesIO(data), chunksize=chunk_rows)
+    else:
+        chunks = table.iter_frames(chunk_rows)
+    analysis = StreamingAnalysis()
+    for chunk in timed_iter(chunks, 'analysis.parse'):
+        with stage('analysis.stats', rows=len(chunk)):
+            analysis.update(chunk)
+    return analysis
@@ -0,0 +1,155 @@
+"""Memoized single-patient assessments for the prediction page.
+
+Streamlit reruns the page on every widget change, so a clinician moving the
+ejection fraction slider back and forth scores the same inputs again and
+again. :class:`PredictionCache` keeps the finished :class:`Assessment`
+(probability, risk level, the model's per-feature attributions and the
+breakdown chart's figure spec) in a bounded LRU keyed on the normalized
+feature vector. Entries
+belong to one model version; the first lookup under a new version empties
+the cache.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+from heart_failure.attribution import FEATURE_LABELS
+from heart_failure.model import FEATURE_COLUMNS
+from heart_failure.risk import risk_levels
+
+DEFAULT_MAX_ENTRIES = 1024
+# Features moving the risk by less than this many percentage points are not charted
+MIN_CHART_POINTS = 0.5
+
+
+class Assessment(NamedTuple):
+    """Everything the single-patient result view draws."""
+    probability: float
+    risk_score: int        # probability in whole percent
+    risk_level: str
+    factors: tuple         # labels of the features that move the risk, smallest effect first
+    points: tuple          # their contributions in percentage points vs. the average patient
+    figure: dict           # plotly spec of the breakdown chart, None when no feature matters
+
+
+def patient_key(features):
+    """Hashable normalized vector of a ``{column: value}`` patient.
+
+    Values are taken in :data:`FEATURE_COLUMNS` order as floats, so ``60``
+    and ``60.0`` share an entry, and rounded to absorb float noise from
+    widget steps (``0.1 + 0.2``).
+    """
+    return tuple(round(float(features[column]), 6) for column in FEATURE_COLUMNS)
+
+
+def breakdown_figure(factors, points):
+    """Plotly spec of the "Contributing Risk Factors" bar chart; red raises risk, green lowers it."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Bar(
+        y=list(factors),
+        x=list(points),
+        orientation='h',
+        marker=dict(color=['#FF6B6B' if p > 0 else '#28A745' for p in points])
+    ))
+    fig.update_layout(
+        title="Contributing Risk Factors",
+        xaxis_title="Change in Risk vs. Average Patient (% points)",
+        yaxis_title="Factor",
+        height=400,
+        plot_bgcolor='white'
+    )
+    return fig.to_dict()
+
+
+def assess_patient(model, features, explainer):
+    """Score one ``{column: value}`` patient with ``model``; ``explainer`` attributes it.
+
+    The breakdown is the :class:`~heart_failure.attribution.Explainer`'s
+    contributions, so it always reflects the model actually scoring.
+    """
+    X = np.array([patient_key(features)])
+    probability = float(model.predict_proba(X)[0])
+    risk_score = round(probability * 100)
+    contributions = explainer.explain(X).contributions[0].astype(np.float64) * 100
+    order = np.argsort(contributions)
+    shown = [j for j in order if abs(contributions[j]) >= MIN_CHART_POINTS]
+    factors = tuple(FEATURE_LABELS[FEATURE_COLUMNS[j]] for j in shown)
+    points = tuple(round(float(contributions[j]), 1) for j in shown)
+    return Assessment(
+        probability, risk_score, str(risk_levels(risk_score)), factors, points,
+        breakdown_figure(factors, points) if factors else None,
+    )
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    entries: int
+    invalidations: int
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class PredictionCache:
+    """Thread-safe LRU of :class:`Assessment` for one model version at a time."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _use_version(self, version):
+        # Caller holds the lock
+        if version != self._version:
+            if self._version is not None:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, version, key):
+        with self._lock:
+            self._use_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    def put(self, version, key, entry):
+        with self._lock:
+            # A result computed under a version that has since been replaced is dropped
+            if version != self._version:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def assess(self, model, version, features, explainer):
+        """:func:`assess_patient` for ``features``, computed only on a miss."""
+        key = patient_key(features)
+        entry = self.get(version, key)
+        if entry is None:
+            entry = assess_patient(model, features, explainer)
+            self.put(version, key, entry)
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return CacheStats(self.hits, self.misses, len(self._entries), self.invalidations)
@@ -0,0 +1,377 @@
+"""Chunked batch scoring with memory bounded by the chunk size.
+
+Input is parsed ``chunk_size`` rows at a time, scored, appended to the
+output file and dropped, so only one chunk plus a small preview is ever
+held in memory whatever the size of the file. :func:`parallel_score`
+does the same across a process pool for headless jobs. Input and output
+may be CSV, Parquet or Arrow IPC (see :mod:`heart_failure.columnar`).
+Rows failing validation are quarantined instead of scored.
+Nothing here imports Streamlit or plotly.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from heart_failure.attribution import top_drivers
+from heart_failure.bundle import BUNDLE_PATH, DEFAULT_BACKEND, get_bundle
+from heart_failure.columnar import ColumnarFile, ResultWriter, file_format
+from heart_failure.metrics import METRICS, detach_json_log, stage, timed_iter
+from heart_failure.model import FEATURE_COLUMNS
+from heart_failure.risk import RISK_LEVELS, risk_level_codes, score_risk
+from heart_failure.schema import CSV_BYTES_PER_ROW, compact, read_patient_csv
+from heart_failure.validation import ROW_COLUMN, check_schema, split_valid
+
+RESULT_COLUMNS = ['Prediction', 'Risk_Probability', 'Risk_Level', 'Clinical_Risk_Score']
+# Added after RESULT_COLUMNS when scoring with an explainer
+EXPLANATION_COLUMNS = ['Top_Drivers']
+DEFAULT_CHUNK_SIZE = 100_000
+DEFAULT_BLOCK_BYTES = 32 << 20
+PREVIEW_ROWS = 20
+
+
+class BatchSummary(NamedTuple):
+    """Aggregate outcome of a streamed run; the scored rows stay in ``path``.
+
+    ``invalid_rows`` failed validation and were not scored; they are in
+    ``error_path`` when an error report was requested.
+    """
+    path: str
+    rows: int
+    level_counts: dict
+    preview: pd.DataFrame
+    invalid_rows: int = 0
+    error_path: str = None
+
+
+def score_frame(model, frame, explainer=None):
+    """Append :data:`RESULT_COLUMNS` to ``frame`` in place and return it.
+
+    With an :class:`~heart_failure.attribution.Explainer`,
+    :data:`EXPLANATION_COLUMNS` are appended too.
+    """
+    check_schema(frame.columns)
+    with stage('batch.predict', rows=len(frame)):
+        probabilities = model.predict_proba(frame[FEATURE_COLUMNS])
+    with stage('batch.label', rows=len(frame)):
+        frame['Prediction'] = (probabilities >= 0.5).astype(np.int8)
+        frame['Risk_Probability'] = probabilities
+        frame['Risk_Level'] = pd.Categorical.from_codes(risk_level_codes(probabilities * 100), RISK_LEVELS)
+    with stage('batch.clinical_score', rows=len(frame)):
+        frame['Clinical_Risk_Score'] = score_risk(frame).total
+    if explainer is not None:
+        with stage('batch.explain', rows=len(frame)):
+            frame['Top_Drivers'] = top_drivers(explainer.explain(frame[FEATURE_COLUMNS]).contributions)
+    return frame
+
+
+def _fraction_read(source, total_bytes):
+    # Chunks are cut at line boundaries, so this is exact after each chunk.
+    if not total_bytes or not hasattr(source, 'tell'):
+        return None
+    return min(source.tell() / total_bytes, 1.0)
+
+
+def _source_format(source):
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', None)
+    return file_format(name) if name else 'csv'
+
+
+def _input_chunks(source, fmt, chunk_size, total_bytes):
+    """``(frame, fraction_done)`` for each chunk of a CSV, Parquet or Arrow source."""
+    if fmt == 'csv':
+        with read_patient_csv(source, chunksize=chunk_size) as reader:
+            for chunk in timed_iter(reader, 'batch.parse'):
+                yield chunk, _fraction_read(source, total_bytes)
+        return
+    table = ColumnarFile(source, fmt)
+    check_schema(table.columns)
+    done = 0
+    for chunk in timed_iter(table.iter_frames(chunk_size), 'batch.parse'):
+        done += len(chunk)
+        yield chunk, done / max(table.num_rows, 1)
+
+
+def stream_score(source, destination, model, chunk_size=DEFAULT_CHUNK_SIZE,
+                 progress=None, total_bytes=None, source_format=None, errors_destination=None,
+                 explainer=None):
+    """Score a file chunk by chunk and write the results to ``destination``.
+
+    ``source`` is a path or binary file object in CSV, Parquet or Arrow IPC
+    format (``source_format``, else from its name, else CSV). Every input
+    column is kept, so ID and outcome columns reach the output whatever
+    the format. The output format follows ``destination``'s extension.
+    ``progress``, if given, is called after every chunk with the rows done
+    so far and the approximate fraction of the input consumed (``None``
+    when unknown).
+
+    Every chunk is validated first; rows that fail are left out of the
+    output and, if ``errors_destination`` is given, written there with the
+    reasons (see :mod:`heart_failure.validation`). With an ``explainer``
+    every row also gets its top risk drivers (:data:`EXPLANATION_COLUMNS`).
+    """
+    source_format = source_format or _source_format(source)
+    if source_format == 'csv' and isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return stream_score(f, destination, model, chunk_size, progress,
+                                os.path.getsize(source), 'csv', errors_destination, explainer)
+
+    counts = np.zeros(len(RISK_LEVELS), dtype=np.int64)
+    rows = 0
+    seen = 0
+    invalid_rows = 0
+    preview = None
+    errors = None
+    try:
+        with ResultWriter(destination) as writer:
+            for chunk, fraction in _input_chunks(source, source_format, chunk_size, total_bytes):
+                with stage('batch.validate', rows=len(chunk)):
+                    valid, report = split_valid(chunk, row_offset=seen)
+                    seen += len(chunk)
+                    if report is not None:
+                        invalid_rows += len(report)
+                        if errors_destination is not None:
+                            errors = errors or ResultWriter(errors_destination)
+                            errors.write(report)
+                score_frame(model, valid, explainer)
+                with stage('batch.serialize', rows=len(valid)):
+                    writer.write(valid)
+
+                counts += np.bincount(valid['Risk_Level'].cat.codes, minlength=len(RISK_LEVELS))
+                rows += len(valid)
+                if preview is None and len(valid):
+                    preview = valid.head(PREVIEW_ROWS).copy()
+                if progress is not None:
+                    progress(rows, fraction)
+    finally:
+        if errors is not None:
+            errors.close()
+
+    if preview is None:
+        preview = pd.DataFrame(columns=FEATURE_COLUMNS + RESULT_COLUMNS
+                               + (EXPLANATION_COLUMNS if explainer is not None else []))
+    level_counts = dict(zip(RISK_LEVELS.tolist(), counts.tolist()))
+    return BatchSummary(str(destination), rows, level_counts, preview, invalid_rows,
+                        str(errors_destination) if errors is not None else None)
+
+
+def result_tempfile(suffix='.csv'):
+    """Path of a fresh temp file for scored output; the caller deletes it."""
+    fd, path = tempfile.mkstemp(prefix='heart_failure_predictions_', suffix=suffix)
+    os.close(fd)
+    return path
+
+
+# ======================== PARALLEL ========================
+
+def split_csv(path, block_bytes=DEFAULT_BLOCK_BYTES):
+    """Split a CSV into ``(header, [(start, stop), ...])`` line-aligned byte ranges.
+
+    Assumes no quoted field spans a line break, which holds for numeric
+    clinical extracts.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, 'rb') as f:
+        header = f.readline()
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + block_bytes, size))
+            f.readline()
+            stop = min(f.tell(), size)
+            ranges.append((start, stop))
+            start = stop
+    return header, ranges
+
+
+_WORKER_MODEL = None
+_WORKER_EXPLAINER = None
+
+
+def _load_worker_model(bundle_path, backend=DEFAULT_BACKEND, intra_op_threads=None, explain=False):
+    global _WORKER_MODEL, _WORKER_EXPLAINER
+    bundle = get_bundle(bundle_path)
+    _WORKER_MODEL = bundle.backend_model(backend, intra_op_threads)
+    _WORKER_EXPLAINER = bundle.explainer() if explain else None
+
+
+def _init_worker(bundle_path, backend=DEFAULT_BACKEND, intra_op_threads=None, explain=False):
+    # Pool processes only; with workers=1 the parent keeps its own log handlers
+    detach_json_log()
+    _load_worker_model(bundle_path, backend, intra_op_threads, explain)
+
+
+def _score_block(task):
+    """Read, validate, score and write one block of input; runs in a worker process.
+
+    Returns ``(scored_rows, level_counts, error_report, input_rows,
+    stage_records)``; the report's row numbers are relative to the block.
+    """
+    path, in_fmt, header, start, stop, part_path, out_fmt, write_header = task
+    with stage('batch.parse') as timing:
+        if in_fmt == 'csv':
+            with open(path, 'rb') as f:
+                f.seek(start)
+                data = f.read(stop - start)
+            frame = read_patient_csv(io.BytesIO(header + data))
+            del data
+        else:
+            frame = compact(ColumnarFile(path, in_fmt).read_parts(start, stop).to_pandas())
+        timing.rows = input_rows = len(frame)
+    with stage('batch.validate', rows=input_rows):
+        frame, report = split_valid(frame)
+    score_frame(_WORKER_MODEL, frame, _WORKER_EXPLAINER)
+
+    with stage('batch.serialize', rows=len(frame)):
+        if out_fmt == 'csv':
+            frame.to_csv(part_path, header=write_header, index=False)
+        else:
+            with ResultWriter(part_path, out_fmt) as writer:
+                writer.write(frame)
+    counts = np.bincount(frame['Risk_Level'].cat.codes, minlength=len(RISK_LEVELS))
+    return len(frame), counts, report, input_rows, METRICS.drain()
+
+
+def plan_blocks(path, fmt, block_bytes=DEFAULT_BLOCK_BYTES, require_features=True):
+    """``(header, [(start, stop), ...], total)`` work items for one input file.
+
+    CSV blocks are byte ranges; Parquet/Arrow blocks are ranges of row
+    groups / record batches, merged until they hold about as many rows as
+    a CSV block of ``block_bytes`` would. With ``require_features`` a file
+    missing any of the 12 feature columns raises :class:`SchemaError`.
+    """
+    if fmt == 'csv':
+        header, ranges = split_csv(path, block_bytes)
+        if require_features:
+            check_schema(header.decode('utf-8').strip().split(','))
+        return header, ranges, ranges[-1][1] if ranges else 0
+
+    table = ColumnarFile(path, fmt)
+    if require_features:
+        check_schema(table.columns)
+    target_rows = max(block_bytes // CSV_BYTES_PER_ROW, 1)
+    sizes = table.part_rows()
+    ranges, start, rows = [], 0, 0
+    for i, part_rows in enumerate(sizes):
+        rows += part_rows
+        if rows >= target_rows or i == len(sizes) - 1:
+            ranges.append((start, i + 1))
+            start, rows = i + 1, 0
+    return b'', ranges, len(sizes)
+
+
+def parallel_score(source, destination, workers=None, block_bytes=DEFAULT_BLOCK_BYTES,
+                   bundle_path=BUNDLE_PATH, progress=None, backend=DEFAULT_BACKEND,
+                   intra_op_threads=None, errors_destination=None, explain=False):
+    """Score ``source`` across a process pool and write results in input order.
+
+    CSV input is cut into line-aligned blocks of about ``block_bytes``;
+    Parquet and Arrow IPC input into runs of row groups / record batches,
+    read memory-mapped. Every input column is carried to the output, as
+    with CSV. Each worker scores its own blocks into a temp part file,
+    which the parent appends to ``destination`` (CSV, Parquet or Arrow)
+    once every earlier block is written. Rows failing validation are
+    skipped and, if ``errors_destination`` is given, written there with
+    their input row number. Returns ``(rows, level_counts,
+    invalid_rows)``; ``progress`` is called with ``(rows_done, fraction)``
+    after each block.
+
+    With the ``'onnx'`` backend each pool worker gets a single-threaded
+    session unless ``intra_op_threads`` says otherwise, so workers do not
+    compete for cores. ``explain`` adds :data:`EXPLANATION_COLUMNS`.
+    """
+    in_fmt = file_format(source)
+    out_fmt = file_format(destination)
+    workers = workers or os.cpu_count() or 1
+    header, ranges, total = plan_blocks(source, in_fmt, block_bytes)
+    if not ranges:
+        raise ValueError(f"{source} has no data rows")
+
+    part_dir = tempfile.mkdtemp(prefix='heart_failure_parts_')
+    tasks = [
+        (os.fspath(source), in_fmt, header, start, stop,
+         os.path.join(part_dir, f'{i:06d}.{out_fmt}'), out_fmt, i == 0)
+        for i, (start, stop) in enumerate(ranges)
+    ]
+
+    counts = np.zeros(len(RISK_LEVELS), dtype=np.int64)
+    rows = 0
+    seen = 0
+    invalid_rows = 0
+    executor = None
+    errors = None
+    try:
+        if workers == 1:
+            _load_worker_model(bundle_path, backend, intra_op_threads, explain)
+            results = map(_score_block, tasks)
+        else:
+            threads = 1 if intra_op_threads is None else intra_op_threads
+            executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                           initargs=(bundle_path, backend, threads, explain))
+            results = executor.map(_score_block, tasks)
+
+        with _PartMerger(destination, out_fmt) as merger:
+            # map() yields in submission order, so parts land in input order
+            for task, (part_rows, part_counts, report, input_rows, records) in zip(tasks, results):
+                if executor is not None:
+                    # In-process blocks were recorded here already
+                    METRICS.merge(records)
+                with stage('batch.merge', rows=part_rows):
+                    merger.append(task[5])
+                if report is not None:
+                    invalid_rows += len(report)
+                    if errors_destination is not None:
+                        report[ROW_COLUMN] += seen
+                        errors = errors or ResultWriter(errors_destination)
+                        errors.write(report)
+                seen += input_rows
+                rows += part_rows
+                counts += part_counts
+                if progress is not None:
+                    progress(rows, task[4] / total)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if errors is not None:
+            errors.close()
+        shutil.rmtree(part_dir, ignore_errors=True)
+
+    level_counts = dict(zip(RISK_LEVELS.tolist(), counts.tolist()))
+    return rows, level_counts, invalid_rows
+
+
+class _PartMerger:
+    """Append finished part files to the destination and delete them."""
+
+    def __init__(self, destination, fmt):
+        self.fmt = fmt
+        if fmt == 'csv':
+            self._out = open(destination, 'wb')
+        else:
+            self._writer = ResultWriter(destination, fmt)
+
+    def append(self, part_path):
+        if self.fmt == 'csv':
+            with open(part_path, 'rb') as part:
+                shutil.copyfileobj(part, self._out)
+        else:
+            part = ColumnarFile(part_path, self.fmt)
+            for i in range(part.num_parts):
+                self._writer.write_table(part.read_parts(i, i + 1))
+            del part
+        os.remove(part_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.fmt == 'csv':
+            self._out.close()
+        else:
+            self._writer.close()
@@ -0,0 +1,230 @@
+"""Versioned preprocessing + model artifact.
+
+The bundle is a single ``.npz`` holding the StandardScaler statistics, the
+feature order, the BatchNorm-folded ANN weights and a JSON metadata
+record, so inference never refits the scaler or re-parses the Keras file.
+Loaded bundles are memoized per process by content hash: a rerun only
+``stat``s the file, and a changed file is re-hashed and reloaded.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from heart_failure.model import (
+    DATA_DIR,
+    DATASET_PATH,
+    FEATURE_COLUMNS,
+    MODEL_PATH,
+    FoldedANN,
+    load_keras_h5,
+    reference_scaler,
+)
+
+BUNDLE_PATH = DATA_DIR / 'model_bundle.npz'
+BUNDLE_FORMAT_VERSION = 1
+BACKENDS = ('numpy', 'onnx')
+DEFAULT_BACKEND = os.environ.get('HF_BACKEND', 'numpy')
+
+_HASH_CACHE = {}    # (path, mtime_ns, size) -> sha256
+_BUNDLE_CACHE = {}  # (path, sha256) -> ModelBundle
+
+
+class ModelBundle:
+    """Scaler, feature order and network weights loaded from one artifact.
+
+    ``network`` takes standardized features; ``model`` has the scaler folded
+    into its first layer and takes raw clinical values.
+    """
+
+    def __init__(self, network, scaler_mean, scaler_scale, feature_columns, metadata,
+                 content_hash=None, load_seconds=0.0):
+        self.network = network
+        self.scaler_mean = np.asarray(scaler_mean, dtype=np.float64)
+        self.scaler_scale = np.asarray(scaler_scale, dtype=np.float64)
+        self.feature_columns = list(feature_columns)
+        self.metadata = metadata
+        self.content_hash = content_hash
+        self.load_seconds = load_seconds
+        self.model = network.with_scaler(self.scaler_mean, self.scaler_scale)
+        self._backend_models = {}
+        self._explainer = None
+
+    @property
+    def version(self):
+        """Short content hash identifying these exact weights and scaler."""
+        return (self.content_hash or 'unsaved')[:12]
+
+    def standardize(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.scaler_mean) / self.scaler_scale
+
+    def predict_proba(self, X, batch_size=65536):
+        return self.model.predict_proba(X, batch_size=batch_size)
+
+    def backend_model(self, backend=DEFAULT_BACKEND, intra_op_threads=None):
+        """``model`` on one of :data:`BACKENDS`, created once per bundle.
+
+        ``'onnx'`` runs the same scaler-folded network in an onnxruntime CPU
+        session with ``intra_op_threads`` threads (None: onnxruntime default).
+        """
+        if backend == 'numpy':
+            return self.model
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+        key = (backend, intra_op_threads)
+        if key not in self._backend_models:
+            from heart_failure.onnx_backend import INTRA_OP_THREADS, OnnxModel
+
+            threads = INTRA_OP_THREADS if intra_op_threads is None else intra_op_threads
+            self._backend_models[key] = OnnxModel.from_bundle(self, threads)
+        return self._backend_models[key]
+
+    def explainer(self):
+        """:class:`~heart_failure.attribution.Explainer` of ``model`` against the average patient.
+
+        The baseline is the scaler mean, i.e. the mean of the population
+        the scaler was fitted on.
+        """
+        if self._explainer is None:
+            from heart_failure.attribution import Explainer
+
+            self._explainer = Explainer(self.model, self.scaler_mean)
+        return self._explainer
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def content_hash(path=BUNDLE_PATH):
+    """SHA-256 of ``path``, recomputed only when its mtime or size changes."""
+    stat = os.stat(path)
+    key = (os.fspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _HASH_CACHE:
+        _HASH_CACHE[key] = file_sha256(path)
+    return _HASH_CACHE[key]
+
+
+def build_bundle(model_path=MODEL_PATH, dataset_path=DATASET_PATH, dtype=np.float64, scaler=None):
+    """Fold the Keras model and fit the notebook's scaler into a bundle.
+
+    Weights are kept in float64 by default so the saved folding is exact;
+    they are cast to float32 when the bundle is loaded. ``scaler`` is a
+    ``(mean, scale)`` pair to use instead of refitting on ``dataset_path``.
+    """
+    network = load_keras_h5(model_path, dtype=dtype)
+    mean, scale = scaler if scaler is not None else reference_scaler(dataset_path)
+    metadata = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'activations': [activation for _, _, activation in network.layers],
+        'source_model': os.path.basename(model_path),
+        'source_model_sha256': file_sha256(model_path),
+        'dataset': os.path.basename(dataset_path),
+        'dataset_sha256': file_sha256(dataset_path),
+    }
+    return ModelBundle(network, mean, scale, FEATURE_COLUMNS, metadata)
+
+
+def save_bundle(bundle, path=BUNDLE_PATH):
+    arrays = {
+        'feature_columns': np.array(bundle.feature_columns),
+        'scaler_mean': bundle.scaler_mean,
+        'scaler_scale': bundle.scaler_scale,
+        'metadata': np.array(json.dumps(bundle.metadata, sort_keys=True)),
+    }
+    for i, (kernel, bias, _) in enumerate(bundle.network.layers):
+        arrays[f'layer{i}_kernel'] = kernel
+        arrays[f'layer{i}_bias'] = bias
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+    bundle.content_hash = content_hash(path)
+    return bundle
+
+
+def load_bundle(path=BUNDLE_PATH, dtype=np.float32):
+    """Read a bundle from disk, bypassing the per-process cache."""
+    start = time.perf_counter()
+    with np.load(path, allow_pickle=False) as data:
+        metadata = json.loads(str(data['metadata']))
+        if metadata.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported bundle format {metadata.get('format_version')!r} in {path}; "
+                f"expected {BUNDLE_FORMAT_VERSION}"
+            )
+        layers = [
+            (data[f'layer{i}_kernel'], data[f'layer{i}_bias'], activation)
+            for i, activation in enumerate(metadata['activations'])
+        ]
+        bundle = ModelBundle(
+            FoldedANN(layers, dtype=dtype),
+            data['scaler_mean'],
+            data['scaler_scale'],
+            data['feature_columns'].tolist(),
+            metadata,
+            content_hash=content_hash(path),
+        )
+    if bundle.feature_columns != FEATURE_COLUMNS:
+        raise ValueError(f"Bundle feature order {bundle.feature_columns} does not match {FEATURE_COLUMNS}")
+    bundle.load_seconds = time.perf_counter() - start
+    return bundle
+
+
+def open_bundle(path=BUNDLE_PATH):
+    """Load ``path``, or build from ``model.h5`` and the dataset if it is missing."""
+    if os.path.exists(path):
+        return load_bundle(path)
+    start = time.perf_counter()
+    bundle = build_bundle(dtype=np.float32)
+    bundle.load_seconds = time.perf_counter() - start
+    return bundle
+
+
+def bundle_key(path=BUNDLE_PATH):
+    """Cache key for :func:`open_bundle`: the content hash, or None if unsaved."""
+    return content_hash(path) if os.path.exists(path) else None
+
+
+def get_bundle(path=BUNDLE_PATH):
+    """Process-wide bundle for ``path``, reloaded only when its content changes."""
+    key = (os.fspath(path), bundle_key(path))
+    if key not in _BUNDLE_CACHE:
+        _BUNDLE_CACHE[key] = open_bundle(path)
+    return _BUNDLE_CACHE[key]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or time the model bundle")
+    parser.add_argument('command', choices=['build', 'bench'])
+    parser.add_argument('--path', default=str(BUNDLE_PATH), help="Bundle location")
+    parser.add_argument('--repeat', type=int, default=1000, help="Warm lookups to time")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        bundle = save_bundle(build_bundle(), args.path)
+        print(f"wrote {args.path} (version {bundle.version})")
+        return 0
+
+    start = time.perf_counter()
+    bundle = get_bundle(args.path)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        get_bundle(args.path)
+    warm = (time.perf_counter() - start) / args.repeat
+    print(f"bundle {bundle.version}: cold load {cold * 1e3:.2f} ms, "
+          f"warm rerun lookup {warm * 1e6:.1f} us")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+"""Command-line batch scoring, e.g. for nightly ETL jobs.
+
+    python -m heart_failure input.csv -o out.parquet --workers 8
+    python -m heart_failure extract.parquet -o scored.arrow
+
+Input and output may be CSV, Parquet or Arrow IPC/Feather, chosen by file
+extension. Only NumPy, pandas (and pyarrow for Parquet/Arrow) are
+imported, so a run never pays the Streamlit/plotly start-up cost.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from heart_failure.batch import DEFAULT_BLOCK_BYTES, parallel_score
+from heart_failure.bundle import BACKENDS, BUNDLE_PATH, DEFAULT_BACKEND
+from heart_failure.metrics import METRICS, configure_json_log, serve_metrics
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='hf-score',
+        description="Score a file of patient records with the heart failure model.",
+    )
+    parser.add_argument('input', help="CSV, Parquet or Arrow/Feather file with the 12 clinical feature columns")
+    parser.add_argument('-o', '--output', required=True, help="Result file (.csv, .parquet, .arrow or .feather)")
+    parser.add_argument('--errors', help="CSV report of rows that fail validation (default: <output>.errors.csv)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Worker processes (default: all cores)")
+    parser.add_argument('--block-mb', type=float, default=DEFAULT_BLOCK_BYTES / 2**20,
+                        help="Approximate input megabytes per work item (CSV size equivalent)")
+    parser.add_argument('--bundle', default=str(BUNDLE_PATH), help="Model bundle (.npz)")
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="Inference engine (onnx needs onnxruntime)")
+    parser.add_argument('--intra-op-threads', type=int,
+                        help="onnxruntime threads per worker (default: 1 with several workers)")
+    parser.add_argument('--explain', action='store_true',
+                        help="Add a Top_Drivers column with the features raising each patient's risk the most")
+    parser.add_argument('--metrics-log', help="Append one JSON line per timed stage to this file ('-': stderr)")
+    parser.add_argument('--metrics-file', help="Write per-stage metrics in Prometheus text format when done ('-': stdout)")
+    parser.add_argument('--metrics-port', type=int, help="Serve Prometheus /metrics on this port while running")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Only print the final summary")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    errors_path = args.errors or os.path.splitext(args.output)[0] + '.errors.csv'
+
+    def report(rows, fraction):
+        if not args.quiet:
+            print(f"\r{fraction * 100:5.1f}%  {rows:,} rows", end='', file=sys.stderr, flush=True)
+
+    if args.metrics_log:
+        configure_json_log(args.metrics_log)
+    server = serve_metrics(args.metrics_port) if args.metrics_port else None
+
+    start = time.perf_counter()
+    try:
+        rows, level_counts, invalid_rows = parallel_score(
+            args.input, args.output,
+            workers=args.workers,
+            block_bytes=int(args.block_mb * 2**20),
+            bundle_path=args.bundle,
+            progress=report,
+            backend=args.backend,
+            intra_op_threads=args.intra_op_threads,
+            errors_destination=errors_path,
+            explain=args.explain,
+        )
+    except (OSError, ValueError, ImportError) as e:
+        print(f"hf-score: error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if server is not None:
+            server.shutdown()
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    levels = ', '.join(f"{level}={count:,}" for level, count in level_counts.items())
+    print(f"scored {rows:,} rows in {elapsed:.2f} s ({rows / elapsed:,.0f} rows/s) -> {args.output} [{levels}]",
+          file=sys.stderr)
+    if invalid_rows:
+        print(f"skipped {invalid_rows:,} rows that failed validation -> {errors_path}", file=sys.stderr)
+    if args.metrics_file == '-':
+        sys.stdout.write(METRICS.prometheus())
+    elif args.metrics_file:
+        with open(args.metrics_file, 'w') as f:
+            f.write(METRICS.prometheus())
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
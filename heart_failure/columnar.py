@@ -0,0 +1,199 @@
+"""Parquet and Arrow IPC (Feather v2) input and output for patient tables.
+
+Reads can be projected to the requested columns and memory-map local
+files, so re-scoring a multi-GB extract skips text parsing entirely.
+:class:`ResultWriter` appends scored chunks as they are produced: one row
+group per chunk for Parquet, one record batch for Arrow, so output is
+never held in memory as a whole.
+
+pyarrow is imported inside the functions; CSV-only runs do not need it.
+"""
+
+import os
+
+from heart_failure.schema import PATIENT_SCHEMA, compact
+
+FILE_FORMATS = ('csv', 'parquet', 'arrow')
+_EXTENSIONS = {
+    'csv': 'csv',
+    'parquet': 'parquet', 'pq': 'parquet',
+    'arrow': 'arrow', 'feather': 'arrow', 'ipc': 'arrow',
+}
+UPLOAD_TYPES = sorted(_EXTENSIONS)
+MIME_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+}
+
+
+def file_format(name):
+    """``'csv'``, ``'parquet'`` or ``'arrow'`` from a file name's extension."""
+    ext = os.path.splitext(os.fspath(name))[1].lstrip('.').lower()
+    if ext not in _EXTENSIONS:
+        raise ValueError(f"Unsupported file type {ext!r}; use one of {', '.join(UPLOAD_TYPES)}")
+    return _EXTENSIONS[ext]
+
+
+def _arrow_source(source):
+    """Memory map for a path, zero-copy buffer reader for bytes or an upload."""
+    import pyarrow as pa
+
+    if isinstance(source, (str, os.PathLike)):
+        return pa.memory_map(os.fspath(source), 'r')
+    if not isinstance(source, bytes):
+        source = source.getvalue() if hasattr(source, 'getvalue') else source.read()
+    return pa.BufferReader(pa.py_buffer(source))
+
+
+def _open_ipc(source):
+    import pyarrow as pa
+
+    stream = _arrow_source(source)
+    try:
+        return pa.ipc.open_file(stream)
+    except pa.ArrowInvalid:
+        stream.seek(0)
+        return pa.ipc.open_stream(stream)
+
+
+class ColumnarFile:
+    """A Parquet or Arrow IPC file split into row groups / record batches.
+
+    Parts are the unit of parallel work; ``read_parts(start, stop)`` reads a
+    contiguous range of them, projected to ``columns``.
+    """
+
+    def __init__(self, source, fmt):
+        import pyarrow.parquet as pq
+
+        self.fmt = fmt
+        if fmt == 'parquet':
+            if isinstance(source, (str, os.PathLike)):
+                self._file = pq.ParquetFile(os.fspath(source), memory_map=True)
+            else:
+                self._file = pq.ParquetFile(_arrow_source(source))
+            self.schema = self._file.schema_arrow
+            self.num_rows = self._file.metadata.num_rows
+            self.num_parts = self._file.num_row_groups
+        else:
+            reader = _open_ipc(source)
+            self.schema = reader.schema
+            if hasattr(reader, 'num_record_batches'):
+                self._batches = [reader.get_batch(i) for i in range(reader.num_record_batches)]
+            else:
+                self._batches = list(reader)
+            self.num_rows = sum(batch.num_rows for batch in self._batches)
+            self.num_parts = len(self._batches)
+
+    @property
+    def columns(self):
+        return self.schema.names
+
+    def part_rows(self):
+        if self.fmt == 'parquet':
+            return [self._file.metadata.row_group(i).num_rows for i in range(self.num_parts)]
+        return [batch.num_rows for batch in self._batches]
+
+    def read_parts(self, start, stop, columns=None):
+        """``pa.Table`` of parts ``[start, stop)``."""
+        import pyarrow as pa
+
+        stop = self.num_parts if stop is None else stop
+        if self.fmt == 'parquet':
+            return self._file.read_row_groups(range(start, stop), columns=columns)
+        table = pa.Table.from_batches(self._batches[start:stop], schema=self.schema)
+        return table.select(columns) if columns is not None else table
+
+    def iter_frames(self, chunk_rows, columns=None):
+        """Compacted DataFrames of at most ``chunk_rows`` rows, in file order."""
+        if self.fmt == 'parquet':
+            batches = self._file.iter_batches(batch_size=chunk_rows, columns=columns)
+        else:
+            batches = (
+                batch.slice(offset, chunk_rows)
+                for batch in self._batches for offset in range(0, batch.num_rows, chunk_rows)
+            )
+        for batch in batches:
+            if columns is not None and self.fmt == 'arrow':
+                batch = batch.select(columns)
+            yield compact(batch.to_pandas())
+
+    def head(self, n, columns=None):
+        return next(self.iter_frames(n, columns), None)
+
+
+def read_table(source, fmt, columns=None):
+    """Whole file as a compacted DataFrame."""
+    table = ColumnarFile(source, fmt).read_parts(0, None, columns)
+    return compact(table.to_pandas())
+
+
+def _output_schema(schema):
+    """``schema`` with integer patient columns widened to float32.
+
+    :func:`~heart_failure.schema.compact` narrows each chunk on its own, so
+    a column of whole numbers in the first chunk may hold 35.5 in a later
+    one. float32 holds every narrowed value exactly.
+    """
+    import pyarrow as pa
+
+    return pa.schema([
+        field.with_type(pa.float32())
+        if field.name in PATIENT_SCHEMA and pa.types.is_integer(field.type) else field
+        for field in schema
+    ])
+
+
+class ResultWriter:
+    """Append DataFrames (or Arrow tables) to a CSV, Parquet or Arrow IPC file.
+
+    The first write fixes the schema, with patient columns as float32 (see
+    :func:`_output_schema`); later chunks are cast to it.
+    """
+
+    def __init__(self, destination, fmt=None):
+        self.destination = destination
+        self.fmt = fmt or file_format(destination)
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self._header_written = False
+        self._out = open(destination, 'w', newline='') if self.fmt == 'csv' else None
+
+    def write(self, frame):
+        if self.fmt == 'csv':
+            frame.to_csv(self._out, header=not self._header_written, index=False)
+            self._header_written = True
+            self.rows += len(frame)
+            return
+        import pyarrow as pa
+
+        self.write_table(pa.Table.from_pandas(frame, preserve_index=False))
+
+    def write_table(self, table):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            self._schema = _output_schema(table.schema.remove_metadata())
+            if self.fmt == 'parquet':
+                self._writer = pq.ParquetWriter(self.destination, self._schema)
+            else:
+                self._out = pa.OSFile(os.fspath(self.destination), 'wb')
+                self._writer = pa.ipc.new_file(self._out, self._schema)
+        self._writer.write_table(table.replace_schema_metadata(None).cast(self._schema))
+        self.rows += table.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._out is not None:
+            self._out.close()
+        self._writer = self._out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
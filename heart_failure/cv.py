@@ -0,0 +1,190 @@
+"""Parallel stratified k-fold comparison of the SVM, ANN, Random Forest and
+Logistic Regression models.
+
+The parent process standardizes every fold once (scaler fit on that fold's
+training rows only) and writes the stacked ``(folds, rows, features)``
+array to a ``.npy`` file. Workers memory-map it read-only, so all of them
+share one copy of the data in the page cache. Every ``(model, fold)`` pair
+is an independent task with a fixed seed, so results do not depend on the
+number of workers.
+
+    python -m heart_failure.cv --folds 5 --workers 4
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from heart_failure.bundle import content_hash
+from heart_failure.evaluation import classification_metrics, confusion_matrix, threshold_curves
+from heart_failure.model import DATA_DIR, DATASET_PATH, FEATURE_COLUMNS, TARGET_COLUMN
+from heart_failure.training import MODEL_NAMES, fit_model
+
+CV_RESULTS_PATH = DATA_DIR / 'cv_results.json'
+DEFAULT_FOLDS = 5
+DEFAULT_SEED = 42
+METRICS = ('accuracy', 'precision', 'recall', 'f1', 'roc_auc')
+
+
+def prepare_folds(X, y, n_folds=DEFAULT_FOLDS, seed=DEFAULT_SEED, directory=None):
+    """Write per-fold standardized features and fold ids as ``.npy`` files.
+
+    Returns ``(directory, n_folds)``; ``fold_id[i]`` is the fold in which row
+    ``i`` is a test row.
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.int64)
+    fold_id = np.empty(len(y), dtype=np.int64)
+    scaled = np.lib.format.open_memmap(
+        os.path.join(directory, 'X.npy'), mode='w+', dtype=np.float32, shape=(n_folds,) + X.shape
+    )
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    for k, (train, test) in enumerate(splitter.split(X, y)):
+        fold_id[test] = k
+        mean = X[train].mean(axis=0)
+        scale = X[train].std(axis=0)
+        scale[scale == 0] = 1.0
+        scaled[k] = (X - mean) / scale
+    scaled.flush()
+    del scaled
+    np.save(os.path.join(directory, 'y.npy'), y)
+    np.save(os.path.join(directory, 'fold_id.npy'), fold_id)
+    return directory, n_folds
+
+
+def _limit_threads():
+    # One core per worker: stop BLAS/OpenMP/TensorFlow from oversubscribing
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS',
+                'TF_NUM_INTEROP_THREADS'):
+        os.environ[var] = '1'
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(1)
+
+
+def _run_fold(task):
+    """Fit one model on one fold's training rows and score its test rows."""
+    name, fold, directory, seed = task
+    X = np.load(os.path.join(directory, 'X.npy'), mmap_mode='r')[fold]
+    y = np.load(os.path.join(directory, 'y.npy'), mmap_mode='r')
+    test = np.load(os.path.join(directory, 'fold_id.npy'), mmap_mode='r') == fold
+
+    start = time.perf_counter()
+    scores_fn, threshold = fit_model(name, X[~test], y[~test], seed=seed)
+    scores = np.asarray(scores_fn(X[test]), dtype=np.float64)
+    seconds = time.perf_counter() - start
+
+    y_test = np.asarray(y[test])
+    metrics = classification_metrics(confusion_matrix(y_test, scores >= threshold))
+    metrics['roc_auc'] = threshold_curves(y_test, scores)['roc_auc']
+    return name, fold, {k: float(v) for k, v in metrics.items()}, seconds
+
+
+def available_models(models=MODEL_NAMES):
+    """``models`` minus the ANN when TensorFlow is not installed."""
+    if 'ANN' in models and importlib.util.find_spec('tensorflow') is None:
+        return [m for m in models if m != 'ANN']
+    return list(models)
+
+
+def cross_validate(X, y, models=MODEL_NAMES, n_folds=DEFAULT_FOLDS, workers=None, seed=DEFAULT_SEED):
+    """Per-model fold metrics, mean/std and wall time, run across a process pool."""
+    workers = workers or os.cpu_count() or 1
+    directory = tempfile.mkdtemp(prefix='heart_failure_cv_')
+    try:
+        prepare_folds(X, y, n_folds, seed, directory)
+        # Seeds depend only on (model, fold), never on scheduling
+        tasks = [
+            (name, fold, directory, seed + 1000 * MODEL_NAMES.index(name) + fold)
+            for name in models for fold in range(n_folds)
+        ]
+        start = time.perf_counter()
+        if workers == 1:
+            _limit_threads()
+            outcomes = list(map(_run_fold, tasks))
+        else:
+            # Workers are spawned rather than forked so TensorFlow starts cleanly in each
+            import multiprocessing
+
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_limit_threads) as executor:
+                outcomes = list(executor.map(_run_fold, tasks))
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    results = {}
+    for name in models:
+        rows = sorted((fold, metrics, seconds) for n, fold, metrics, seconds in outcomes if n == name)
+        folds = [metrics for _, metrics, _ in rows]
+        results[name] = {
+            'mean': {m: float(np.mean([f[m] for f in folds])) for m in METRICS},
+            'std': {m: float(np.std([f[m] for f in folds])) for m in METRICS},
+            'folds': folds,
+            'wall_seconds': float(sum(seconds for _, _, seconds in rows)),
+        }
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'n_folds': n_folds,
+        'n_rows': int(len(y)),
+        'seed': seed,
+        'workers': workers,
+        'elapsed_seconds': elapsed,
+        'models': results,
+    }
+
+
+def load_cv_results(path=CV_RESULTS_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def cv_key(path=CV_RESULTS_PATH):
+    """Content hash of the saved report, or None when it has not been run."""
+    return content_hash(path) if os.path.exists(path) else None
+
+
+def main(argv=None):
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Stratified k-fold comparison of the four models")
+    parser.add_argument('--data', default=str(DATASET_PATH), help="CSV with features and DEATH_EVENT")
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--models', nargs='+', default=list(MODEL_NAMES), choices=MODEL_NAMES)
+    parser.add_argument('-o', '--output', default=str(CV_RESULTS_PATH))
+    args = parser.parse_args(argv)
+
+    models = available_models(args.models)
+    for skipped in sorted(set(args.models) - set(models)):
+        print(f"skipping {skipped}: TensorFlow is not installed")
+
+    df = pd.read_csv(args.data)
+    report = cross_validate(df[FEATURE_COLUMNS].to_numpy(), df[TARGET_COLUMN].to_numpy(),
+                            models, args.folds, args.workers, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'model':<22}" + ''.join(f"{m:>11}" for m in METRICS) + f"{'wall s':>9}")
+    for name, result in report['models'].items():
+        print(f"{name:<22}" + ''.join(f"{result['mean'][m]:>11.3f}" for m in METRICS)
+              + f"{result['wall_seconds']:>9.2f}")
+    print(f"{report['elapsed_seconds']:.2f} s elapsed with {report['workers']} workers -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,232 @@
+"""Offline evaluation of the SVM and ANN behind the Model Performance page.
+
+Reproduces the notebook's held-out split (StandardScaler on the full
+dataset, ``train_test_split(test_size=0.2, random_state=42)``), refits the
+notebook's ``SVC`` on the training part, scores the shipped ANN bundle, and
+stores metrics, confusion matrices, ROC/PR curves and calibration curves
+in one compressed ``.npz``. The page only loads that file.
+
+    python -m heart_failure.evaluation [--history]
+
+``--history`` re-runs the notebook's Keras training recipe to record loss
+curves, since ``model.h5`` does not keep them; it needs TensorFlow.
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from heart_failure.bundle import content_hash, get_bundle
+from heart_failure.model import DATA_DIR, DATASET_PATH, FEATURE_COLUMNS, TARGET_COLUMN
+
+EVALUATION_PATH = DATA_DIR / 'evaluation.npz'
+EVALUATION_FORMAT_VERSION = 1
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+CALIBRATION_BINS = 10
+
+MODEL_NAMES = {
+    'svm': "Support Vector Machine (SVM)",
+    'ann': "Artificial Neural Network (ANN)",
+}
+_CURVE_ARRAYS = (
+    'confusion_matrix', 'thresholds', 'fpr', 'tpr', 'pr_precision', 'pr_recall',
+    'calibration_predicted', 'calibration_observed', 'calibration_count',
+)
+
+
+# ======================== METRICS ========================
+
+def confusion_matrix(y_true, y_pred):
+    """2x2 ``[[tn, fp], [fn, tp]]`` from one bincount."""
+    return np.bincount(2 * np.asarray(y_true, dtype=np.int64) + np.asarray(y_pred, dtype=np.int64),
+                       minlength=4).reshape(2, 2)
+
+
+def classification_metrics(cm):
+    (tn, fp), (fn, tp) = cm.tolist()
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {
+        'accuracy': (tp + tn) / max(cm.sum(), 1),
+        'precision': precision,
+        'recall': recall,
+        'f1': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+    }
+
+
+def threshold_curves(y_true, scores):
+    """ROC and precision-recall curves from a single descending sort.
+
+    Every distinct score is a threshold; cumulative true/false positive
+    counts at those cut points give both curves at once.
+    """
+    y_true = np.asarray(y_true, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+    order = np.argsort(-scores, kind='mergesort')
+    y_sorted = y_true[order]
+    scores = scores[order]
+
+    cut = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+    tps = np.cumsum(y_sorted)[cut]
+    fps = cut + 1 - tps
+    positives, negatives = max(tps[-1], 1), max(fps[-1], 1)
+
+    fpr = np.r_[0.0, fps / negatives]
+    tpr = np.r_[0.0, tps / positives]
+    precision = tps / (tps + fps)
+    recall = tps / positives
+    return {
+        'thresholds': scores[cut],
+        'fpr': fpr,
+        'tpr': tpr,
+        'pr_precision': np.r_[1.0, precision],
+        'pr_recall': np.r_[0.0, recall],
+        'roc_auc': float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2)),
+        'average_precision': float(np.sum(np.diff(np.r_[0.0, recall]) * precision)),
+    }
+
+
+def calibration_curve(y_true, probabilities, n_bins=CALIBRATION_BINS):
+    """Mean predicted vs. observed positive rate in equal-width probability bins."""
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    bins = np.minimum((probabilities * n_bins).astype(np.int64), n_bins - 1)
+    count = np.bincount(bins, minlength=n_bins)
+    predicted = np.bincount(bins, weights=probabilities, minlength=n_bins)
+    observed = np.bincount(bins, weights=np.asarray(y_true, dtype=np.float64), minlength=n_bins)
+    keep = count > 0
+    return {
+        'calibration_predicted': predicted[keep] / count[keep],
+        'calibration_observed': observed[keep] / count[keep],
+        'calibration_count': count[keep],
+    }
+
+
+def evaluate_scores(y_true, y_pred, scores, probabilities):
+    """Everything the page shows for one model."""
+    cm = confusion_matrix(y_true, y_pred)
+    result = {'confusion_matrix': cm, **classification_metrics(cm)}
+    result.update(threshold_curves(y_true, scores))
+    result.update(calibration_curve(y_true, probabilities))
+    return result
+
+
+# ======================== DATA & MODELS ========================
+
+def notebook_split(bundle=None, dataset_path=DATASET_PATH):
+    """``(X_train, X_test, y_train, y_test)`` exactly as the notebook builds them."""
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    bundle = bundle or get_bundle()
+    df = pd.read_csv(dataset_path)
+    X = bundle.standardize(df[FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+    y = df[TARGET_COLUMN].to_numpy(dtype=np.int64)
+    return train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+
+
+def evaluate_svm(X_train, X_test, y_train, y_test):
+    from sklearn.svm import SVC
+
+    # probability=True only adds Platt scaling for the calibration curve;
+    # predict() and decision_function() match the notebook's plain SVC().
+    model = SVC(probability=True, random_state=RANDOM_STATE).fit(X_train, y_train)
+    return evaluate_scores(
+        y_test, model.predict(X_test), model.decision_function(X_test), model.predict_proba(X_test)[:, 1]
+    )
+
+
+def evaluate_ann(bundle, X_test, y_test):
+    probabilities = bundle.network.predict_proba(X_test).astype(np.float64)
+    return evaluate_scores(y_test, (probabilities >= 0.5).astype(np.int64), probabilities, probabilities)
+
+
+def ann_training_history(X_train, y_train, seed=RANDOM_STATE):
+    """Loss/accuracy curves from re-running the notebook's Keras training cell."""
+    from heart_failure.training import fit_ann
+
+    _, history = fit_ann(X_train, y_train, seed=seed)
+    return history
+
+
+# ======================== ARTIFACT ========================
+
+def run_evaluation(with_history=False):
+    bundle = get_bundle()
+    X_train, X_test, y_train, y_test = notebook_split(bundle)
+    results = {
+        'svm': evaluate_svm(X_train, X_test, y_train, y_test),
+        'ann': evaluate_ann(bundle, X_test, y_test),
+    }
+    history = ann_training_history(X_train, y_train) if with_history else None
+    metadata = {
+        'format_version': EVALUATION_FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'bundle_version': bundle.version,
+        'dataset_sha256': bundle.metadata.get('dataset_sha256'),
+        'test_size': TEST_SIZE,
+        'random_state': RANDOM_STATE,
+        'n_train': int(len(y_train)),
+        'n_test': int(len(y_test)),
+        'history_source': 'notebook recipe re-run' if history else None,
+    }
+    return metadata, results, history
+
+
+def save_evaluation(metadata, results, history=None, path=EVALUATION_PATH):
+    arrays = {}
+    metadata = dict(metadata, metrics={})
+    for key, result in results.items():
+        metadata['metrics'][key] = {
+            name: value for name, value in result.items() if name not in _CURVE_ARRAYS
+        }
+        for name in _CURVE_ARRAYS:
+            arrays[f'{key}__{name}'] = result[name]
+    for name, values in (history or {}).items():
+        arrays[f'history__{name}'] = values
+    arrays['metadata'] = np.array(json.dumps(metadata, sort_keys=True))
+    with open(path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+
+
+def load_evaluation(path=EVALUATION_PATH):
+    """``{'metadata', 'models': {key: metrics and curves}, 'history'}`` from disk."""
+    with np.load(path, allow_pickle=False) as data:
+        metadata = json.loads(str(data['metadata']))
+        if metadata.get('format_version') != EVALUATION_FORMAT_VERSION:
+            raise ValueError(f"Unsupported evaluation format {metadata.get('format_version')!r} in {path}")
+        models = {}
+        for key, metrics in metadata['metrics'].items():
+            models[key] = dict(metrics, **{name: data[f'{key}__{name}'] for name in _CURVE_ARRAYS})
+        history = {
+            name.split('__', 1)[1]: data[name] for name in data.files if name.startswith('history__')
+        }
+    return {'metadata': metadata, 'models': models, 'history': history or None}
+
+
+def evaluation_key(path=EVALUATION_PATH):
+    """Content hash of the saved evaluation, or None when it has not been run."""
+    return content_hash(path) if os.path.exists(path) else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate the SVM and ANN on the notebook's held-out split")
+    parser.add_argument('-o', '--output', default=str(EVALUATION_PATH))
+    parser.add_argument('--history', action='store_true',
+                        help="Re-run the notebook's Keras training to record loss curves (needs TensorFlow)")
+    args = parser.parse_args(argv)
+
+    metadata, results, history = run_evaluation(with_history=args.history)
+    save_evaluation(metadata, results, history, args.output)
+    for key, result in results.items():
+        print(f"{key}: accuracy={result['accuracy']:.3f} precision={result['precision']:.3f} "
+              f"recall={result['recall']:.3f} f1={result['f1']:.3f} auc={result['roc_auc']:.3f}")
+    print(f"wrote {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
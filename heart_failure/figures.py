@@ -0,0 +1,65 @@
+"""Plotly figures built from server-side aggregates.
+
+Every trace here carries a fixed number of points (histogram bins or five
+box-plot statistics), so the serialized figure stays a few kilobytes
+however many rows were summarized.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+CLASS_COLORS = ['#28A745', '#DC3545']
+
+
+def count_bar(counts, title, x_title, colors=CLASS_COLORS):
+    """Bar chart of pre-counted categories, e.g. ``value_counts()``."""
+    fig = go.Figure(go.Bar(
+        x=[str(k) for k in counts.index],
+        y=counts.to_numpy(),
+        marker=dict(color=[colors[i % len(colors)] for i in range(len(counts))]),
+    ))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title='count')
+    return fig
+
+
+def _box_trace(stats, name, color, horizontal=False):
+    position = 'y' if horizontal else 'x'
+    return go.Box(
+        **{position: [name]},
+        q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+        lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']],
+        mean=[stats['mean']],
+        orientation='h' if horizontal else 'v',
+        name=name,
+        marker_color=color,
+        boxpoints=False,
+    )
+
+
+def histogram_with_box(counts, edges, box, title, color='#667eea'):
+    """Binned histogram with a marginal box plot, like ``px.histogram(marginal='box')``."""
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.03)
+    if box is not None:
+        fig.add_trace(_box_trace(box, '', color, horizontal=True), row=1, col=1)
+    fig.add_trace(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker=dict(color=color),
+        name='count',
+    ), row=2, col=1)
+    fig.update_layout(title=title, showlegend=False, bargap=0)
+    fig.update_yaxes(showticklabels=False, row=1, col=1)
+    fig.update_yaxes(title_text='count', row=2, col=1)
+    return fig
+
+
+def box_by_class(box_stats, feature, x_title, colors=CLASS_COLORS):
+    """One precomputed box per class, like ``px.box(x=target, y=feature)``."""
+    fig = go.Figure()
+    for i, (key, stats) in enumerate(box_stats.items()):
+        if stats is not None:
+            fig.add_trace(_box_trace(stats, str(key), colors[i % len(colors)]))
+    fig.update_layout(title=f"{feature} by Death Event", xaxis_title=x_title, yaxis_title=feature, showlegend=False)
+    return fig
@@ -0,0 +1,263 @@
+"""Per-stage timing for batch scoring, the app pages and the service.
+
+    with stage('batch.predict', rows=len(frame)):
+        ...
+
+Each stage records its wall time, row count and change in resident memory
+into the process-wide :data:`METRICS` registry, which keeps running totals
+per stage plus the most recent records. The registry can be rendered in
+the Prometheus text format (``/metrics`` on the prediction service,
+``--metrics-port``/``--metrics-file`` on the CLI) and every record can be
+written as one JSON line to a log (``HF_METRICS_LOG=<path>`` or ``-`` for
+stderr).
+
+A stage costs two ``perf_counter`` calls and two reads of
+``/proc/self/statm``, so it belongs around chunks and page sections, not
+around single rows.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import NamedTuple
+
+# Upper bounds (seconds) of the Prometheus histogram buckets
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+RECENT_STAGES = 500
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+log = logging.getLogger('heart_failure.metrics')
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss():
+    """Resident memory of this process in bytes (peak RSS where /proc is missing)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class StageRecord(NamedTuple):
+    """One timed run of a stage."""
+    stage: str
+    seconds: float
+    rows: int
+    rss_delta_bytes: int
+    timestamp: float   # ``time.time()`` when the stage ended
+    pid: int
+
+
+class _Stage:
+    """Handle yielded by :meth:`MetricsRegistry.stage`; set ``rows`` once known."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+
+class _Totals:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.last_rss_delta = 0
+        self.buckets = [0] * len(STAGE_BUCKETS)
+
+    def add(self, record):
+        self.count += 1
+        self.seconds += record.seconds
+        self.max_seconds = max(self.max_seconds, record.seconds)
+        self.rows += record.rows
+        self.last_rss_delta = record.rss_delta_bytes
+        for i, bound in enumerate(STAGE_BUCKETS):
+            if record.seconds <= bound:
+                self.buckets[i] += 1
+
+
+class MetricsRegistry:
+    """Thread-safe per-stage totals plus a window of recent :class:`StageRecord`."""
+
+    def __init__(self, recent=RECENT_STAGES):
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._recent = deque(maxlen=recent)
+        self._undrained = deque(maxlen=recent)
+
+    @contextmanager
+    def stage(self, name, rows=0):
+        handle = _Stage(rows)
+        rss = current_rss()
+        start = time.perf_counter()
+        try:
+            yield handle
+        finally:
+            seconds = time.perf_counter() - start
+            self.record(StageRecord(name, seconds, int(handle.rows or 0), current_rss() - rss,
+                                    time.time(), os.getpid()))
+
+    def record(self, record):
+        with self._lock:
+            self._totals.setdefault(record.stage, _Totals()).add(record)
+            self._recent.append(record)
+            self._undrained.append(record)
+        if log.handlers and log.isEnabledFor(logging.INFO):
+            log.info(json.dumps(record._asdict()))
+
+    def merge(self, records):
+        """Add records timed in another process, e.g. a batch worker.
+
+        They are logged here, so workers should run :func:`detach_json_log`.
+        """
+        for record in records:
+            self.record(StageRecord(*record))
+
+    def drain(self):
+        """Records added since the last drain, as plain tuples for pickling to a parent."""
+        with self._lock:
+            records = [tuple(record) for record in self._undrained]
+            self._undrained.clear()
+        return records
+
+    def recent(self, since=None):
+        with self._lock:
+            return [r for r in self._recent if since is None or r.timestamp >= since]
+
+    def summary(self):
+        """``{stage: {count, seconds, mean_seconds, max_seconds, rows, rows_per_second}}``."""
+        with self._lock:
+            return {
+                name: {
+                    'count': totals.count,
+                    'seconds': totals.seconds,
+                    'mean_seconds': totals.seconds / totals.count,
+                    'max_seconds': totals.max_seconds,
+                    'rows': totals.rows,
+                    'rows_per_second': totals.rows / totals.seconds if totals.seconds else None,
+                    'last_rss_delta_bytes': totals.last_rss_delta,
+                }
+                for name, totals in sorted(self._totals.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+            self._recent.clear()
+            self._undrained.clear()
+
+    def prometheus(self, prefix='hf'):
+        """All totals in the Prometheus text exposition format."""
+        with self._lock:
+            totals = sorted(self._totals.items())
+            lines = [
+                f"# HELP {prefix}_stage_seconds Wall time of each pipeline stage.",
+                f"# TYPE {prefix}_stage_seconds histogram",
+            ]
+            for name, t in totals:
+                label = _label(name)
+                for bound, count in zip(STAGE_BUCKETS, t.buckets):
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{label}",le="{bound}"}} {count}')
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{label}",le="+Inf"}} {t.count}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{label}"}} {t.seconds!r}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{label}"}} {t.count}')
+            lines += [
+                f"# HELP {prefix}_stage_rows_total Rows processed by each stage.",
+                f"# TYPE {prefix}_stage_rows_total counter",
+            ]
+            lines += [f'{prefix}_stage_rows_total{{stage="{_label(n)}"}} {t.rows}' for n, t in totals]
+            lines += [
+                f"# HELP {prefix}_stage_rss_delta_bytes Resident memory change over the stage's last run.",
+                f"# TYPE {prefix}_stage_rss_delta_bytes gauge",
+            ]
+            lines += [f'{prefix}_stage_rss_delta_bytes{{stage="{_label(n)}"}} {t.last_rss_delta}'
+                      for n, t in totals]
+        lines += [
+            f"# HELP {prefix}_process_resident_memory_bytes Resident memory of this process.",
+            f"# TYPE {prefix}_process_resident_memory_bytes gauge",
+            f"{prefix}_process_resident_memory_bytes {current_rss()}",
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+METRICS = MetricsRegistry()
+
+
+def stage(name, rows=0):
+    """:meth:`MetricsRegistry.stage` on the process-wide :data:`METRICS`."""
+    return METRICS.stage(name, rows)
+
+
+def timed_iter(iterable, name, rows=len):
+    """Yield from ``iterable``, timing each ``next()`` as stage ``name``.
+
+    Use it for lazy readers whose parsing happens inside iteration;
+    ``rows(item)`` gives each item's row count.
+    """
+    iterator = iter(iterable)
+    while True:
+        rss = current_rss()
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        METRICS.record(StageRecord(name, time.perf_counter() - start, rows(item),
+                                   current_rss() - rss, time.time(), os.getpid()))
+        yield item
+
+
+def configure_json_log(destination):
+    """Write every stage record as a JSON line to a file path, or stderr for ``'-'``."""
+    import sys
+
+    handler = logging.StreamHandler(sys.stderr) if destination == '-' else logging.FileHandler(destination)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    return handler
+
+
+def detach_json_log():
+    """Drop log handlers inherited by a forked worker; its parent logs the merged records."""
+    for handler in list(log.handlers):
+        log.removeHandler(handler)
+
+
+def serve_metrics(port, host='127.0.0.1', registry=METRICS):
+    """Serve ``GET /metrics`` from a daemon thread; returns the server (``shutdown()`` to stop)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if os.environ.get('HF_METRICS_LOG'):
+    configure_json_log(os.environ['HF_METRICS_LOG'])
@@ -0,0 +1,307 @@
+"""Pure-NumPy inference for the notebook's Keras ANN.
+
+The weights are read straight from ``model.h5`` with h5py. Dropout is the
+identity at inference time and every BatchNormalization is an affine map,
+so both disappear into the neighbouring Dense kernels and a forward pass is
+three small matrix products. TensorFlow is only needed for the optional
+parity check in :func:`main`.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT_DIR / 'heart_failure_clinical'
+MODEL_PATH = DATA_DIR / 'model.h5'
+DATASET_PATH = DATA_DIR / 'heart_failure_clinical_records_dataset.csv'
+
+# Column order of the notebook's ``X = df.drop('DEATH_EVENT', axis=1)``.
+FEATURE_COLUMNS = [
+    'age',
+    'anaemia',
+    'creatinine_phosphokinase',
+    'diabetes',
+    'ejection_fraction',
+    'high_blood_pressure',
+    'platelets',
+    'serum_creatinine',
+    'serum_sodium',
+    'sex',
+    'smoking',
+    'time',
+]
+TARGET_COLUMN = 'DEATH_EVENT'
+
+
+def _relu(z):
+    return np.maximum(z, 0, out=z)
+
+
+def _sigmoid(z):
+    # exp(-z) overflows to inf for very negative z, which correctly gives 0.
+    with np.errstate(over='ignore'):
+        np.negative(z, out=z)
+        np.exp(z, out=z)
+        z += 1
+        np.reciprocal(z, out=z)
+    return z
+
+
+def _tanh(z):
+    return np.tanh(z, out=z)
+
+
+_ACTIVATIONS = {
+    'linear': None,
+    'relu': _relu,
+    'sigmoid': _sigmoid,
+    'tanh': _tanh,
+}
+
+
+def as_feature_matrix(X, n_features=len(FEATURE_COLUMNS), dtype=np.float32):
+    """``(N, n_features)`` array from a DataFrame, one row, or a matrix."""
+    if hasattr(X, 'columns'):
+        X = X[FEATURE_COLUMNS].to_numpy()
+    X = np.asarray(X, dtype=dtype)
+    if X.ndim == 1:
+        X = X[None, :]
+    if X.ndim != 2 or X.shape[1] != n_features:
+        raise ValueError(
+            f"Expected an (N, {n_features}) matrix, got shape {X.shape}"
+        )
+    return X
+
+
+class FoldedANN:
+    """A stack of ``(kernel, bias, activation)`` layers with no normalization left.
+
+    Folding is done in float64 and the result is cast once to ``dtype``.
+    """
+
+    def __init__(self, layers, dtype=np.float32):
+        self.dtype = np.dtype(dtype)
+        self.layers = []
+        for kernel, bias, activation in layers:
+            if activation not in _ACTIVATIONS:
+                raise ValueError(f"Unsupported activation {activation!r}")
+            self.layers.append((
+                np.ascontiguousarray(kernel, dtype=self.dtype),
+                np.ascontiguousarray(bias, dtype=self.dtype),
+                activation,
+            ))
+
+    @property
+    def n_features(self):
+        return self.layers[0][0].shape[0]
+
+    @property
+    def n_outputs(self):
+        return self.layers[-1][0].shape[1]
+
+    def with_scaler(self, mean, scale):
+        """Return a copy that takes raw features.
+
+        ``(x - mean) / scale`` is affine, so it is absorbed into the first
+        kernel and bias instead of being applied to every row.
+        """
+        mean = np.asarray(mean, dtype=np.float64)
+        scale = np.asarray(scale, dtype=np.float64)
+        kernel, bias, activation = self.layers[0]
+        kernel = kernel.astype(np.float64)
+        folded = (
+            kernel / scale[:, None],
+            bias.astype(np.float64) - (mean / scale) @ kernel,
+            activation,
+        )
+        return FoldedANN([folded] + self.layers[1:], dtype=self.dtype)
+
+    def _as_matrix(self, X):
+        return as_feature_matrix(X, self.n_features, self.dtype)
+
+    def _forward(self, X):
+        h = X
+        for kernel, bias, activation in self.layers:
+            h = h @ kernel
+            h += bias
+            if activation != 'linear':
+                _ACTIVATIONS[activation](h)
+        return h
+
+    def predict(self, X, batch_size=65536):
+        """Return the ``(N, n_outputs)`` network output for an ``(N, 12)`` input.
+
+        Rows are pushed through in blocks of ``batch_size`` so the hidden
+        activations stay cache-sized regardless of N.
+        """
+        X = self._as_matrix(X)
+        out = np.empty((len(X), self.n_outputs), dtype=self.dtype)
+        for start in range(0, len(X), batch_size):
+            stop = start + batch_size
+            out[start:stop] = self._forward(X[start:stop])
+        return out
+
+    def predict_proba(self, X, batch_size=65536):
+        """Return the DEATH_EVENT probability for every row as a 1-D array."""
+        return self.predict(X, batch_size=batch_size)[:, 0]
+
+
+def _attr_str(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else str(value)
+
+
+def _layer_weights(weights_group, layer_name):
+    """Map ``kernel``/``bias``/``gamma``/... to arrays for one saved layer.
+
+    Handles both the Keras 2 (``dense/kernel:0``) and the Keras 3
+    (``sequential/dense/kernel``) weight naming.
+    """
+    if layer_name not in weights_group:
+        return {}
+    group = weights_group[layer_name]
+    weights = {}
+    for name in group.attrs.get('weight_names', []):
+        name = _attr_str(name)
+        key = name.rsplit('/', 1)[-1].split(':', 1)[0]
+        weights[key] = np.asarray(group[name], dtype=np.float64)
+    return weights
+
+
+def load_keras_h5(path=MODEL_PATH, dtype=np.float32):
+    """Load a Sequential Dense/BatchNormalization/Dropout model from HDF5.
+
+    A BatchNormalization that follows a linear Dense is folded backwards
+    into it. The notebook's network applies BatchNormalization after a
+    ReLU, where that is impossible, so the normalization is instead folded
+    forwards into the next Dense: ``W @ (a * h + c) + b`` becomes
+    ``(a[:, None] * W) @ h + (c @ W + b)``.
+    """
+    import h5py
+
+    with h5py.File(path, 'r') as f:
+        config = json.loads(_attr_str(f.attrs['model_config']))
+        weights_group = f['model_weights'] if 'model_weights' in f else f
+
+        layer_configs = config['config']
+        if isinstance(layer_configs, dict):
+            layer_configs = layer_configs['layers']
+
+        layers = []
+        pending = None  # (scale, shift) of a BatchNormalization awaiting a Dense
+        for layer in layer_configs:
+            kind = layer['class_name']
+            cfg = layer['config']
+            if kind in ('InputLayer', 'Dropout'):
+                continue
+
+            weights = _layer_weights(weights_group, cfg['name'])
+            if kind == 'Dense':
+                kernel = weights['kernel']
+                bias = weights.get('bias', np.zeros(kernel.shape[1]))
+                if pending is not None:
+                    scale, shift = pending
+                    bias = shift @ kernel + bias
+                    kernel = scale[:, None] * kernel
+                    pending = None
+                layers.append([kernel, bias, cfg.get('activation', 'linear')])
+
+            elif kind == 'BatchNormalization':
+                mean = weights['moving_mean']
+                gamma = weights.get('gamma', np.ones_like(mean))
+                beta = weights.get('beta', np.zeros_like(mean))
+                scale = gamma / np.sqrt(weights['moving_variance'] + cfg.get('epsilon', 1e-3))
+                shift = beta - mean * scale
+                if pending is not None:
+                    pending = (pending[0] * scale, pending[1] * scale + shift)
+                elif layers and layers[-1][2] == 'linear':
+                    layers[-1][0] = layers[-1][0] * scale
+                    layers[-1][1] = layers[-1][1] * scale + shift
+                else:
+                    pending = (scale, shift)
+
+            else:
+                raise ValueError(f"Unsupported layer type {kind!r} in {path}")
+
+        if pending is not None:
+            raise ValueError("A trailing BatchNormalization cannot be folded into a Dense layer")
+
+    return FoldedANN(layers, dtype=dtype)
+
+
+def reference_scaler(path=DATASET_PATH):
+    """Mean and scale of the notebook's StandardScaler.
+
+    The notebook fits the scaler on the full bundled dataset, so the
+    population statistics of that file reproduce it exactly.
+    """
+    import pandas as pd
+
+    X = pd.read_csv(path, usecols=FEATURE_COLUMNS)[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    return X.mean(axis=0), scale
+
+
+# ======================== PARITY & BENCHMARK ========================
+
+def keras_parity(path=MODEL_PATH, n_random=10000, seed=0):
+    """Max absolute difference between this engine and ``keras.Model.predict``.
+
+    Scores the standardized bundled dataset plus ``n_random`` standard
+    normal rows. Requires TensorFlow.
+    """
+    from tensorflow import keras
+
+    import pandas as pd
+
+    mean, scale = reference_scaler()
+    raw = pd.read_csv(DATASET_PATH)[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    X = np.vstack([(raw - mean) / scale, rng.standard_normal((n_random, len(FEATURE_COLUMNS)))])
+
+    expected = keras.models.load_model(path, compile=False).predict(X.astype(np.float32), verbose=0)[:, 0]
+    actual = load_keras_h5(path).predict_proba(X)
+    return float(np.max(np.abs(actual - expected)))
+
+
+def benchmark(model, n_rows=1_000_000, repeat=5, seed=0):
+    """Best-of-``repeat`` throughput of :meth:`FoldedANN.predict_proba` in rows/sec."""
+    X = np.random.default_rng(seed).standard_normal((n_rows, model.n_features)).astype(model.dtype)
+    model.predict_proba(X[:1024])
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model.predict_proba(X)
+        best = min(best, time.perf_counter() - start)
+    return n_rows / best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NumPy ANN parity check and throughput benchmark")
+    parser.add_argument('--model', default=str(MODEL_PATH), help="Path to the Keras .h5 file")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Rows per benchmark run")
+    parser.add_argument('--repeat', type=int, default=5, help="Benchmark repetitions")
+    parser.add_argument('--keras', action='store_true', help="Also compare against Keras (needs TensorFlow)")
+    parser.add_argument('--tolerance', type=float, default=1e-5, help="Max allowed |numpy - keras|")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    model = load_keras_h5(args.model)
+    print(f"load: {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"throughput: {benchmark(model, args.rows, args.repeat):,.0f} rows/sec ({args.rows:,} rows)")
+
+    if args.keras:
+        diff = keras_parity(args.model)
+        print(f"keras parity: max |diff| = {diff:.2e}")
+        if diff > args.tolerance:
+            print(f"FAIL: exceeds tolerance {args.tolerance:.0e}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
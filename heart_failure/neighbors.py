@@ -0,0 +1,389 @@
+"""Similar-patient lookup over historical records.
+
+The index is a KD-tree over the 12 features, standardized with the model
+bundle's scaler. It is built once and saved as plain ``.npy`` files in
+:data:`NEIGHBOR_INDEX_DIR`, next to the bundle: the records in leaf
+order, each leaf's bounding box and record range, and the leaf range of
+every subtree at half the tree's depth (about sqrt(leaves) "groups").
+Loading memory-maps the records, so start-up costs the same for the
+299-patient dataset and for a registry of millions of patients.
+
+Nodes are cut between distinct values of their highest-variance feature,
+so the 0/1 flags and integer-valued features give tight boxes. A query
+is exact, and every step is vectorized over many boxes:
+
+1. Scan the leaves nearest to the patient until they hold ``k`` records;
+   the k-th distance among them bounds the answer.
+2. Keep the groups whose box is within that bound, then their leaves
+   whose box is, and scan those records.
+
+::
+
+    python -m heart_failure.neighbors build --data registry.parquet
+    python -m heart_failure.neighbors bench
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+import numpy as np
+
+from heart_failure.bundle import BUNDLE_PATH, content_hash, file_sha256
+from heart_failure.model import DATA_DIR, DATASET_PATH, FEATURE_COLUMNS, TARGET_COLUMN, reference_scaler
+from heart_failure.validation import FLAG_COLUMNS
+
+NEIGHBOR_INDEX_DIR = DATA_DIR / 'neighbor_index'
+INDEX_FORMAT_VERSION = 1
+DEFAULT_K = 5
+LEAF_SIZE = 128
+READ_CHUNK_ROWS = 500_000
+
+# Stored arrays -> memory-mapped on load
+_ARRAYS = {
+    'points': True,     # (N, 12) float32 standardized records in leaf order
+    'outcomes': True,   # (N,) DEATH_EVENT
+    'rows': True,       # (N,) row number of each record in the source file
+    'lower': False,     # (L, 12) per-leaf box
+    'upper': False,
+    'offsets': False,   # (L + 1,) leaf l holds records offsets[l]:offsets[l + 1]
+    'groups': False,    # (G + 1,) group g holds leaves groups[g]:groups[g + 1]
+}
+
+
+class Neighbors(NamedTuple):
+    """The ``k`` nearest records, nearest first."""
+    rows: np.ndarray        # row numbers in the source file
+    distances: np.ndarray   # Euclidean, in standard deviations
+    outcomes: np.ndarray    # DEATH_EVENT of each
+    features: np.ndarray    # (k, 12) clinical values
+
+
+def _split(points, order, start, stop):
+    """Reorder ``order[start:stop]`` around a cut; the cut's position, or None if there is none.
+
+    The cut is on the feature with the highest variance, at the distinct
+    value nearest the median.
+    """
+    ids = order[start:stop]
+    block = points[ids]
+    variance = block.var(axis=0, dtype=np.float64)
+    dim = int(variance.argmax())
+    if variance[dim] == 0:
+        return None
+    values = block[:, dim]
+    half = len(values) // 2
+    median = np.partition(values, half)[half]
+    below, at_or_below = values < median, values <= median
+    n_below, n_at_or_below = int(below.sum()), int(at_or_below.sum())
+    if n_below == 0 and n_at_or_below == len(values):
+        return None
+    if n_below == 0 or (n_at_or_below < len(values) and abs(n_at_or_below - half) < abs(n_below - half)):
+        below, n_below = at_or_below, n_at_or_below
+    order[start:stop] = np.concatenate([ids[below], ids[~below]])
+    return start + n_below
+
+
+def build_tree(points, leaf_size=LEAF_SIZE):
+    """``(order, offsets, groups)`` of a KD-tree's leaves over ``points``.
+
+    ``points[order]`` lists the records leaf by leaf. Leaves hold at most
+    ``leaf_size`` records unless they are all identical. ``groups`` are the
+    leaf ranges of the subtrees at half the expected depth.
+    """
+    order = np.arange(len(points))
+    group_depth = int(np.ceil(np.log2(max(len(points) / leaf_size, 1)) / 2))
+    starts, groups = [], []
+    stack = [(0, len(points), 0)]
+    while stack:
+        start, stop, depth = stack.pop()
+        cut = _split(points, order, start, stop) if stop - start > leaf_size else None
+        if depth == group_depth or (cut is None and depth < group_depth):
+            groups.append(len(starts))
+        if cut is None:
+            starts.append(start)
+            continue
+        # Right child pushed first, so leaves come off the stack left to right
+        stack.append((cut, stop, depth + 1))
+        stack.append((start, cut, depth + 1))
+    return (order, np.array(starts + [len(points)], dtype=np.int64),
+            np.array(groups + [len(starts)], dtype=np.int64))
+
+
+def _ranges(offsets, ids):
+    """Concatenated ``arange(offsets[i], offsets[i + 1])`` for every ``i`` in ``ids``."""
+    starts = offsets[ids]
+    counts = offsets[ids + 1] - starts
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+
+def _box_distances(lower, upper, point):
+    """Squared distance from ``point`` to each box; 0 inside it."""
+    gap = np.maximum(lower - point, 0)
+    gap += np.maximum(point - upper, 0)
+    return np.einsum('ij,ij->i', gap, gap)
+
+
+class NeighborIndex:
+    """Exact k-nearest-neighbor search over standardized patient records."""
+
+    def __init__(self, points, outcomes, rows, lower, upper, offsets, groups, metadata):
+        # Plain ndarray views of memory maps: still file-backed, without np.memmap's indexing overhead
+        self.points = np.asarray(points)
+        self.outcomes = np.asarray(outcomes)
+        self.rows = np.asarray(rows)
+        self.lower = np.asarray(lower)
+        self.upper = np.asarray(upper)
+        self.offsets = np.asarray(offsets)
+        self.groups = np.asarray(groups)
+        self.metadata = metadata
+        self.mean = np.asarray(metadata['scaler_mean'], dtype=np.float64)
+        self.scale = np.asarray(metadata['scaler_scale'], dtype=np.float64)
+        self._leaf_sizes = np.diff(self.offsets)
+        if len(self.points):
+            self._group_lower = np.minimum.reduceat(self.lower, self.groups[:-1], axis=0)
+            self._group_upper = np.maximum.reduceat(self.upper, self.groups[:-1], axis=0)
+
+    @classmethod
+    def from_records(cls, X, outcomes, rows, mean, scale, leaf_size=LEAF_SIZE, metadata=None):
+        """Index raw ``(N, 12)`` features standardized with ``(mean, scale)``."""
+        points = ((np.asarray(X, dtype=np.float64) - mean) / scale).astype(np.float32)
+        order, offsets, groups = build_tree(points, leaf_size)
+        points = points[order]
+        lower = np.minimum.reduceat(points, offsets[:-1], axis=0) if len(points) else points
+        upper = np.maximum.reduceat(points, offsets[:-1], axis=0) if len(points) else points
+        metadata = dict(
+            metadata or {},
+            format_version=INDEX_FORMAT_VERSION,
+            feature_columns=FEATURE_COLUMNS,
+            scaler_mean=np.asarray(mean, dtype=np.float64).tolist(),
+            scaler_scale=np.asarray(scale, dtype=np.float64).tolist(),
+            leaf_size=leaf_size,
+            n_rows=int(len(points)),
+            n_leaves=int(len(offsets) - 1),
+            n_groups=int(len(groups) - 1),
+            death_rate=float(np.mean(outcomes)) if len(points) else 0.0,
+        )
+        return cls(points, np.asarray(outcomes, dtype=np.uint8)[order], np.asarray(rows, dtype=np.int64)[order],
+                   lower, upper, offsets, groups, metadata)
+
+    @property
+    def n_rows(self):
+        return len(self.points)
+
+    def standardize(self, features):
+        """A ``{column: value}`` patient or 12 raw values as a float32 point."""
+        if isinstance(features, dict):
+            features = [features[column] for column in FEATURE_COLUMNS]
+        return ((np.asarray(features, dtype=np.float64) - self.mean) / self.scale).astype(np.float32)
+
+    def _distances(self, records, point):
+        diff = self.points[records] - point
+        return np.einsum('ij,ij->i', diff, diff)
+
+    def _nearest_leaves(self, group_bounds, point, k):
+        """Leaves nearest to ``point``, nearest groups first, holding at least ``k`` records."""
+        near, count = [], 0
+        for group in np.argsort(group_bounds):
+            leaves = np.arange(self.groups[group], self.groups[group + 1])
+            leaves = leaves[np.argsort(_box_distances(self.lower[leaves], self.upper[leaves], point))]
+            sizes = np.cumsum(self._leaf_sizes[leaves])
+            take = int(np.searchsorted(sizes, k - count)) + 1
+            near.append(leaves[:take])
+            count += int(sizes[min(take, len(sizes)) - 1])
+            if count >= k:
+                break
+        return np.concatenate(near)
+
+    def query(self, features, k=DEFAULT_K):
+        """:class:`Neighbors` of one patient (a ``{column: value}`` dict or 12 raw values)."""
+        point = self.standardize(features)
+        k = min(k, self.n_rows)
+        if k == 0:
+            empty = np.empty(0)
+            return Neighbors(empty.astype(np.int64), empty, empty.astype(np.uint8),
+                             np.empty((0, len(FEATURE_COLUMNS))))
+
+        group_bounds = _box_distances(self._group_lower, self._group_upper, point)
+        near = self._nearest_leaves(group_bounds, point, k)
+        radius = np.partition(self._distances(_ranges(self.offsets, near), point), k - 1)[k - 1]
+
+        # A closer record can only be in a leaf, and a group, whose box is nearer than the radius
+        leaves = _ranges(self.groups, np.flatnonzero(group_bounds < radius))
+        leaves = leaves[_box_distances(self.lower[leaves], self.upper[leaves], point) < radius]
+        records = _ranges(self.offsets, np.union1d(leaves, near))
+        distances = self._distances(records, point)
+
+        best = np.argpartition(distances, k - 1)[:k] if k < len(distances) else np.arange(len(distances))
+        best = best[np.argsort(distances[best], kind='stable')]
+        found = records[best]
+        return Neighbors(
+            self.rows[found],
+            np.sqrt(distances[best].astype(np.float64)),
+            self.outcomes[found],
+            self.points[found].astype(np.float64) * self.scale + self.mean,
+        )
+
+
+def neighbors_frame(neighbors):
+    """Display table of :class:`Neighbors`: distance, the 12 features and the outcome."""
+    import pandas as pd
+
+    from heart_failure.schema import compact
+
+    frame = pd.DataFrame(neighbors.features, columns=FEATURE_COLUMNS).round(2)
+    # float32 storage leaves platelet counts a few hundredths off
+    frame['platelets'] = frame['platelets'].round()
+    frame = compact(frame)
+    frame.insert(0, 'Distance', neighbors.distances.round(2))
+    frame.insert(0, 'Record', neighbors.rows)
+    frame[TARGET_COLUMN] = neighbors.outcomes
+    return frame
+
+
+# ======================== BUILD ========================
+
+def read_records(source, chunk_rows=READ_CHUNK_ROWS):
+    """``(X, outcomes, rows)`` of every valid labelled record in a CSV, Parquet or Arrow file.
+
+    Rows with invalid features or a DEATH_EVENT other than 0/1 are skipped;
+    ``rows`` keeps each record's position in the file.
+    """
+    import pandas as pd
+
+    from heart_failure.columnar import ColumnarFile, file_format
+    from heart_failure.schema import read_patient_csv
+    from heart_failure.validation import split_valid
+
+    fmt = file_format(source)
+    if fmt == 'csv':
+        reader = read_patient_csv(source, chunksize=chunk_rows)
+    else:
+        table = ColumnarFile(source, fmt)
+        reader = contextlib.nullcontext(table.iter_frames(chunk_rows, FEATURE_COLUMNS + [TARGET_COLUMN]))
+
+    blocks, outcomes, rows = [], [], []
+    offset = 0
+    with reader as chunks:
+        for chunk in chunks:
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            valid, _ = split_valid(chunk)
+            target = pd.to_numeric(valid[TARGET_COLUMN], errors='coerce')
+            valid = valid[target.isin([0, 1])]
+            blocks.append(valid[FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+            outcomes.append(target[valid.index].to_numpy(dtype=np.uint8))
+            rows.append(valid.index.to_numpy(dtype=np.int64))
+    if not blocks:
+        return np.empty((0, len(FEATURE_COLUMNS))), np.empty(0, dtype=np.uint8), np.empty(0, dtype=np.int64)
+    return np.concatenate(blocks), np.concatenate(outcomes), np.concatenate(rows)
+
+
+def build_index(source=DATASET_PATH, scaler=None, leaf_size=LEAF_SIZE):
+    """Index the records of ``source``; ``scaler`` is the bundle's ``(mean, scale)``.
+
+    Without ``scaler`` the notebook's scaler is refitted on the dataset,
+    which is what the default bundle uses.
+    """
+    mean, scale = scaler if scaler is not None else reference_scaler(DATASET_PATH)
+    X, outcomes, rows = read_records(source)
+    metadata = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'source': os.path.basename(source),
+        'source_sha256': file_sha256(source),
+    }
+    return NeighborIndex.from_records(X, outcomes, rows, mean, scale, leaf_size, metadata)
+
+
+def save_index(index, directory=NEIGHBOR_INDEX_DIR):
+    """Write the index as ``.npy`` files plus ``metadata.json``, replacing any previous one."""
+    directory = os.fspath(directory)
+    scratch = f"{directory}.partial"
+    shutil.rmtree(scratch, ignore_errors=True)
+    os.makedirs(scratch)
+    for name in _ARRAYS:
+        np.save(os.path.join(scratch, f'{name}.npy'), np.asarray(getattr(index, name)))
+    with open(os.path.join(scratch, 'metadata.json'), 'w') as f:
+        json.dump(index.metadata, f, indent=2, sort_keys=True)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(scratch, directory)
+    return index
+
+
+def load_index(directory=NEIGHBOR_INDEX_DIR):
+    """Open a saved index; the records stay on disk, memory-mapped."""
+    with open(os.path.join(directory, 'metadata.json')) as f:
+        metadata = json.load(f)
+    if metadata.get('format_version') != INDEX_FORMAT_VERSION:
+        raise ValueError(f"Unsupported neighbor index format {metadata.get('format_version')!r} in {directory}")
+    if metadata['feature_columns'] != FEATURE_COLUMNS:
+        raise ValueError(f"Index feature order {metadata['feature_columns']} does not match {FEATURE_COLUMNS}")
+    arrays = {
+        name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r' if mapped else None)
+        for name, mapped in _ARRAYS.items()
+    }
+    return NeighborIndex(metadata=metadata, **arrays)
+
+
+def index_key(directory=NEIGHBOR_INDEX_DIR):
+    """Content hash of the saved index's metadata, or None when it has not been built."""
+    path = os.path.join(directory, 'metadata.json')
+    return content_hash(path) if os.path.exists(path) else None
+
+
+def open_index(directory=NEIGHBOR_INDEX_DIR, scaler=None):
+    """Load the saved index, or index the dataset in memory if none was built."""
+    if index_key(directory):
+        return load_index(directory)
+    return build_index(DATASET_PATH, scaler)
+
+
+def main(argv=None):
+    from heart_failure.bundle import get_bundle
+
+    parser = argparse.ArgumentParser(description="Build or time the similar-patient index")
+    parser.add_argument('command', choices=['build', 'bench'])
+    parser.add_argument('--data', default=str(DATASET_PATH),
+                        help="Labelled records to index (CSV, Parquet or Arrow)")
+    parser.add_argument('--index', default=str(NEIGHBOR_INDEX_DIR), help="Index directory")
+    parser.add_argument('--bundle', default=str(BUNDLE_PATH), help="Bundle whose scaler defines the space")
+    parser.add_argument('--leaf-size', type=int, default=LEAF_SIZE)
+    parser.add_argument('-k', type=int, default=DEFAULT_K)
+    parser.add_argument('--repeat', type=int, default=1000, help="Queries to time")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        bundle = get_bundle(args.bundle)
+        index = build_index(args.data, (bundle.scaler_mean, bundle.scaler_scale), args.leaf_size)
+        index.metadata['bundle_version'] = bundle.version
+        save_index(index, args.index)
+        print(f"indexed {index.n_rows:,} records in {index.metadata['n_leaves']:,} leaves "
+              f"({time.perf_counter() - start:.1f} s) -> {args.index}")
+        return 0
+
+    start = time.perf_counter()
+    index = open_index(args.index)
+    cold = time.perf_counter() - start
+    # Queries around real records: measurements jittered by a quarter SD, flags kept 0/1
+    rng = np.random.default_rng(0)
+    picks = rng.integers(index.n_rows, size=args.repeat)
+    jitter = rng.normal(0, 0.25, (args.repeat, len(FEATURE_COLUMNS)))
+    jitter[:, [FEATURE_COLUMNS.index(column) for column in FLAG_COLUMNS]] = 0
+    queries = (np.asarray(index.points[np.sort(picks)], dtype=np.float64) + jitter) * index.scale + index.mean
+    start = time.perf_counter()
+    for query in queries:
+        index.query(query, args.k)
+    per_query = (time.perf_counter() - start) / args.repeat
+    print(f"index of {index.n_rows:,} records: open {cold * 1e3:.2f} ms, "
+          f"{args.k}-NN query {per_query * 1e6:.0f} us")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+"""ONNX export of the model bundle and an onnxruntime CPU backend.
+
+The exported graph is the bundle's ``model``: the notebook's Keras network
+with BatchNormalization and the StandardScaler already folded into the
+Dense weights, so raw clinical values go in and the DEATH_EVENT
+probability comes out of one ``Gemm``/activation chain::
+
+    features (N, 12) -> Gemm -> Relu -> Gemm -> Relu -> Gemm -> Sigmoid -> probability (N, 1)
+
+    python -m heart_failure.onnx_backend export [-o model.onnx]
+    python -m heart_failure.onnx_backend check
+
+``check`` scores the bundled CSV with onnxruntime, the NumPy engine and,
+when TensorFlow is installed, Keras, and exits 1 if they disagree.
+Requires the ``onnx`` and ``onnxruntime`` packages.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from heart_failure.bundle import BUNDLE_PATH, get_bundle
+from heart_failure.model import DATA_DIR, DATASET_PATH, FEATURE_COLUMNS, MODEL_PATH, as_feature_matrix
+
+ONNX_PATH = DATA_DIR / 'model.onnx'
+ONNX_OPSET = 17
+# IR version matching the opset, so older onnxruntime builds can load the file
+ONNX_IR_VERSION = 8
+INPUT_NAME = 'features'
+OUTPUT_NAME = 'probability'
+# Default intra-op threads for the app; 0 lets onnxruntime use every core
+INTRA_OP_THREADS = int(os.environ.get('HF_ONNX_THREADS', 0))
+
+_ONNX_ACTIVATIONS = {'relu': 'Relu', 'sigmoid': 'Sigmoid', 'tanh': 'Tanh', 'linear': None}
+
+
+def to_onnx(model, metadata=None, opset=ONNX_OPSET):
+    """``onnx.ModelProto`` for a :class:`~heart_failure.model.FoldedANN`."""
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    nodes, initializers = [], []
+    current = INPUT_NAME
+    for i, (kernel, bias, activation) in enumerate(model.layers):
+        initializers += [
+            numpy_helper.from_array(kernel.astype(np.float32), f'dense_{i}/kernel'),
+            numpy_helper.from_array(bias.astype(np.float32), f'dense_{i}/bias'),
+        ]
+        op = _ONNX_ACTIVATIONS[activation]
+        last = i == len(model.layers) - 1
+        gemm_out = OUTPUT_NAME if last and op is None else f'dense_{i}/gemm'
+        nodes.append(helper.make_node(
+            'Gemm', [current, f'dense_{i}/kernel', f'dense_{i}/bias'], [gemm_out], name=f'dense_{i}'
+        ))
+        current = gemm_out
+        if op is not None:
+            out = OUTPUT_NAME if last else f'dense_{i}/{activation}'
+            nodes.append(helper.make_node(op, [current], [out], name=f'dense_{i}/{activation}'))
+            current = out
+
+    graph = helper.make_graph(
+        nodes, 'heart_failure_ann',
+        [helper.make_tensor_value_info(INPUT_NAME, TensorProto.FLOAT, ['N', model.n_features])],
+        [helper.make_tensor_value_info(OUTPUT_NAME, TensorProto.FLOAT, ['N', model.n_outputs])],
+        initializers,
+    )
+    proto = helper.make_model(graph, opset_imports=[helper.make_opsetid('', opset)],
+                              producer_name='heart_failure', ir_version=ONNX_IR_VERSION)
+    metadata = dict(metadata or {}, feature_columns=','.join(FEATURE_COLUMNS))
+    helper.set_model_props(proto, {key: str(value) for key, value in metadata.items()})
+    onnx.checker.check_model(proto)
+    return proto
+
+
+def bundle_to_onnx(bundle):
+    return to_onnx(bundle.model, {'bundle_version': bundle.version})
+
+
+def export_onnx(bundle=None, path=ONNX_PATH):
+    """Write the bundle's scaler-folded network to ``path`` and return it."""
+    bundle = bundle or get_bundle()
+    proto = bundle_to_onnx(bundle)
+    with open(path, 'wb') as f:
+        f.write(proto.SerializeToString())
+    return proto
+
+
+class OnnxModel:
+    """onnxruntime CPU session with the same ``predict``/``predict_proba`` API as ``FoldedANN``."""
+
+    dtype = np.dtype(np.float32)
+
+    def __init__(self, model_bytes, intra_op_threads=INTRA_OP_THREADS):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads or 0
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_bytes, options, providers=['CPUExecutionProvider'])
+        shape = self.session.get_inputs()[0].shape
+        self.n_features = shape[1]
+        self.n_outputs = self.session.get_outputs()[0].shape[1]
+        self.metadata = self.session.get_modelmeta().custom_metadata_map
+
+    @classmethod
+    def from_bundle(cls, bundle, intra_op_threads=INTRA_OP_THREADS):
+        # Built in memory from the loaded bundle, so it can never be stale
+        return cls(bundle_to_onnx(bundle).SerializeToString(), intra_op_threads)
+
+    @classmethod
+    def from_file(cls, path=ONNX_PATH, intra_op_threads=INTRA_OP_THREADS):
+        with open(path, 'rb') as f:
+            return cls(f.read(), intra_op_threads)
+
+    def predict(self, X, batch_size=65536):
+        X = as_feature_matrix(X, self.n_features, self.dtype)
+        if len(X) <= batch_size:
+            return self.session.run([OUTPUT_NAME], {INPUT_NAME: X})[0]
+        out = np.empty((len(X), self.n_outputs), dtype=self.dtype)
+        for start in range(0, len(X), batch_size):
+            stop = start + batch_size
+            out[start:stop] = self.session.run([OUTPUT_NAME], {INPUT_NAME: X[start:stop]})[0]
+        return out
+
+    def predict_proba(self, X, batch_size=65536):
+        return self.predict(X, batch_size=batch_size)[:, 0]
+
+
+def equivalence(bundle=None, dataset_path=DATASET_PATH, keras_path=MODEL_PATH):
+    """Max ``|onnx - other|`` per reference engine on the bundled CSV."""
+    import importlib.util
+
+    import pandas as pd
+
+    bundle = bundle or get_bundle()
+    raw = pd.read_csv(dataset_path)[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    actual = OnnxModel.from_bundle(bundle).predict_proba(raw)
+    diffs = {'numpy': float(np.max(np.abs(actual - bundle.predict_proba(raw))))}
+    if importlib.util.find_spec('tensorflow') is not None:
+        from tensorflow import keras
+
+        keras_model = keras.models.load_model(keras_path, compile=False)
+        expected = keras_model.predict(bundle.standardize(raw).astype(np.float32), verbose=0)[:, 0]
+        diffs['keras'] = float(np.max(np.abs(actual - expected)))
+    return diffs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the model to ONNX or check onnxruntime parity")
+    parser.add_argument('command', choices=['export', 'check'])
+    parser.add_argument('--bundle', default=str(BUNDLE_PATH), help="Model bundle (.npz)")
+    parser.add_argument('-o', '--output', default=str(ONNX_PATH), help="ONNX file to write")
+    parser.add_argument('--tolerance', type=float, default=1e-5, help="Max allowed |onnx - reference|")
+    args = parser.parse_args(argv)
+
+    bundle = get_bundle(args.bundle)
+    if args.command == 'export':
+        export_onnx(bundle, args.output)
+        print(f"wrote {args.output} (bundle {bundle.version}, opset {ONNX_OPSET})")
+        return 0
+
+    failed = False
+    for engine, diff in equivalence(bundle).items():
+        ok = diff <= args.tolerance
+        failed |= not ok
+        print(f"onnx vs {engine}: max |diff| = {diff:.2e} {'ok' if ok else 'FAIL'}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,30 @@
+"""Sidebar pages of the Streamlit app, imported only when selected.
+
+Each module exposes ``render()``; heavy libraries such as plotly are
+imported by the page modules that draw charts, so a rerun of a light page
+never pays for them.
+"""
+
+import importlib
+
+# Sidebar label -> (URL slug used by ``?page=``, module under heart_failure.pages)
+PAGES = {
+    "🏠 Home": ('home', 'home'),
+    "📊 Data Analysis": ('data-analysis', 'data_analysis'),
+    "🤖 Make Prediction": ('prediction', 'prediction'),
+    "📈 Model Performance": ('performance', 'performance'),
+    "ℹ️ About": ('about', 'about'),
+}
+PAGE_LABELS = list(PAGES)
+
+
+def page_index(slug):
+    """Sidebar index for a ``?page=`` slug, defaulting to the home page."""
+    for i, (page_slug, _) in enumerate(PAGES.values()):
+        if page_slug == slug:
+            return i
+    return 0
+
+
+def render_page(label):
+    importlib.import_module(f'heart_failure.pages.{PAGES[label][1]}').render()
@@ -0,0 +1,112 @@
+"""ℹ️ About page: methodology, disclaimer and references."""
+
+import streamlit as st
+
+
+def render():
+    st.markdown("""
+        <div class="info-card animate-fade-in">
+            <h2 style='color: #FF6B6B;'>ℹ️ About This System</h2>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.markdown("""
+            <div class="info-card">
+                <h3 style='color: #FF6B6B; font-weight: 700;'>🎯 Project Overview</h3>
+                <p style='font-size: 1.1rem; line-height: 1.8; color: #2C3E50;'>
+                    This Heart Failure Prediction System uses advanced machine learning and deep learning 
+                    algorithms to assess cardiovascular risk based on clinical records. The system analyzes 
+                    12 key medical indicators to predict the probability of a death event.
+                </p>
+                
+                <h3 style='color: #FF6B6B; margin-top: 2rem; font-weight: 700;'>🔬 Methodology</h3>
+                <ul style='line-height: 2.2; color: #2C3E50; font-size: 1rem;'>
+                    <li><strong style='color: #1A1A1A;'>Data Collection:</strong> 299 patient records with 12 clinical features</li>
+                    <li><strong style='color: #1A1A1A;'>Preprocessing:</strong> StandardScaler for feature normalization</li>
+                    <li><strong style='color: #1A1A1A;'>Models:</strong> SVM and Artificial Neural Networks</li>
+                    <li><strong style='color: #1A1A1A;'>Validation:</strong> Train-test split with cross-validation</li>
+                    <li><strong style='color: #1A1A1A;'>Metrics:</strong> Accuracy, Precision, Recall, F1-Score, ROC-AUC</li>
+                </ul>
+                
+                <h3 style='color: #FF6B6B; margin-top: 2rem; font-weight: 700;'>⚠️ Disclaimer</h3>
+                <p style='background: #FFF3CD; padding: 1rem; border-radius: 10px; border-left: 4px solid #FFC107; color: #664D03;'>
+                    <strong style='color: #000;'>Important:</strong> This system is designed for research and educational purposes only. 
+                    It should NOT be used as a substitute for professional medical advice, diagnosis, or treatment. 
+                    Always consult with a qualified healthcare provider for medical decisions.
+                </p>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+            <div class="info-card" style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; border: none;'>
+                <h3 style='color: white;'>📊 Key Statistics</h3>
+                <hr style='border-color: rgba(255,255,255,0.3);'>
+                <div style='margin: 1.5rem 0;'>
+                    <h4 style='color: white; margin: 0;'>85-87%</h4>
+                    <p style='opacity: 0.9; margin-top: 0.5rem;'>Model Accuracy</p>
+                </div>
+                <hr style='border-color: rgba(255,255,255,0.3);'>
+                <div style='margin: 1.5rem 0;'>
+                    <h4 style='color: white; margin: 0;'>299</h4>
+                    <p style='opacity: 0.9; margin-top: 0.5rem;'>Training Samples</p>
+                </div>
+                <hr style='border-color: rgba(255,255,255,0.3);'>
+                <div style='margin: 1.5rem 0;'>
+                    <h4 style='color: white; margin: 0;'>12</h4>
+                    <p style='opacity: 0.9; margin-top: 0.5rem;'>Clinical Features</p>
+                </div>
+                <hr style='border-color: rgba(255,255,255,0.3);'>
+                <div style='margin: 1.5rem 0;'>
+                    <h4 style='color: white; margin: 0;'>2</h4>
+                    <p style='opacity: 0.9; margin-top: 0.5rem;'>ML Models (SVM + ANN)</p>
+                </div>
+            </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("""
+            <div class="info-card" style='margin-top: 1rem;'>
+                <h4 style='color: #FF6B6B; font-weight: 700;'>🛠️ Technologies Used</h4>
+                <ul style='line-height: 2; color: #2C3E50; font-size: 0.95rem;'>
+                    <li><strong style='color: #1A1A1A;'>Python 3.8+</strong></li>
+                    <li><strong style='color: #1A1A1A;'>Streamlit</strong></li>
+                    <li><strong style='color: #1A1A1A;'>Scikit-learn</strong></li>
+                    <li><strong style='color: #1A1A1A;'>TensorFlow/Keras</strong></li>
+                    <li><strong style='color: #1A1A1A;'>Plotly</strong></li>
+                    <li><strong style='color: #1A1A1A;'>Pandas & NumPy</strong></li>
+                </ul>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("""
+        <div class="info-card" style='margin-top: 2rem;'>
+            <h3 style='color: #FF6B6B; font-weight: 700;'>📚 References & Resources</h3>
+            <ul style='line-height: 2; color: #2C3E50; font-size: 1rem;'>
+                <li><strong style='color: #1A1A1A;'>Dataset:</strong> Heart Failure Clinical Records Dataset (Kaggle)</li>
+                <li><strong style='color: #1A1A1A;'>Research:</strong> Machine Learning in Cardiovascular Medicine</li>
+                <li><strong style='color: #1A1A1A;'>Guidelines:</strong> American Heart Association (AHA)</li>
+                <li><strong style='color: #1A1A1A;'>Documentation:</strong> Scikit-learn, TensorFlow</li>
+            </ul>
+            
+            <h3 style='color: #FF6B6B; margin-top: 2rem; font-weight: 700;'>👨‍💻 Developer Information</h3>
+            <p style='color: #2C3E50; font-size: 1rem; line-height: 1.8;'>
+                Developed as part of Machine Learning Projects Hub<br>
+                For questions or feedback, please contact: <strong style='color: #1A1A1A;'>ml-projects@example.com</strong>
+            </p>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    # Footer
+    st.markdown("""
+        <div style='text-align: center; margin-top: 3rem; padding: 2rem; background: white; border-radius: 15px; box-shadow: 0 4px 15px rgba(0,0,0,0.1);'>
+            <p style='color: #FF6B6B; font-size: 1.3rem; font-weight: 700; margin-bottom: 0.5rem;'>
+                Made with ❤️ using Streamlit
+            </p>
+            <p style='color: #666; margin-top: 0.5rem; font-size: 0.95rem;'>
+                © 2024 ML Projects Hub. All rights reserved.
+            </p>
+        </div>
+    """, unsafe_allow_html=True)
@@ -0,0 +1,243 @@
+"""📊 Data Analysis page: upload a dataset and explore it."""
+
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from heart_failure.analytics import AnalysisCache, analyze_upload, content_key, should_aggregate
+from heart_failure.columnar import UPLOAD_TYPES, file_format
+from heart_failure.figures import box_by_class, count_bar, histogram_with_box
+from heart_failure.metrics import stage
+
+
+@st.cache_resource(show_spinner=False)
+def analysis_cache():
+    # One LRU per server process, shared by every session
+    return AnalysisCache()
+
+
+def cached_analysis(uploaded_file):
+    # Hash each upload once per session; reruns only pay a dict lookup
+    hash_key = ('upload_sha256', uploaded_file.file_id)
+    if hash_key not in st.session_state:
+        st.session_state[hash_key] = content_key(uploaded_file.getvalue())
+    fmt = file_format(uploaded_file.name)
+    return analysis_cache().analyze(
+        st.session_state[hash_key], lambda: analyze_upload(uploaded_file.getvalue(), fmt)
+    )
+
+
+def render():
+    st.markdown("""
+        <div class="info-card animate-fade-in">
+            <h2 style='color: #FF6B6B;'>📊 Upload & Analyze Your Data</h2>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    uploaded_file = st.file_uploader(
+        "📁 Upload your heart failure dataset (CSV, Parquet or Arrow/Feather)",
+        type=UPLOAD_TYPES,
+        help="Upload a CSV, Parquet or Arrow/Feather file containing heart failure clinical records"
+    )
+    
+    if uploaded_file is not None:
+        try:
+            analysis = cached_analysis(uploaded_file)
+            # Only the rows of small uploads are kept; large ones are summarized in one streaming pass
+            df = analysis.frame
+            n_rows, n_columns = analysis.shape
+            
+            st.markdown("""
+                <div class="success-box">
+                    ✅ <strong>File uploaded successfully!</strong> Dataset loaded with {} rows and {} columns.
+                </div>
+            """.format(n_rows, n_columns), unsafe_allow_html=True)
+            
+            # Tabs for different analyses
+            tab1, tab2, tab3, tab4 = st.tabs(["📋 Data Preview", "📈 Distributions", "🔗 Correlations", "📊 Statistics"])
+            
+            with tab1, stage('analysis.preview_tab', rows=n_rows):
+                st.markdown("### 👀 Dataset Preview")
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Total Patients", n_rows, help="Number of patient records")
+                with col2:
+                    st.metric("Features", n_columns, help="Number of clinical features")
+                with col3:
+                    if analysis.target:
+                        death_rate = analysis.target_rate * 100
+                        st.metric("Death Event Rate", f"{death_rate:.1f}%", help="Percentage of death events")
+                
+                st.dataframe(analysis.head(20), use_container_width=True, height=400)
+                
+                # Missing values check
+                if analysis.missing_count > 0:
+                    st.markdown("""
+                        <div class="warning-box">
+                            ⚠️ <strong>Warning:</strong> Found {} missing values in the dataset.
+                        </div>
+                    """.format(analysis.missing_count), unsafe_allow_html=True)
+                else:
+                    st.markdown("""
+                        <div class="success-box">
+                            ✅ <strong>Great!</strong> No missing values detected.
+                        </div>
+                    """, unsafe_allow_html=True)
+            
+            with tab2, stage('analysis.distributions_tab', rows=n_rows):
+                st.markdown("### 📊 Feature Distributions")
+                
+                # Large datasets are summarized on the server instead of shipping every row
+                aggregate = df is None or should_aggregate(n_rows)
+                if aggregate:
+                    st.caption(f"Charts are drawn from server-side aggregates of {n_rows:,} rows.")
+                
+                if analysis.target:
+                    # Target distribution
+                    if aggregate:
+                        fig = count_bar(
+                            analysis.class_counts,
+                            title="Death Event Distribution",
+                            x_title='Death Event (0=Survived, 1=Death)'
+                        )
+                    else:
+                        fig = px.histogram(
+                            df, 
+                            x='DEATH_EVENT',
+                            color='DEATH_EVENT',
+                            title="Death Event Distribution",
+                            labels={'DEATH_EVENT': 'Death Event (0=Survived, 1=Death)'},
+                            color_discrete_sequence=['#28A745', '#DC3545']
+                        )
+                    fig.update_layout(
+                        showlegend=False,
+                        plot_bgcolor='white',
+                        height=400
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                # Select feature to visualize
+                selected_feature = st.selectbox("Select a feature to visualize:", analysis.numeric_columns)
+                distribution = analysis.distribution(selected_feature) if aggregate else None
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    # Histogram
+                    if aggregate:
+                        counts, edges = distribution['histogram']
+                        fig = histogram_with_box(
+                            counts, edges, distribution['box'],
+                            title=f"{selected_feature} Distribution"
+                        )
+                    else:
+                        fig = px.histogram(
+                            df,
+                            x=selected_feature,
+                            marginal="box",
+                            title=f"{selected_feature} Distribution",
+                            color_discrete_sequence=['#667eea']
+                        )
+                    fig.update_layout(plot_bgcolor='white', height=400)
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                with col2:
+                    # Box plot by death event
+                    if analysis.target:
+                        if aggregate:
+                            fig = box_by_class(
+                                distribution['box_by_class'], selected_feature,
+                                x_title='Death Event'
+                            )
+                        else:
+                            fig = px.box(
+                                df,
+                                x='DEATH_EVENT',
+                                y=selected_feature,
+                                color='DEATH_EVENT',
+                                title=f"{selected_feature} by Death Event",
+                                labels={'DEATH_EVENT': 'Death Event'},
+                                color_discrete_sequence=['#28A745', '#DC3545']
+                            )
+                        fig.update_layout(plot_bgcolor='white', height=400)
+                        st.plotly_chart(fig, use_container_width=True)
+            
+            with tab3, stage('analysis.correlations_tab', rows=n_rows):
+                st.markdown("### 🔗 Feature Correlations")
+                
+                # Correlation heatmap
+                corr_matrix = analysis.corr
+                
+                fig = px.imshow(
+                    corr_matrix,
+                    text_auto='.2f',
+                    aspect="auto",
+                    color_continuous_scale='RdBu_r',
+                    title="Correlation Heatmap"
+                )
+                fig.update_layout(height=700)
+                st.plotly_chart(fig, use_container_width=True)
+                
+                # Top correlations with target
+                if analysis.target:
+                    target_corr = analysis.target_corr
+                    
+                    fig = go.Figure(go.Bar(
+                        x=target_corr.values,
+                        y=target_corr.index,
+                        orientation='h',
+                        marker=dict(
+                            color=target_corr.values,
+                            colorscale='RdYlGn',
+                            showscale=True
+                        )
+                    ))
+                    fig.update_layout(
+                        title="Feature Correlation with Death Event",
+                        xaxis_title="Correlation Coefficient",
+                        yaxis_title="Features",
+                        height=500,
+                        plot_bgcolor='white'
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+            
+            with tab4, stage('analysis.statistics_tab', rows=n_rows):
+                st.markdown("### 📊 Statistical Summary")
+                
+                st.dataframe(analysis.describe, use_container_width=True)
+                
+                # Group statistics by death event
+                if analysis.target:
+                    st.markdown("### 📈 Statistics by Death Event")
+                    
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        st.markdown("#### Survived (DEATH_EVENT = 0)")
+                        st.dataframe(
+                            analysis.class_describe.get(0),
+                            use_container_width=True
+                        )
+                    
+                    with col2:
+                        st.markdown("#### Death (DEATH_EVENT = 1)")
+                        st.dataframe(
+                            analysis.class_describe.get(1),
+                            use_container_width=True
+                        )
+        
+        except Exception as e:
+            st.markdown(f"""
+                <div class="error-box">
+                    ❌ <strong>Error loading file:</strong> {str(e)}
+                </div>
+            """, unsafe_allow_html=True)
+    else:
+        st.markdown("""
+            <div class="info-card" style='text-align: center; padding: 3rem;'>
+                <h3 style='color: #667eea;'>📁 No file uploaded yet</h3>
+                <p style='font-size: 1.1rem; color: #666;'>
+                    Please upload a CSV, Parquet or Arrow/Feather file containing heart failure clinical records to begin analysis.
+                </p>
+            </div>
+        """, unsafe_allow_html=True)
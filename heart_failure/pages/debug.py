@@ -0,0 +1,30 @@
+"""Optional sidebar panel with the stage timings of :mod:`heart_failure.metrics`."""
+
+import pandas as pd
+import streamlit as st
+
+from heart_failure.metrics import METRICS, current_rss
+
+
+def render_stage_timings(since):
+    """Stages recorded since ``since`` (``time.time()``), then totals for the process."""
+    st.markdown("### 🛠️ Stage Timings")
+    records = METRICS.recent(since)
+    if records:
+        st.caption("This run")
+        st.dataframe(pd.DataFrame({
+            'stage': [r.stage for r in records],
+            'ms': [r.seconds * 1000 for r in records],
+            'rows': [r.rows for r in records],
+            'ΔRSS MB': [r.rss_delta_bytes / 2**20 for r in records],
+        }), hide_index=True, use_container_width=True)
+    else:
+        st.caption("No instrumented stage ran in this rerun.")
+
+    summary = METRICS.summary()
+    if summary:
+        st.caption("Since server start")
+        st.dataframe(pd.DataFrame.from_dict(summary, orient='index')[
+            ['count', 'mean_seconds', 'max_seconds', 'rows', 'rows_per_second']
+        ], use_container_width=True)
+    st.caption(f"Process RSS {current_rss() / 2**20:,.0f} MB")
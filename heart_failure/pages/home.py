@@ -0,0 +1,93 @@
+"""🏠 Home page: project overview and feature glossary."""
+
+import streamlit as st
+
+
+def render():
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.markdown("""
+            <div class="info-card animate-fade-in">
+                <h2 style='color: #FF6B6B;'>🩺 About This Project</h2>
+                <p style='font-size: 1.1rem; line-height: 1.8; color: #2C3E50;'>
+                    This system uses <strong style='color: #1A1A1A;'>Machine Learning</strong> and 
+                    <strong style='color: #1A1A1A;'>Deep Learning</strong> 
+                    to predict heart failure risk based on clinical records. It analyzes 12 key medical 
+                    indicators to assess the probability of a cardiovascular death event.
+                </p>
+                
+                <h3 style='color: #FF6B6B; margin-top: 2rem;'>🎯 Key Features</h3>
+                <ul style='font-size: 1.05rem; line-height: 2.2; color: #2C3E50;'>
+                    <li>✅ <strong style='color: #1A1A1A;'>Advanced ML Models:</strong> SVM and Artificial Neural Networks</li>
+                    <li>✅ <strong style='color: #1A1A1A;'>12 Clinical Parameters:</strong> Age, Blood Pressure, Ejection Fraction, etc.</li>
+                    <li>✅ <strong style='color: #1A1A1A;'>Real-time Predictions:</strong> Instant risk assessment</li>
+                    <li>✅ <strong style='color: #1A1A1A;'>Interactive Visualizations:</strong> Understand your data better</li>
+                    <li>✅ <strong style='color: #1A1A1A;'>High Accuracy:</strong> Validated on 299 patient records</li>
+                </ul>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+            <div class="info-card animate-fade-in" style='background: linear-gradient(135deg, #FF6B6B 0%, #FF8E53 100%); color: white; border: none;'>
+                <h3 style='color: white; text-align: center;'>📊 Dataset Overview</h3>
+                <hr style='border-color: rgba(255,255,255,0.3);'>
+                <p style='font-size: 2rem; text-align: center; font-weight: 700; margin: 1rem 0;'>299</p>
+                <p style='text-align: center; opacity: 0.9;'>Patient Records</p>
+                <hr style='border-color: rgba(255,255,255,0.3); margin: 1.5rem 0;'>
+                <p style='font-size: 2rem; text-align: center; font-weight: 700; margin: 1rem 0;'>12</p>
+                <p style='text-align: center; opacity: 0.9;'>Clinical Features</p>
+                <hr style='border-color: rgba(255,255,255,0.3); margin: 1.5rem 0;'>
+                <p style='font-size: 2rem; text-align: center; font-weight: 700; margin: 1rem 0;'>2</p>
+                <p style='text-align: center; opacity: 0.9;'>ML Models (SVM + ANN)</p>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    # Clinical Features
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("""
+        <div class="info-card animate-fade-in">
+            <h2 style='color: #FF6B6B;'>🔬 Clinical Features Explained</h2>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown("""
+            <div class="info-card">
+                <h4 style='color: #FF6B6B; font-weight: 700;'>👤 Demographics</h4>
+                <ul style='color: #2C3E50; font-size: 0.95rem; line-height: 1.8;'>
+                    <li><strong style='color: #1A1A1A;'>Age:</strong> Patient's age in years</li>
+                    <li><strong style='color: #1A1A1A;'>Sex:</strong> Gender (0=Female, 1=Male)</li>
+                </ul>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+            <div class="info-card">
+                <h4 style='color: #FF6B6B; font-weight: 700;'>🩸 Blood Tests</h4>
+                <ul style='color: #2C3E50; font-size: 0.95rem; line-height: 1.8;'>
+                    <li><strong style='color: #1A1A1A;'>CPK:</strong> Creatinine Phosphokinase (mcg/L)</li>
+                    <li><strong style='color: #1A1A1A;'>Platelets:</strong> Platelet count (kiloplatelets/mL)</li>
+                    <li><strong style='color: #1A1A1A;'>Serum Creatinine:</strong> Kidney function (mg/dL)</li>
+                    <li><strong style='color: #1A1A1A;'>Serum Sodium:</strong> Sodium level (mEq/L)</li>
+                </ul>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown("""
+            <div class="info-card">
+                <h4 style='color: #FF6B6B; font-weight: 700;'>❤️ Cardiac Metrics</h4>
+                <ul style='color: #2C3E50; font-size: 0.95rem; line-height: 1.8;'>
+                    <li><strong style='color: #1A1A1A;'>Ejection Fraction:</strong> Blood pumping % (30-70% normal)</li>
+                    <li><strong style='color: #1A1A1A;'>Blood Pressure:</strong> Diastolic BP (mm Hg)</li>
+                    <li><strong style='color: #1A1A1A;'>Anaemia:</strong> Low RBC/hemoglobin</li>
+                    <li><strong style='color: #1A1A1A;'>Diabetes:</strong> Diabetes status</li>
+                    <li><strong style='color: #1A1A1A;'>Smoking:</strong> Smoking history</li>
+                </ul>
+            </div>
+        """, unsafe_allow_html=True)
@@ -0,0 +1,264 @@
+"""📈 Model Performance page: evaluation metrics and model comparison."""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from heart_failure.evaluation import MODEL_NAMES
+from heart_failure.pages.resources import current_cv_results, current_evaluation
+
+
+def render():
+    st.markdown("""
+        <div class="info-card animate-fade-in">
+            <h2 style='color: #FF6B6B;'>📈 Model Performance Metrics</h2>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    evaluation = current_evaluation()
+    if evaluation is None:
+        st.markdown("""
+            <div class="warning-box">
+                ⚠️ <strong>No evaluation results found.</strong> Run
+                <code>python -m heart_failure.evaluation</code> to score the models on held-out data.
+            </div>
+        """, unsafe_allow_html=True)
+        return
+    
+    # Model selection
+    model_key = st.selectbox(
+        "Select Model:",
+        list(MODEL_NAMES),
+        format_func=MODEL_NAMES.get
+    )
+    model_type = MODEL_NAMES[model_key]
+    results = evaluation['models'][model_key]
+    metadata = evaluation['metadata']
+    if metadata.get('bundle_version'):
+        model_source = f"model bundle {metadata['bundle_version']}"
+    elif metadata.get('pipeline_model'):
+        model_source = f"pipeline model {metadata['pipeline_model']}"
+    else:
+        model_source = "unrecorded model"
+    st.caption(
+        f"Held-out test set: {metadata.get('n_test', '?')} patients "
+        f"({model_source}, evaluated {metadata.get('created', 'at an unrecorded time')})"
+    )
+    
+    accuracy = results['accuracy']
+    precision = results['precision']
+    recall = results['recall']
+    f1_score = results['f1']
+    
+    # Display metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.markdown(f"""
+            <div class="metric-card">
+                <h3>{accuracy*100:.1f}%</h3>
+                <p>Accuracy</p>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+            <div class="metric-card">
+                <h3>{precision*100:.1f}%</h3>
+                <p>Precision</p>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+            <div class="metric-card">
+                <h3>{recall*100:.1f}%</h3>
+                <p>Recall</p>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown(f"""
+            <div class="metric-card">
+                <h3>{f1_score*100:.1f}%</h3>
+                <p>F1-Score</p>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Confusion Matrix
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 📊 Confusion Matrix")
+        
+        cm = results['confusion_matrix']
+        
+        fig = px.imshow(
+            cm,
+            text_auto=True,
+            labels=dict(x="Predicted", y="Actual", color="Count"),
+            x=['Survived', 'Death'],
+            y=['Survived', 'Death'],
+            color_continuous_scale='Blues'
+        )
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.markdown("### 📈 ROC Curve")
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=results['fpr'], y=results['tpr'],
+            mode='lines',
+            name=f"ROC Curve (AUC = {results['roc_auc']:.3f})",
+            line=dict(color='#FF6B6B', width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=[0, 1], y=[0, 1],
+            mode='lines',
+            name='Random Classifier',
+            line=dict(color='gray', width=2, dash='dash')
+        ))
+        fig.update_layout(
+            xaxis_title='False Positive Rate',
+            yaxis_title='True Positive Rate',
+            height=400,
+            plot_bgcolor='white',
+            showlegend=True
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Precision-recall and calibration
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 🎯 Precision-Recall Curve")
+        
+        fig = go.Figure(go.Scatter(
+            x=results['pr_recall'], y=results['pr_precision'],
+            mode='lines',
+            line_shape='vh',
+            name=f"AP = {results['average_precision']:.3f}",
+            line=dict(color='#667eea', width=3)
+        ))
+        fig.update_layout(
+            xaxis_title='Recall',
+            yaxis_title='Precision',
+            height=400,
+            plot_bgcolor='white',
+            showlegend=True
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.markdown("### ⚖️ Calibration")
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=results['calibration_predicted'], y=results['calibration_observed'],
+            mode='lines+markers',
+            name='Model',
+            text=[f"{n} patients" for n in results['calibration_count']],
+            line=dict(color='#FF6B6B', width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=[0, 1], y=[0, 1],
+            mode='lines',
+            name='Perfectly Calibrated',
+            line=dict(color='gray', width=2, dash='dash')
+        ))
+        fig.update_layout(
+            xaxis_title='Mean Predicted Probability',
+            yaxis_title='Observed Death Rate',
+            height=400,
+            plot_bgcolor='white',
+            showlegend=True
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Model comparison
+    st.markdown("### 🔄 Model Comparison")
+    
+    cv_results = current_cv_results()
+    if cv_results is None:
+        st.info("No cross-validation results found. Run `python -m heart_failure.cv` to compare the models.")
+    else:
+        models = cv_results['models']
+        comparison_metrics = {
+            'Accuracy': 'accuracy', 'Precision': 'precision', 'Recall': 'recall',
+            'F1-Score': 'f1', 'ROC AUC': 'roc_auc'
+        }
+        st.caption(
+            f"Stratified {cv_results['n_folds']}-fold cross-validation on {cv_results['n_rows']} patients "
+            f"(seed {cv_results['seed']}, run {cv_results['created']}); error bars show ±1 std across folds."
+        )
+        
+        fig = go.Figure()
+        
+        for label, metric in comparison_metrics.items():
+            means = [models[name]['mean'][metric] for name in models]
+            fig.add_trace(go.Bar(
+                name=label,
+                x=list(models),
+                y=means,
+                error_y=dict(type='data', array=[models[name]['std'][metric] for name in models]),
+                text=[f'{x*100:.1f}%' for x in means],
+                textposition='auto'
+            ))
+        
+        fig.update_layout(
+            barmode='group',
+            title="Model Performance Comparison",
+            yaxis_title="Score",
+            height=500,
+            plot_bgcolor='white'
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+        
+        timing = pd.DataFrame({
+            'Model': list(models),
+            'Wall Time (s)': [models[name]['wall_seconds'] for name in models],
+            'Per Fold (s)': [models[name]['wall_seconds'] / cv_results['n_folds'] for name in models],
+        })
+        st.dataframe(timing.style.format({'Wall Time (s)': '{:.2f}', 'Per Fold (s)': '{:.3f}'}),
+                     use_container_width=True, hide_index=True)
+    
+    # Training history (for ANN)
+    if model_type == "Artificial Neural Network (ANN)":
+        st.markdown("### 📉 Training History")
+        
+        history = evaluation['history']
+        if history is None:
+            st.info("No training history recorded. Run `python -m heart_failure.evaluation --history` to add it.")
+            return
+        
+        train_loss = history['loss']
+        val_loss = history['val_loss']
+        epochs = np.arange(1, len(train_loss) + 1)
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=epochs, y=train_loss,
+            mode='lines',
+            name='Training Loss',
+            line=dict(color='#667eea', width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=epochs, y=val_loss,
+            mode='lines',
+            name='Validation Loss',
+            line=dict(color='#FF6B6B', width=3)
+        ))
+        fig.update_layout(
+            xaxis_title='Epochs',
+            yaxis_title='Loss',
+            height=400,
+            plot_bgcolor='white'
+        )
+        st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,393 @@
+"""🤖 Make Prediction page: single-patient and batch risk prediction."""
+
+import os
+from functools import partial
+
+import streamlit as st
+
+from heart_failure.assessment import PredictionCache
+from heart_failure.attribution import FEATURE_LABELS
+from heart_failure.batch import result_tempfile, stream_score
+from heart_failure.columnar import MIME_TYPES, UPLOAD_TYPES, ColumnarFile, file_format
+from heart_failure.metrics import stage
+from heart_failure.model import TARGET_COLUMN
+from heart_failure.neighbors import neighbors_frame
+from heart_failure.pages.resources import current_neighbor_index, load_explainer, load_model, model_version
+from heart_failure.schema import read_patient_csv
+from heart_failure.validation import SchemaError, check_schema
+from heart_failure.whatif import (CURVE_POINTS, GRID_SHAPE, dependence_figure, partial_dependence,
+                                  sensitivity_figure, sensitivity_grid)
+
+# Download label -> (file extension, format)
+RESULT_FORMATS = {
+    "CSV": ('.csv', 'csv'),
+    "Parquet": ('.parquet', 'parquet'),
+    "Arrow / Feather": ('.feather', 'arrow'),
+}
+
+SIMILAR_PATIENTS = 5
+
+# Session keys holding the temp files written by the last batch run
+BATCH_OUTPUT_KEYS = ('batch_result_path', 'batch_error_path')
+
+RISK_LEVEL_STYLES = {
+    "LOW": ("#28A745", "✅", "Low risk of cardiovascular death event. Continue regular check-ups."),
+    "MODERATE": ("#FFC107", "⚠️", "Moderate risk detected. Consult with a cardiologist for assessment."),
+    "HIGH": ("#DC3545", "🚨", "High risk of cardiovascular death event. Immediate medical attention recommended."),
+}
+
+
+@st.cache_resource(show_spinner=False)
+def prediction_cache():
+    # One LRU per server process, shared by every session
+    return PredictionCache()
+
+
+def _read_file(path):
+    # Called by the download button on click; the handle is closed before returning
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _discard_batch_outputs():
+    """Delete the temp files from this session's last batch run."""
+    for key in BATCH_OUTPUT_KEYS:
+        path = st.session_state.pop(key, None)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def render():
+    st.markdown("""
+        <div class="info-card animate-fade-in">
+            <h2 style='color: #FF6B6B;'>🤖 Heart Failure Risk Prediction</h2>
+            <p>Enter patient clinical data to predict cardiovascular death event risk.</p>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    prediction_mode = st.radio(
+        "Choose prediction mode:",
+        ["Single Patient Prediction", "Batch Prediction (Upload CSV)"],
+        horizontal=True
+    )
+    
+    if prediction_mode == "Single Patient Prediction":
+        st.markdown("### 📝 Enter Patient Information")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            age = st.number_input("Age (years)", min_value=20, max_value=100, value=60, step=1)
+            anaemia = st.selectbox("Anaemia", [0, 1], format_func=lambda x: "No" if x == 0 else "Yes")
+            cpk = st.number_input("Creatinine Phosphokinase (mcg/L)", min_value=0, max_value=10000, value=250, step=10)
+            diabetes = st.selectbox("Diabetes", [0, 1], format_func=lambda x: "No" if x == 0 else "Yes")
+        
+        with col2:
+            ejection_fraction = st.slider("Ejection Fraction (%)", min_value=10, max_value=80, value=40, step=1)
+            high_blood_pressure = st.selectbox("High Blood Pressure", [0, 1], format_func=lambda x: "No" if x == 0 else "Yes")
+            platelets = st.number_input("Platelets (kiloplatelets/mL)", min_value=50000, max_value=800000, value=250000, step=1000)
+            serum_creatinine = st.number_input("Serum Creatinine (mg/dL)", min_value=0.0, max_value=10.0, value=1.0, step=0.1)
+        
+        with col3:
+            serum_sodium = st.number_input("Serum Sodium (mEq/L)", min_value=100, max_value=150, value=135, step=1)
+            sex = st.selectbox("Sex", [0, 1], format_func=lambda x: "Female" if x == 0 else "Male")
+            smoking = st.selectbox("Smoking", [0, 1], format_func=lambda x: "No" if x == 0 else "Yes")
+            time = st.number_input("Follow-up Period (days)", min_value=1, max_value=365, value=100, step=1)
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+        
+        patient = {
+            'age': age,
+            'anaemia': anaemia,
+            'creatinine_phosphokinase': cpk,
+            'diabetes': diabetes,
+            'ejection_fraction': ejection_fraction,
+            'high_blood_pressure': high_blood_pressure,
+            'platelets': platelets,
+            'serum_creatinine': serum_creatinine,
+            'serum_sodium': serum_sodium,
+            'sex': sex,
+            'smoking': smoking,
+            'time': time
+        }
+        
+        if st.button("🔮 Predict Risk", use_container_width=True):
+            st.session_state['assessed_patient'] = patient
+        
+        # The result stays up while the what-if selectors rerun the page, until an input changes
+        if st.session_state.get('assessed_patient') == patient:
+            # Death event probability from the trained ANN, memoized per input vector
+            with stage('single.assess', rows=1):
+                assessment = prediction_cache().assess(load_model(), model_version(), patient, load_explainer())
+            risk_score = assessment.risk_score
+            risk_level = assessment.risk_level
+            risk_color, risk_emoji, risk_message = RISK_LEVEL_STYLES[risk_level]
+            
+            # Display results
+            st.markdown("<br>", unsafe_allow_html=True)
+            st.markdown(f"""
+                <div class="info-card" style='background: {risk_color}; color: white; border: none;'>
+                    <h2 style='color: white; text-align: center;'>{risk_emoji} Risk Assessment Result</h2>
+                    <hr style='border-color: rgba(255,255,255,0.3);'>
+                    <h1 style='color: white; text-align: center; font-size: 4rem; margin: 1rem 0;'>{risk_score}%</h1>
+                    <h3 style='color: white; text-align: center;'>{risk_level} RISK</h3>
+                    <p style='text-align: center; font-size: 1.2rem; margin-top: 1rem; opacity: 0.95;'>
+                        {risk_message}
+                    </p>
+                </div>
+            """, unsafe_allow_html=True)
+            
+            # Risk factors breakdown
+            st.markdown("### 📊 Risk Factors Breakdown")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # The model's per-feature attributions and their chart come prepared from the cache
+                if assessment.figure is not None:
+                    st.plotly_chart(assessment.figure, use_container_width=True)
+                else:
+                    st.success("✅ No significant risk factors detected!")
+            
+            with col2:
+                # Patient summary
+                st.markdown("""
+                    <div class="info-card">
+                        <h4 style='color: #667eea;'>Patient Summary</h4>
+                        <table style='width: 100%; border-collapse: collapse;'>
+                            <tr><td><strong>Age:</strong></td><td>{} years</td></tr>
+                            <tr><td><strong>Sex:</strong></td><td>{}</td></tr>
+                            <tr><td><strong>Ejection Fraction:</strong></td><td>{}%</td></tr>
+                            <tr><td><strong>Serum Creatinine:</strong></td><td>{} mg/dL</td></tr>
+                            <tr><td><strong>Serum Sodium:</strong></td><td>{} mEq/L</td></tr>
+                            <tr><td><strong>Platelets:</strong></td><td>{:,} kilo/mL</td></tr>
+                        </table>
+                        <hr>
+                        <h4 style='color: #667eea; margin-top: 1rem;'>Medical Conditions</h4>
+                        <ul>
+                            <li>Anaemia: {}</li>
+                            <li>Diabetes: {}</li>
+                            <li>High BP: {}</li>
+                            <li>Smoking: {}</li>
+                        </ul>
+                    </div>
+                """.format(
+                    age, "Male" if sex == 1 else "Female", ejection_fraction,
+                    serum_creatinine, serum_sodium, platelets,
+                    "Yes" if anaemia == 1 else "No",
+                    "Yes" if diabetes == 1 else "No",
+                    "Yes" if high_blood_pressure == 1 else "No",
+                    "Yes" if smoking == 1 else "No"
+                ), unsafe_allow_html=True)
+            
+            # Recommendations
+            st.markdown("### 💡 Recommendations")
+            
+            recommendations = []
+            
+            if ejection_fraction < 40:
+                recommendations.append("🔴 **Critical:** Ejection fraction is below normal. Immediate cardiac evaluation needed.")
+            
+            if serum_creatinine > 1.5:
+                recommendations.append("🟠 **Important:** Elevated serum creatinine suggests kidney issues. Consult nephrologist.")
+            
+            if age > 70:
+                recommendations.append("🟡 **Monitor:** Age is a risk factor. Regular cardiac check-ups recommended.")
+            
+            if smoking == 1:
+                recommendations.append("🚭 **Lifestyle:** Smoking cessation programs strongly recommended.")
+            
+            if diabetes == 1:
+                recommendations.append("💊 **Management:** Ensure diabetes is well-controlled with proper medication.")
+            
+            if high_blood_pressure == 1:
+                recommendations.append("🩺 **Control:** Blood pressure management is crucial. Follow prescribed treatment.")
+            
+            if not recommendations:
+                recommendations.append("✅ **Good News:** No critical findings. Continue healthy lifestyle and regular check-ups.")
+            
+            for rec in recommendations:
+                st.markdown(f"- {rec}")
+            
+            # Similar patients: exact nearest neighbors in the model's standardized feature space
+            st.markdown("### 👥 Similar Patients")
+            
+            neighbor_index = current_neighbor_index()
+            with stage('single.neighbors', rows=1):
+                neighbors = neighbor_index.query(patient, SIMILAR_PATIENTS)
+            deaths = int(neighbors.outcomes.sum())
+            st.markdown(f"""
+                <div class="info-card">
+                    <p style='margin: 0;'><strong>{deaths} of the {len(neighbors.rows)}</strong> most similar of
+                    {neighbor_index.n_rows:,} historical patients had a death event
+                    ({neighbor_index.metadata['death_rate']:.0%} across all of them).</p>
+                </div>
+            """, unsafe_allow_html=True)
+            similar = neighbors_frame(neighbors).rename(columns=FEATURE_LABELS)
+            similar[TARGET_COLUMN] = similar[TARGET_COLUMN].map({0: "✅ Survived", 1: "🚨 Death event"})
+            st.dataframe(similar.rename(columns={TARGET_COLUMN: "Outcome"}), use_container_width=True, hide_index=True)
+            st.caption("Distance is in standard deviations over the 12 scaled features; Record is the row in "
+                       f"{neighbor_index.metadata.get('source', 'the dataset')}.")
+            
+            # What-if analysis: every surface is one batched call over the patient with features swept
+            st.markdown("### 🔬 What-If Analysis")
+            st.caption("Predicted risk as two features change together, the other ten held at this patient's values")
+            
+            feature_names = list(FEATURE_LABELS)
+            col1, col2 = st.columns(2)
+            with col1:
+                x_feature = st.selectbox("Horizontal axis", feature_names, format_func=FEATURE_LABELS.get,
+                                         index=feature_names.index('ejection_fraction'), key='whatif_x')
+            with col2:
+                y_feature = st.selectbox("Vertical axis", feature_names, format_func=FEATURE_LABELS.get,
+                                         index=feature_names.index('serum_creatinine'), key='whatif_y')
+            
+            if x_feature == y_feature:
+                st.markdown("""
+                    <div class="warning-box">
+                        <strong>⚠️ Choose two different features for the risk surface.</strong>
+                    </div>
+                """, unsafe_allow_html=True)
+            else:
+                with stage('single.whatif', rows=GRID_SHAPE[0] * GRID_SHAPE[1]):
+                    grid = sensitivity_grid(load_model(), patient, x_feature, y_feature)
+                st.plotly_chart(sensitivity_figure(grid, patient), use_container_width=True)
+            
+            with stage('single.dependence', rows=len(feature_names) * CURVE_POINTS):
+                curves = partial_dependence(load_model(), patient)
+            st.plotly_chart(dependence_figure(curves, patient, assessment.probability), use_container_width=True)
+            
+            cache_stats = prediction_cache().stats()
+            st.caption(
+                f"Prediction cache: {cache_stats.hit_rate:.0%} hit rate over "
+                f"{cache_stats.hits + cache_stats.misses:,} lookups ({cache_stats.entries:,} stored)"
+            )
+    
+    else:  # Batch Prediction
+        st.markdown("### 📁 Upload Patient Data for Batch Prediction")
+        
+        uploaded_file = st.file_uploader(
+            "Upload patient data (CSV, Parquet or Arrow/Feather)",
+            type=UPLOAD_TYPES,
+            help="The file should contain all required features"
+        )
+        
+        # A new or cleared upload makes the last run's output stale
+        upload_id = uploaded_file.file_id if uploaded_file is not None else None
+        if st.session_state.get('batch_upload_id') != upload_id:
+            _discard_batch_outputs()
+            st.session_state['batch_upload_id'] = upload_id
+        
+        if uploaded_file is not None:
+            try:
+                # Only parse a few rows here; the full file is streamed when scoring
+                input_format = file_format(uploaded_file.name)
+                with stage('batch.preview', rows=5):
+                    if input_format == 'csv':
+                        preview_df = read_patient_csv(uploaded_file, nrows=5)
+                        uploaded_file.seek(0)
+                    else:
+                        preview_df = ColumnarFile(uploaded_file, input_format).head(5)
+                check_schema(preview_df.columns)
+                
+                st.markdown(f"""
+                    <div class="success-box">
+                        ✅ File uploaded successfully! ({uploaded_file.size / 1e6:.1f} MB)
+                    </div>
+                """, unsafe_allow_html=True)
+                
+                st.dataframe(preview_df, use_container_width=True)
+                
+                result_format = st.selectbox("Result file format", list(RESULT_FORMATS))
+                result_suffix, result_fmt = RESULT_FORMATS[result_format]
+                explain = st.checkbox(
+                    "Add top risk drivers per patient", value=True,
+                    help="The features raising each patient's predicted risk the most, from the model's attributions"
+                )
+                
+                if st.button("🔮 Predict All", use_container_width=True):
+                    # Drop the previous run's output before writing a new one
+                    _discard_batch_outputs()
+                    result_path = result_tempfile(result_suffix)
+                    error_path = result_tempfile('.csv')
+                    st.session_state['batch_result_path'] = result_path
+                    st.session_state['batch_error_path'] = error_path
+                    
+                    progress_bar = st.progress(0.0, text="Scoring patients...")
+                    
+                    def update_progress(rows_done, fraction):
+                        progress_bar.progress(fraction or 0.0, text=f"Scored {rows_done:,} patients...")
+                    
+                    summary = stream_score(
+                        uploaded_file, result_path, load_model(),
+                        progress=update_progress, total_bytes=uploaded_file.size,
+                        source_format=input_format, errors_destination=error_path,
+                        explainer=load_explainer() if explain else None
+                    )
+                    progress_bar.progress(1.0, text=f"Scored {summary.rows:,} patients")
+                    
+                    if summary.invalid_rows:
+                        st.markdown(f"""
+                            <div class="warning-box">
+                                ⚠️ {summary.invalid_rows:,} rows failed validation and were not scored.
+                                Download the error report for the row numbers and reasons.
+                            </div>
+                        """, unsafe_allow_html=True)
+                        st.download_button(
+                            label="📥 Download Error Report",
+                            data=partial(_read_file, error_path),
+                            file_name="heart_failure_validation_errors.csv",
+                            mime=MIME_TYPES['csv'],
+                            on_click="ignore",
+                            use_container_width=True
+                        )
+                    
+                    st.markdown("### 📊 Prediction Results")
+                    st.caption(f"Showing the first {len(summary.preview)} of {summary.rows:,} rows")
+                    with stage('batch.render', rows=len(summary.preview)):
+                        st.dataframe(summary.preview, use_container_width=True)
+                    
+                    # Summary statistics
+                    col1, col2, col3 = st.columns(3)
+                    total_rows = max(summary.rows, 1)
+                    
+                    with col1:
+                        high_risk = summary.level_counts['HIGH']
+                        st.metric("High Risk Patients", high_risk, 
+                                 delta=f"{high_risk/total_rows*100:.1f}%",
+                                 delta_color="inverse")
+                    
+                    with col2:
+                        moderate_risk = summary.level_counts['MODERATE']
+                        st.metric("Moderate Risk", moderate_risk,
+                                 delta=f"{moderate_risk/total_rows*100:.1f}%")
+                    
+                    with col3:
+                        low_risk = summary.level_counts['LOW']
+                        st.metric("Low Risk", low_risk,
+                                 delta=f"{low_risk/total_rows*100:.1f}%",
+                                 delta_color="normal")
+                    
+                    # Download results straight from the temp file, read only on click
+                    st.download_button(
+                        label="📥 Download Results",
+                        data=partial(_read_file, result_path),
+                        file_name=f"heart_failure_predictions{result_suffix}",
+                        mime=MIME_TYPES[result_fmt],
+                        on_click="ignore",
+                        use_container_width=True
+                    )
+            
+            except SchemaError as e:
+                st.markdown(f"""
+                    <div class="error-box">
+                        ❌ {str(e)}. The file needs all 12 clinical feature columns.
+                    </div>
+                """, unsafe_allow_html=True)
+            
+            except Exception as e:
+                st.markdown(f"""
+                    <div class="error-box">
+                        ❌ Error processing file: {str(e)}
+                    </div>
+                """, unsafe_allow_html=True)
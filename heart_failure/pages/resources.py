@@ -0,0 +1,77 @@
+"""Process-wide resources shared by every page and session."""
+
+import streamlit as st
+
+from heart_failure.bundle import BUNDLE_PATH, DEFAULT_BACKEND, bundle_key, open_bundle
+
+
+@st.cache_resource(show_spinner=False)
+def load_bundle(content_hash):
+    # Shared by every session; a rebuilt bundle has a new hash and is reloaded
+    return open_bundle(BUNDLE_PATH)
+
+
+def current_bundle():
+    return load_bundle(bundle_key(BUNDLE_PATH))
+
+
+def load_model():
+    # Scaler is folded into the first layer, so the model takes raw clinical values.
+    # HF_BACKEND=onnx switches to onnxruntime (threads from HF_ONNX_THREADS).
+    return current_bundle().backend_model(DEFAULT_BACKEND)
+
+
+def load_explainer():
+    # Attributions always come from the NumPy network, whatever the scoring backend
+    return current_bundle().explainer()
+
+
+def model_version():
+    """Identifies the weights and backend behind :func:`load_model`."""
+    return f"{current_bundle().version}-{DEFAULT_BACKEND}"
+
+
+@st.cache_resource(show_spinner=False)
+def load_evaluation_artifact(content_hash):
+    from heart_failure.evaluation import EVALUATION_PATH, load_evaluation
+
+    return load_evaluation(EVALUATION_PATH)
+
+
+def current_evaluation():
+    """Saved evaluation results, or None until the evaluation job has run."""
+    from heart_failure.evaluation import evaluation_key
+
+    key = evaluation_key()
+    return load_evaluation_artifact(key) if key else None
+
+
+@st.cache_resource(show_spinner=False)
+def load_cv_artifact(content_hash):
+    from heart_failure.cv import CV_RESULTS_PATH, load_cv_results
+
+    return load_cv_results(CV_RESULTS_PATH)
+
+
+def current_cv_results():
+    """Cross-validation report, or None until ``python -m heart_failure.cv`` has run."""
+    from heart_failure.cv import cv_key
+
+    key = cv_key()
+    return load_cv_artifact(key) if key else None
+
+
+@st.cache_resource(show_spinner=False)
+def load_neighbor_index(content_hash, bundle_version):
+    from heart_failure.neighbors import NEIGHBOR_INDEX_DIR, open_index
+
+    # Without a built index the dataset is indexed in memory, in the bundle's scaled space
+    bundle = current_bundle()
+    return open_index(NEIGHBOR_INDEX_DIR, (bundle.scaler_mean, bundle.scaler_scale))
+
+
+def current_neighbor_index():
+    """Similar-patient index: the saved one, memory-mapped, else the dataset's."""
+    from heart_failure.neighbors import index_key
+
+    return load_neighbor_index(index_key(), current_bundle().version)
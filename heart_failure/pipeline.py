@@ -0,0 +1,298 @@
+"""Scripted, content-addressed training pipeline.
+
+Replaces running the notebook top to bottom with stages whose outputs are
+cached on disk:
+
+    load -> validate -> scale -> split -> train_svm ┐
+                                       -> train_ann ┴-> evaluate
+
+A stage's key is the SHA-256 of its name, :data:`STAGE_VERSION`, its
+parameters and the keys of the stages it reads. The dataset enters through
+its content hash, not its path. A stage whose key already has a directory
+under the cache is not run again. Arrays are stored as ``.npy`` and read
+back memory-mapped. Changing only the ANN settings therefore re-runs
+``train_ann`` and ``evaluate`` and nothing else, and a rerun on unchanged
+inputs only hashes the dataset and opens the cached files::
+
+    python -m heart_failure.pipeline --units 32 16 --bundle model_bundle.npz
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+import numpy as np
+
+from heart_failure.bundle import file_sha256
+from heart_failure.metrics import stage
+from heart_failure.model import DATA_DIR, DATASET_PATH, FEATURE_COLUMNS, TARGET_COLUMN
+from heart_failure.training import ANN_DEFAULTS
+
+PIPELINE_CACHE_DIR = DATA_DIR / 'pipeline_cache'
+# Bump to invalidate every cached stage after a change to the stage code
+STAGE_VERSION = 1
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+_META_FILE = 'stage.json'
+
+
+class StageResult(NamedTuple):
+    """A finished stage: its key, output directory and summary record."""
+    name: str
+    key: str
+    directory: str
+    info: dict
+    cached: bool
+    seconds: float
+
+    def array(self, name):
+        """A ``.npy`` output, memory-mapped read-only."""
+        return np.load(os.path.join(self.directory, f'{name}.npy'), mmap_mode='r')
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+
+def stage_key(name, params, inputs):
+    """Content key of a stage run: name, code version, parameters and upstream keys."""
+    record = {'stage': name, 'version': STAGE_VERSION, 'params': params,
+              'inputs': {k: r.key for k, r in sorted(inputs.items())}}
+    return hashlib.sha256(json.dumps(record, sort_keys=True, default=list).encode()).hexdigest()
+
+
+class Pipeline:
+    """Runs stages into ``cache_dir``, skipping any whose key is already there."""
+
+    def __init__(self, cache_dir=PIPELINE_CACHE_DIR, log=print):
+        self.cache_dir = os.fspath(cache_dir)
+        self.log = log
+        self.results = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def run(self, name, build, params=None, **inputs):
+        """``build(directory, **inputs)`` writes the outputs and returns a JSON-able summary."""
+        params = params or {}
+        key = stage_key(name, params, inputs)
+        directory = os.path.join(self.cache_dir, f'{name}-{key[:16]}')
+        start = time.perf_counter()
+        meta_path = os.path.join(directory, _META_FILE)
+        cached = os.path.exists(meta_path)
+        if cached:
+            with open(meta_path) as f:
+                info = json.load(f)['info']
+        else:
+            # Built in a scratch directory and renamed, so an interrupted stage never looks finished
+            scratch = tempfile.mkdtemp(prefix=f'.{name}-', dir=self.cache_dir)
+            try:
+                with stage(f'pipeline.{name}'):
+                    info = build(scratch, **inputs) or {}
+                with open(os.path.join(scratch, _META_FILE), 'w') as f:
+                    json.dump({'stage': name, 'key': key, 'params': params,
+                               'inputs': {k: r.key for k, r in inputs.items()}, 'info': info},
+                              f, indent=2, default=list)
+                if os.path.exists(directory):
+                    shutil.rmtree(directory)
+                os.replace(scratch, directory)
+            finally:
+                shutil.rmtree(scratch, ignore_errors=True)
+        result = StageResult(name, key, directory, info, cached, time.perf_counter() - start)
+        self.results[name] = result
+        self.log(f"{name:<10} {'cached' if cached else 'ran':<7} {result.seconds:8.2f} s  {key[:12]}")
+        return result
+
+
+# ======================== STAGES ========================
+
+def _load(directory, dataset_path):
+    import pandas as pd
+
+    df = pd.read_csv(dataset_path)
+    np.save(os.path.join(directory, 'X.npy'), df[FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+    np.save(os.path.join(directory, 'y.npy'), df[TARGET_COLUMN].to_numpy(dtype=np.int64))
+    return {'rows': len(df)}
+
+
+def _validate(directory, data):
+    import pandas as pd
+
+    from heart_failure.validation import validate_frame
+
+    X, y = data.array('X'), data.array('y')
+    valid = validate_frame(pd.DataFrame(np.asarray(X), columns=FEATURE_COLUMNS)).valid
+    np.save(os.path.join(directory, 'X.npy'), X[valid])
+    np.save(os.path.join(directory, 'y.npy'), y[valid])
+    return {'rows': int(valid.sum()), 'invalid_rows': int((~valid).sum())}
+
+
+def _scale(directory, data):
+    # The notebook fits StandardScaler on every row before splitting
+    X = np.asarray(data.array('X'))
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    np.save(os.path.join(directory, 'X.npy'), (X - mean) / scale)
+    np.save(os.path.join(directory, 'mean.npy'), mean)
+    np.save(os.path.join(directory, 'scale.npy'), scale)
+
+
+def _split(directory, data, test_size, random_state):
+    from sklearn.model_selection import train_test_split
+
+    # Same permutation as the notebook's train_test_split(X, y, ...) on these rows
+    train, test = train_test_split(np.arange(len(data.array('y'))), test_size=test_size,
+                                   random_state=random_state)
+    np.save(os.path.join(directory, 'train.npy'), train)
+    np.save(os.path.join(directory, 'test.npy'), test)
+    return {'train_rows': len(train), 'test_rows': len(test)}
+
+
+def _split_arrays(scaled, data, split):
+    X, y = scaled.array('X'), data.array('y')
+    train, test = split.array('train'), split.array('test')
+    return X[train], X[test], y[train], y[test]
+
+
+def _train_svm(directory, scaled, data, split, random_state):
+    import pickle
+
+    from sklearn.svm import SVC
+
+    X_train, X_test, y_train, _ = _split_arrays(scaled, data, split)
+    # probability=True only adds Platt scaling; predict() matches the notebook's plain SVC()
+    model = SVC(probability=True, random_state=random_state).fit(X_train, y_train)
+    with open(os.path.join(directory, 'svm.pkl'), 'wb') as f:
+        pickle.dump(model, f)
+    np.save(os.path.join(directory, 'pred.npy'), model.predict(X_test).astype(np.int64))
+    np.save(os.path.join(directory, 'scores.npy'), model.decision_function(X_test))
+    np.save(os.path.join(directory, 'proba.npy'), model.predict_proba(X_test)[:, 1])
+
+
+def _train_ann(directory, scaled, data, split, seed, **params):
+    from heart_failure.training import fit_ann
+
+    X_train, X_test, y_train, _ = _split_arrays(scaled, data, split)
+    model, curves = fit_ann(np.asarray(X_train), np.asarray(y_train), seed=seed, **params)
+    model.save(os.path.join(directory, 'model.h5'))
+    proba = model.predict(np.asarray(X_test), verbose=0)[:, 0].astype(np.float64)
+    np.save(os.path.join(directory, 'proba.npy'), proba)
+    np.savez(os.path.join(directory, 'history.npz'), **curves)
+    return {'epochs_run': len(curves['loss'])}
+
+
+def _evaluate(directory, data, split, svm, ann, dataset_sha256, test_size, random_state):
+    from heart_failure.evaluation import EVALUATION_FORMAT_VERSION, evaluate_scores, save_evaluation
+
+    y_test = np.asarray(data.array('y'))[split.array('test')]
+    ann_proba = np.asarray(ann.array('proba'))
+    results = {
+        'svm': evaluate_scores(y_test, svm.array('pred'), svm.array('scores'), svm.array('proba')),
+        'ann': evaluate_scores(y_test, (ann_proba >= 0.5).astype(np.int64), ann_proba, ann_proba),
+    }
+    with np.load(ann.path('history.npz')) as saved:
+        history = {name: saved[name] for name in saved.files}
+    metadata = {
+        'format_version': EVALUATION_FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        # Set by main() when the ANN is exported; until then the stage key identifies it
+        'bundle_version': None,
+        'pipeline_model': ann.key[:12],
+        'dataset_sha256': dataset_sha256,
+        'test_size': test_size,
+        'random_state': random_state,
+        'n_train': int(split.info['train_rows']),
+        'n_test': int(split.info['test_rows']),
+        'history_source': 'training pipeline',
+    }
+    save_evaluation(metadata, results, history, os.path.join(directory, 'evaluation.npz'))
+    return {key: {m: float(result[m]) for m in ('accuracy', 'precision', 'recall', 'f1', 'roc_auc')}
+            for key, result in results.items()}
+
+
+def run_pipeline(dataset_path=DATASET_PATH, ann_params=None, seed=RANDOM_STATE, test_size=TEST_SIZE,
+                 cache_dir=PIPELINE_CACHE_DIR, log=print):
+    """Run every stage, reusing cached ones; returns the :class:`Pipeline` with its results."""
+    ann_params = dict(ANN_DEFAULTS, **(ann_params or {}))
+    pipeline = Pipeline(cache_dir, log)
+    dataset_sha256 = file_sha256(dataset_path)
+    loaded = pipeline.run('load', lambda d: _load(d, dataset_path), {'dataset_sha256': dataset_sha256})
+    data = pipeline.run('validate', _validate, data=loaded)
+    scaled = pipeline.run('scale', _scale, data=data)
+    split = pipeline.run('split', lambda d, data: _split(d, data, test_size, seed),
+                         {'test_size': test_size, 'random_state': seed}, data=data)
+    svm = pipeline.run('train_svm', lambda d, **inputs: _train_svm(d, random_state=seed, **inputs),
+                       {'random_state': seed}, scaled=scaled, data=data, split=split)
+    ann = pipeline.run('train_ann', lambda d, **inputs: _train_ann(d, seed=seed, **inputs, **ann_params),
+                       dict(ann_params, seed=seed), scaled=scaled, data=data, split=split)
+    evaluation_params = {'dataset_sha256': dataset_sha256, 'test_size': test_size, 'random_state': seed}
+    pipeline.run('evaluate', lambda d, **inputs: _evaluate(d, **inputs, **evaluation_params),
+                 evaluation_params, data=data, split=split, svm=svm, ann=ann)
+    return pipeline
+
+
+def export_bundle(pipeline, dataset_path=DATASET_PATH, path=None):
+    """Fold the pipeline's ANN and scaler into a model bundle at ``path``."""
+    from heart_failure.bundle import BUNDLE_PATH, build_bundle, save_bundle
+
+    results = pipeline.results
+    scaled = results['scale']
+    bundle = build_bundle(results['train_ann'].path('model.h5'), dataset_path,
+                          scaler=(np.asarray(scaled.array('mean')), np.asarray(scaled.array('scale'))))
+    bundle.metadata['pipeline'] = {name: result.key for name, result in results.items()}
+    return save_bundle(bundle, path or BUNDLE_PATH)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cached training pipeline for the SVM and ANN")
+    parser.add_argument('--data', default=str(DATASET_PATH), help="CSV with features and DEATH_EVENT")
+    parser.add_argument('--cache-dir', default=str(PIPELINE_CACHE_DIR))
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE)
+    parser.add_argument('--test-size', type=float, default=TEST_SIZE)
+    parser.add_argument('--units', type=int, nargs='+', default=list(ANN_DEFAULTS['units']))
+    parser.add_argument('--dropout', type=float, nargs='+', default=list(ANN_DEFAULTS['dropout']))
+    parser.add_argument('--learning-rate', type=float, default=ANN_DEFAULTS['learning_rate'])
+    parser.add_argument('--batch-size', type=int, default=ANN_DEFAULTS['batch_size'])
+    parser.add_argument('--epochs', type=int, default=ANN_DEFAULTS['epochs'])
+    parser.add_argument('--patience', type=int, default=ANN_DEFAULTS['patience'])
+    parser.add_argument('--bundle', help="Also write the trained ANN as a model bundle here")
+    parser.add_argument('--evaluation', help="Also copy the evaluation artifact here (e.g. for the app)")
+    args = parser.parse_args(argv)
+    if len(args.units) != len(args.dropout):
+        parser.error("--units and --dropout need one value per hidden layer")
+
+    start = time.perf_counter()
+    pipeline = run_pipeline(
+        args.data,
+        {'units': args.units, 'dropout': args.dropout, 'learning_rate': args.learning_rate,
+         'batch_size': args.batch_size, 'epochs': args.epochs, 'patience': args.patience},
+        args.seed, args.test_size, args.cache_dir,
+    )
+    for key, metrics in pipeline.results['evaluate'].info.items():
+        print(f"{key}: " + ' '.join(f"{name}={value:.3f}" for name, value in metrics.items()))
+    bundle = None
+    if args.bundle:
+        bundle = export_bundle(pipeline, args.data, args.bundle)
+        print(f"wrote {args.bundle} (version {bundle.version})")
+    if args.evaluation:
+        evaluation_path = pipeline.results['evaluate'].path('evaluation.npz')
+        if bundle is None:
+            shutil.copyfile(evaluation_path, args.evaluation)
+        else:
+            from heart_failure.evaluation import load_evaluation, save_evaluation
+
+            evaluation = load_evaluation(evaluation_path)
+            evaluation['metadata']['bundle_version'] = bundle.version
+            save_evaluation(evaluation['metadata'], evaluation['models'], evaluation['history'], args.evaluation)
+        print(f"wrote {args.evaluation}")
+    print(f"{time.perf_counter() - start:.2f} s, "
+          f"{sum(r.cached for r in pipeline.results.values())}/{len(pipeline.results)} stages cached")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
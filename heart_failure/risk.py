@@ -0,0 +1,114 @@
+"""Vectorized clinical risk points used by the prediction page.
+
+Each factor is a sorted list of thresholds plus a points table, so scoring
+a column is one ``np.searchsorted`` and one ``np.take`` instead of an
+if/elif ladder per patient. The total becomes the batch results'
+``Clinical_Risk_Score`` column; the app's "Risk Factors Breakdown" chart shows
+the model's own attributions instead (:mod:`heart_failure.attribution`).
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from heart_failure.model import FEATURE_COLUMNS
+
+RISK_LEVELS = np.array(['LOW', 'MODERATE', 'HIGH'])
+# Percent cut-offs: below 30 is LOW, below 60 is MODERATE, otherwise HIGH.
+LEVEL_THRESHOLDS = (30, 60)
+MAX_SCORE = 100
+
+
+class RiskFactor(NamedTuple):
+    """Points awarded for one column.
+
+    ``points[i]`` is awarded when the value falls in the i-th bin of
+    ``edges``. With ``side='left'`` a value counts as past a threshold when it
+    is strictly greater (``age > 70``); with ``side='right'`` once it is equal
+    or greater, which expresses strict "lower is worse" thresholds such as
+    ``ejection_fraction < 30``.
+    """
+    label: str
+    column: str
+    edges: tuple
+    points: tuple
+    side: str = 'left'
+
+
+RISK_FACTORS = (
+    RiskFactor('Age', 'age', (50, 60, 70), (0, 10, 15, 25)),
+    RiskFactor('Ejection Fraction', 'ejection_fraction', (30, 40, 50), (30, 20, 10, 0), side='right'),
+    RiskFactor('Serum Creatinine', 'serum_creatinine', (1.2, 1.5, 2.0), (0, 10, 15, 20)),
+    RiskFactor('Anaemia', 'anaemia', (0.5,), (0, 10)),
+    RiskFactor('Diabetes', 'diabetes', (0.5,), (0, 10)),
+    RiskFactor('High BP', 'high_blood_pressure', (0.5,), (0, 10)),
+    RiskFactor('Smoking', 'smoking', (0.5,), (0, 10)),
+)
+FACTOR_LABELS = [factor.label for factor in RISK_FACTORS]
+
+
+class RiskScores(NamedTuple):
+    """Scores for N patients.
+
+    ``contributions`` is an ``(N, len(RISK_FACTORS))`` points matrix,
+    ``total`` its row sum capped at :data:`MAX_SCORE` and ``level_codes``
+    indexes :data:`RISK_LEVELS`.
+    """
+    total: np.ndarray
+    contributions: np.ndarray
+    level_codes: np.ndarray
+
+    @property
+    def levels(self):
+        return RISK_LEVELS[self.level_codes]
+
+    def to_frame(self, index=None):
+        import pandas as pd
+
+        frame = pd.DataFrame(self.contributions, columns=FACTOR_LABELS, index=index)
+        frame['Risk_Score'] = self.total
+        frame['Risk_Level'] = pd.Categorical.from_codes(self.level_codes, RISK_LEVELS)
+        return frame
+
+
+def _column(data, name):
+    if isinstance(data, np.ndarray) and data.ndim == 2:
+        return data[:, FEATURE_COLUMNS.index(name)]
+    return np.asarray(data[name])
+
+
+def factor_points(factor, values):
+    """Points for one factor over a whole column; missing values score 0."""
+    values = np.asarray(values)
+    # Compare in the column's own float precision so float32(1.2) is not "> 1.2"
+    edge_dtype = values.dtype if values.dtype.kind == 'f' else np.float64
+    bins = np.searchsorted(np.asarray(factor.edges, dtype=edge_dtype), values, side=factor.side)
+    points = np.take(np.asarray(factor.points, dtype=np.int16), bins)
+    if values.dtype.kind == 'f':
+        points[np.isnan(values)] = 0
+    return points
+
+
+def risk_level_codes(percent):
+    """Map 0-100 scores or percentages to indices into :data:`RISK_LEVELS`."""
+    return np.searchsorted(LEVEL_THRESHOLDS, percent, side='right').astype(np.uint8)
+
+
+def risk_levels(percent):
+    """Vectorized ``'LOW'``/``'MODERATE'``/``'HIGH'`` labels for 0-100 values."""
+    return RISK_LEVELS[risk_level_codes(percent)]
+
+
+def score_risk(data):
+    """Score every row of ``data`` in one pass.
+
+    ``data`` may be a DataFrame, a mapping of column arrays, or an
+    ``(N, 12)`` matrix in :data:`FEATURE_COLUMNS` order.
+    """
+    first = _column(data, RISK_FACTORS[0].column)
+    contributions = np.empty((len(first), len(RISK_FACTORS)), dtype=np.int16)
+    for j, factor in enumerate(RISK_FACTORS):
+        contributions[:, j] = factor_points(factor, _column(data, factor.column))
+
+    total = np.minimum(contributions.sum(axis=1, dtype=np.int16), MAX_SCORE)
+    return RiskScores(total, contributions, risk_level_codes(total))
@@ -0,0 +1,126 @@
+"""Compact column types for patient record frames.
+
+``pd.read_csv`` would give every column of the clinical dataset int64 or
+float64. The schema below keeps each column in the smallest type that
+holds it (26 bytes per row instead of 104), and is applied while parsing:
+
+* every known column is parsed straight into float32, so no 8-byte
+  intermediate is ever built and missing values still parse;
+* flag and count columns are then narrowed to uint8/int16 when every value
+  is a whole number in range. A column with missing or out-of-range
+  values stays float32 instead of silently wrapping around.
+
+The 0/1 flags are stored as uint8 rather than bool so they stay numeric
+for ``describe()``, ``corr()`` and the model.
+"""
+
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from heart_failure.model import TARGET_COLUMN
+
+PATIENT_SCHEMA = {
+    'age': np.float32,
+    'anaemia': np.uint8,
+    'creatinine_phosphokinase': np.int16,
+    'diabetes': np.uint8,
+    'ejection_fraction': np.int16,
+    'high_blood_pressure': np.uint8,
+    'platelets': np.float32,
+    'serum_creatinine': np.float32,
+    'serum_sodium': np.int16,
+    'sex': np.uint8,
+    'smoking': np.uint8,
+    'time': np.int16,
+    TARGET_COLUMN: np.uint8,
+}
+PARSE_DTYPES = {column: np.float32 for column in PATIENT_SCHEMA}
+# Rough size of one clinical record in CSV, to turn row counts into byte blocks
+CSV_BYTES_PER_ROW = 64
+
+
+def _narrow(values, dtype):
+    """``values`` as integer ``dtype`` if that is lossless, else None."""
+    info = np.iinfo(dtype)
+    if len(values) == 0:
+        return values.astype(dtype)
+    low, high = np.min(values), np.max(values)
+    # min/max are NaN when anything is missing, failing the range test
+    if not (info.min <= low and high <= info.max):
+        return None
+    narrowed = values.astype(dtype)
+    return narrowed if np.array_equal(narrowed, values) else None
+
+
+def compact(frame):
+    """Narrow schema columns of ``frame`` in place where lossless; returns it."""
+    for column, dtype in PATIENT_SCHEMA.items():
+        if column not in frame.columns or frame[column].dtype == dtype:
+            continue
+        values = frame[column].to_numpy()
+        if values.dtype.kind not in 'iuf':
+            continue
+        if np.dtype(dtype).kind == 'f':
+            frame[column] = values.astype(dtype)
+            continue
+        narrowed = _narrow(values, dtype)
+        if narrowed is not None:
+            frame[column] = narrowed
+        elif values.dtype != np.float32:
+            frame[column] = values.astype(np.float32)
+    return frame
+
+
+def read_patient_csv(source, **kwargs):
+    """``pd.read_csv`` with :data:`PATIENT_SCHEMA` applied during parsing.
+
+    A file whose schema columns are not numeric is parsed without the
+    schema. With ``chunksize`` the returned reader yields compacted chunks
+    of roughly that many rows, each falling back on its own.
+    """
+    if 'chunksize' in kwargs:
+        return _CompactReader(source, kwargs.pop('chunksize'), **kwargs)
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    start = source.tell() if hasattr(source, 'seek') else None
+    try:
+        return compact(pd.read_csv(source, dtype=PARSE_DTYPES, **kwargs))
+    except ValueError:
+        if start is None:
+            raise
+        source.seek(start)
+        return pd.read_csv(source, low_memory=False, **kwargs)
+
+
+class _CompactReader:
+    """Context manager and iterator over compacted chunks of a binary CSV.
+
+    The input is cut at line boundaries into blocks of about ``chunksize``
+    rows and each block is parsed separately, so one non-numeric value only
+    sends its own block down the schema-less path. Quoted fields must not
+    contain newlines.
+    """
+
+    def __init__(self, source, chunksize, **kwargs):
+        self._owned = isinstance(source, (str, os.PathLike))
+        self._source = open(source, 'rb') if self._owned else source
+        self._block_bytes = max(chunksize, 1) * CSV_BYTES_PER_ROW
+        self._kwargs = kwargs
+
+    def __iter__(self):
+        header = self._source.readline()
+        while True:
+            lines = self._source.readlines(self._block_bytes)
+            if not lines:
+                return
+            yield read_patient_csv(io.BytesIO(header + b''.join(lines)), **self._kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._owned:
+            self._source.close()
@@ -0,0 +1,317 @@
+"""Local HTTP prediction service with dynamic micro-batching.
+
+    python -m heart_failure.service --port 8765 --max-batch-size 64 --max-wait-ms 2
+
+``POST /predict`` takes one patient as a JSON object with the 12 clinical
+features (the same keys as the Streamlit form's ``input_data``), or a list
+of such objects, and answers with the same fields the batch scorer writes.
+Requests that arrive within ``max_wait_ms`` of each other are stacked into
+one matrix and scored with a single ``predict_proba`` call, up to
+``max_batch_size`` patients. ``GET /stats`` reports batching and latency
+counters as JSON, ``GET /metrics`` the same plus per-stage timings in the
+Prometheus text format, and ``GET /health`` the model bundle version.
+
+Only the standard library's asyncio streams are used, so the service adds
+no dependencies beyond NumPy.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from http import HTTPStatus
+
+import numpy as np
+
+from heart_failure.bundle import BUNDLE_PATH, get_bundle
+from heart_failure.metrics import METRICS, PROMETHEUS_CONTENT_TYPE, stage
+from heart_failure.model import FEATURE_COLUMNS
+from heart_failure.risk import RISK_LEVELS, risk_level_codes, score_risk
+from heart_failure.validation import matrix_errors
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+MAX_BODY_BYTES = 1 << 20
+LATENCY_WINDOW = 10_000
+MAX_REPORTED_ERRORS = 5
+
+
+class RequestError(ValueError):
+    """A client error, answered with ``400 Bad Request``."""
+
+
+def parse_patients(payload):
+    """``(N, 12)`` float32 matrix from one patient object or a list of them."""
+    records = [payload] if isinstance(payload, dict) else payload
+    if not isinstance(records, list) or not records or not all(isinstance(r, dict) for r in records):
+        raise RequestError("Expected a patient object or a non-empty list of patient objects")
+    missing = [c for c in FEATURE_COLUMNS if c not in records[0]]
+    if missing:
+        raise RequestError(f"Missing required columns: {', '.join(missing)}")
+    try:
+        X = np.array([[_number(record[c]) for c in FEATURE_COLUMNS] for record in records], dtype=np.float64)
+    except (KeyError, TypeError, ValueError) as e:
+        raise RequestError(f"Invalid patient record: {e}") from None
+    # Same rules as batch input: no missing or non-finite values, clinical ranges, 0/1 flags
+    errors = matrix_errors(X)
+    if errors:
+        shown = [f"patient {row}: {reasons}" for row, reasons in list(errors.items())[:MAX_REPORTED_ERRORS]]
+        more = f" (and {len(errors) - len(shown)} more)" if len(errors) > len(shown) else ''
+        raise RequestError(f"Invalid patient values: {' | '.join(shown)}{more}")
+    return X.astype(np.float32)
+
+
+def _number(value):
+    # null is reported as a missing value rather than a parse error
+    return np.nan if value is None else float(value)
+
+
+def score_matrix(model, X):
+    """One result dict per row, with the batch scorer's fields."""
+    probabilities = model.predict_proba(X)
+    levels = RISK_LEVELS[risk_level_codes(probabilities * 100)]
+    clinical = score_risk(X).total
+    return [
+        {
+            'Prediction': int(p >= 0.5),
+            'Risk_Probability': float(p),
+            'Risk_Level': str(level),
+            'Clinical_Risk_Score': int(score),
+        }
+        for p, level, score in zip(probabilities, levels, clinical)
+    ]
+
+
+# ======================== MICRO-BATCHING ========================
+
+class MicroBatcher:
+    """Merge concurrent :meth:`submit` calls into single inference calls.
+
+    The first waiting request opens a batch; it is closed when
+    ``max_batch_size`` rows are queued or ``max_wait_ms`` has passed,
+    whichever comes first. Inference of a few hundred rows takes
+    microseconds, so it runs on the event loop instead of a thread.
+    """
+
+    def __init__(self, model, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.rows = 0
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, X):
+        """Results for the rows of ``X``, scored together with other pending requests."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((X, future))
+        return await future
+
+    async def _collect(self):
+        pending = [await self._queue.get()]
+        rows = len(pending[0][0])
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while rows < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            pending.append(item)
+            rows += len(item[0])
+        return pending
+
+    async def _run(self):
+        while True:
+            pending = await self._collect()
+            X = np.concatenate([rows for rows, _ in pending]) if len(pending) > 1 else pending[0][0]
+            try:
+                with stage('service.predict', rows=len(X)):
+                    results = score_matrix(self.model, X)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(X)
+            start = 0
+            for rows, future in pending:
+                if not future.done():
+                    future.set_result(results[start:start + len(rows)])
+                start += len(rows)
+
+
+# ======================== HTTP ========================
+
+class PredictionService:
+    """Minimal HTTP/1.1 server (keep-alive, ``Content-Length`` bodies) in front of a :class:`MicroBatcher`."""
+
+    def __init__(self, bundle, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.bundle = bundle
+        self.batcher = MicroBatcher(bundle.model, max_batch_size, max_wait_ms)
+        self.requests = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.perf_counter()
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        uptime = time.perf_counter() - self.started
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'batches': self.batcher.batches,
+            'rows': self.batcher.rows,
+            'mean_batch_rows': self.batcher.rows / max(self.batcher.batches, 1),
+            'latency_ms': {
+                'p50': float(np.percentile(latencies, 50)),
+                'p99': float(np.percentile(latencies, 99)),
+                'max': float(latencies.max()),
+            },
+            'uptime_seconds': uptime,
+            'max_batch_size': self.batcher.max_batch_size,
+            'max_wait_ms': self.batcher.max_wait * 1000,
+        }
+
+    def prometheus(self):
+        """Service counters and the per-stage registry in Prometheus text format."""
+        stats = self.stats()
+        lines = []
+        for name, kind, value, help_text in (
+            ('hf_service_requests_total', 'counter', stats['requests'], "Prediction requests answered."),
+            ('hf_service_errors_total', 'counter', stats['errors'], "Prediction requests answered with an error."),
+            ('hf_service_batches_total', 'counter', stats['batches'], "Micro-batches scored."),
+            ('hf_service_rows_total', 'counter', stats['rows'], "Patients scored."),
+            ('hf_service_uptime_seconds', 'gauge', stats['uptime_seconds'], "Seconds since the service started."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+        lines += ["# HELP hf_service_latency_seconds Request latency over the recent window.",
+                  "# TYPE hf_service_latency_seconds gauge"]
+        for quantile, key in (('0.5', 'p50'), ('0.99', 'p99')):
+            lines.append(f'hf_service_latency_seconds{{quantile="{quantile}"}} {stats["latency_ms"][key] / 1000}')
+        return '\n'.join(lines) + '\n' + METRICS.prometheus()
+
+    async def handle(self, method, path, body):
+        """``(status, payload)`` for one request."""
+        if path == '/predict':
+            if method != 'POST':
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': "Use POST"}
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                raise RequestError("Body is not valid JSON") from None
+            results = await self.batcher.submit(parse_patients(payload))
+            return HTTPStatus.OK, results[0] if isinstance(payload, dict) else results
+        if path == '/stats':
+            return HTTPStatus.OK, self.stats()
+        if path == '/metrics':
+            return HTTPStatus.OK, self.prometheus()
+        if path == '/health':
+            return HTTPStatus.OK, {'status': 'ok', 'bundle_version': self.bundle.version}
+        return HTTPStatus.NOT_FOUND, {'error': f"No route for {path}"}
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_BYTES:
+                    status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': "Body too large"}
+                    await reader.readexactly(length)
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    start = time.perf_counter()
+                    try:
+                        status, payload = await self.handle(method, path.split('?', 1)[0], body)
+                    except RequestError as e:
+                        status, payload = HTTPStatus.BAD_REQUEST, {'error': str(e)}
+                    except Exception as e:
+                        status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+                    if path.startswith('/predict'):
+                        self.requests += 1
+                        self.errors += status != HTTPStatus.OK
+                        self.latencies.append(time.perf_counter() - start)
+
+                if isinstance(payload, str):
+                    data, content_type = payload.encode(), PROMETHEUS_CONTENT_TYPE
+                else:
+                    data, content_type = json.dumps(payload).encode(), 'application/json'
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: {content_type}\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.batcher.start()
+        return await asyncio.start_server(self.serve_connection, host, port)
+
+
+async def serve(bundle_path=BUNDLE_PATH, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    service = PredictionService(get_bundle(bundle_path), max_batch_size, max_wait_ms)
+    server = await service.start(host, port)
+    print(f"serving model {service.bundle.version} on http://{host}:{port} "
+          f"(max batch {max_batch_size}, max wait {max_wait_ms} ms)", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve heart failure risk predictions over HTTP")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--bundle', default=str(BUNDLE_PATH), help="Model bundle (.npz)")
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="Most patients scored in one inference call")
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="How long the first request of a batch waits for others")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.bundle, args.host, args.port, args.max_batch_size, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
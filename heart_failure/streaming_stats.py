@@ -0,0 +1,501 @@
+"""Out-of-core summary statistics in one chunked pass.
+
+Every statistic the Data Analysis page shows is kept in an accumulator
+that can be updated with a chunk and merged with another accumulator:
+
+* :class:`Moments`: per column count, mean, variance, min and max, and the
+  pairwise-complete covariance of every column pair. Each chunk is
+  centred on its own column means before its sums are taken, and chunks
+  are combined with the pairwise update of Chan et al., so large offsets
+  such as platelet counts do not cancel catastrophically.
+* :class:`QuantileSketch`: a DDSketch with logarithmic buckets, giving
+  quantiles within a fixed relative error whatever the number of rows.
+* :class:`StreamingAnalysis`: both of the above for the whole file and per
+  ``DEATH_EVENT`` class, with the interface of
+  :class:`heart_failure.analytics.DatasetAnalysis`, so the page renders
+  either.
+
+Only the first rows are kept, so a file larger than RAM can be summarized
+chunk by chunk, and blocks of a file on disk can be summarized in
+parallel and merged::
+
+    python -m heart_failure.streaming_stats extract.parquet --workers 8
+"""
+
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+
+from heart_failure.analytics import MAX_HISTOGRAM_BINS
+from heart_failure.model import TARGET_COLUMN
+
+DEFAULT_RELATIVE_ACCURACY = 0.005
+HEAD_ROWS = 20
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+# ======================== MOMENTS ========================
+
+class Moments:
+    """Pairwise-complete counts, means and co-moments of ``k`` columns.
+
+    For every pair ``(i, j)``, ``n[i, j]`` counts the rows where both are
+    present, ``mean[i, j]`` is the mean of column ``i`` over those rows,
+    ``comoment[i, j]`` the sum of products of the two centred columns and
+    ``square[i, j]`` the centred sum of squares of column ``i``. The
+    diagonal holds the single-column statistics.
+    """
+
+    def __init__(self, k):
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.comoment = np.zeros((k, k))
+        self.square = np.zeros((k, k))
+        self.minimum = np.full(k, np.inf)
+        self.maximum = np.full(k, -np.inf)
+
+    def update(self, X):
+        """Add the rows of an ``(rows, k)`` float matrix; NaN marks a missing value."""
+        if len(X) == 0:
+            return
+        valid = ~np.isnan(X)
+        present = valid.astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            shift = np.nan_to_num(np.nansum(X, axis=0) / present.sum(axis=0))
+            centred = np.where(valid, X - shift, 0.0)
+            n = present.T @ present
+            sums = centred.T @ present                # sums[i, j]: centred x_i over rows with i and j
+            means = np.where(n > 0, sums / n, 0.0)
+            chunk = Moments.__new__(Moments)
+            chunk.n = n
+            chunk.mean = shift[:, None] + means
+            chunk.comoment = centred.T @ centred - sums * means.T
+            chunk.square = (centred * centred).T @ present - sums * means
+        chunk.minimum = np.where(valid.any(axis=0), np.nanmin(np.where(valid, X, np.inf), axis=0), np.inf)
+        chunk.maximum = np.where(valid.any(axis=0), np.nanmax(np.where(valid, X, -np.inf), axis=0), -np.inf)
+        self.merge(chunk)
+
+    def merge(self, other):
+        """Fold ``other`` (same columns) into this accumulator."""
+        n = self.n + other.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = other.mean - self.mean
+            weight = np.where(n > 0, other.n / n, 0.0)
+            scale = np.where(n > 0, self.n * other.n / n, 0.0)
+        self.comoment = self.comoment + other.comoment + delta * delta.T * scale
+        self.square = self.square + other.square + delta * delta * scale
+        self.mean = self.mean + delta * weight
+        self.n = n
+        self.minimum = np.minimum(self.minimum, other.minimum)
+        self.maximum = np.maximum(self.maximum, other.maximum)
+        return self
+
+    @property
+    def count(self):
+        return np.diag(self.n)
+
+    @property
+    def means(self):
+        return np.where(self.count > 0, np.diag(self.mean), np.nan)
+
+    def variance(self, ddof=1):
+        count = self.count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > ddof, np.diag(self.comoment) / (count - ddof), np.nan)
+
+    def correlation(self):
+        """Pearson correlation over pairwise-complete rows, like ``DataFrame.corr()``."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.sqrt(self.square * self.square.T)
+        corr[self.n < 2] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+
+# ======================== QUANTILES ========================
+
+class QuantileSketch:
+    """DDSketch: quantiles within ``relative_accuracy`` of the true value.
+
+    Values go into logarithmic buckets ``(gamma**(i-1), gamma**i]`` (mirrored
+    for negatives, with a separate zero count); buckets are counts, so two
+    sketches merge by adding them.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _add(self, store, magnitudes):
+        keys, counts = np.unique(np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64),
+                                 return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self._add(self.positive, values[values > 0])
+        self._add(self.negative, -values[values < 0])
+        self.zeros += int(np.count_nonzero(values == 0))
+        self.count += int(values.size)
+
+    def merge(self, other):
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def buckets(self):
+        """``(values, counts)`` of every bucket in ascending value order."""
+        def representative(keys):
+            return 2 * self.gamma ** keys / (self.gamma + 1)
+
+        negative_keys = np.array(sorted(self.negative, reverse=True), dtype=np.float64)
+        positive_keys = np.array(sorted(self.positive), dtype=np.float64)
+        values = np.concatenate([-representative(negative_keys), [0.0] if self.zeros else [],
+                                 representative(positive_keys)])
+        counts = np.concatenate([[self.negative[int(k)] for k in negative_keys],
+                                 [self.zeros] if self.zeros else [],
+                                 [self.positive[int(k)] for k in positive_keys]])
+        return values, counts.astype(np.int64)
+
+    def quantiles(self, qs):
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        values, counts = self.buckets()
+        cumulative = np.cumsum(counts)
+        ranks = np.asarray(qs) * (self.count - 1)
+        return values[np.searchsorted(cumulative, ranks, side='right')]
+
+    @property
+    def nbytes(self):
+        return 100 * (len(self.positive) + len(self.negative))
+
+
+# ======================== SUMMARIES ========================
+
+class ColumnSummary:
+    """:class:`Moments` plus one :class:`QuantileSketch` and an integrality flag per column."""
+
+    def __init__(self, columns, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.columns = list(columns)
+        self.moments = Moments(len(self.columns))
+        self.sketches = [QuantileSketch(relative_accuracy) for _ in self.columns]
+        self.integral = np.ones(len(self.columns), dtype=bool)
+
+    def update(self, X):
+        self.moments.update(X)
+        for j, sketch in enumerate(self.sketches):
+            values = X[:, j]
+            sketch.update(values)
+            if self.integral[j]:
+                present = values[~np.isnan(values)]
+                self.integral[j] = bool(np.all(present == np.round(present)))
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        for mine, theirs in zip(self.sketches, other.sketches):
+            mine.merge(theirs)
+        self.integral &= other.integral
+        return self
+
+    def quantiles(self, j, qs=QUANTILES):
+        """Sketch quantiles of column ``j``, kept within its range.
+
+        Bucket representatives sit between observed values (0.995 for a
+        column of 0s and 1s), so whole-number columns are rounded back.
+        """
+        values = self.sketches[j].quantiles(qs)
+        if self.integral[j]:
+            values = np.round(values)
+        if self.moments.count[j] > 0:
+            values = np.clip(values, self.moments.minimum[j], self.moments.maximum[j])
+        return values
+
+    def describe(self, columns=None):
+        """``DataFrame.describe()`` layout, quantiles from the sketches."""
+        import pandas as pd
+
+        quantiles = np.array([self.quantiles(j) for j in range(len(self.columns))]).T
+        m = self.moments
+        table = pd.DataFrame(
+            np.vstack([m.count, m.means, np.sqrt(m.variance()),
+                       np.where(m.count > 0, m.minimum, np.nan), quantiles,
+                       np.where(m.count > 0, m.maximum, np.nan)]),
+            index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+            columns=self.columns,
+        )
+        return table if columns is None else table[columns]
+
+    def box(self, j):
+        """Box-plot statistics like :func:`heart_failure.analytics.box_summary`, from the sketch."""
+        sketch, m = self.sketches[j], self.moments
+        if sketch.count == 0:
+            return None
+        q1, median, q3 = (float(q) for q in self.quantiles(j))
+        minimum, maximum = float(m.minimum[j]), float(m.maximum[j])
+        values, _ = sketch.buckets()
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        return {
+            'count': int(sketch.count),
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'mean': float(m.means[j]),
+            'lowerfence': max(float(inside.min()), minimum) if inside.size else minimum,
+            'upperfence': min(float(inside.max()), maximum) if inside.size else maximum,
+            'min': minimum,
+            'max': maximum,
+        }
+
+    def histogram(self, j, max_bins=MAX_HISTOGRAM_BINS):
+        """``(counts, edges)`` re-binned from the sketch; whole-number columns get unit bins."""
+        sketch, m = self.sketches[j], self.moments
+        if sketch.count == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(1)
+        low, high = float(m.minimum[j]), float(m.maximum[j])
+        if self.integral[j] and high - low + 1 <= max_bins:
+            edges = np.arange(low - 0.5, high + 1.5)
+        else:
+            bins = min(max_bins, int(np.ceil(np.log2(sketch.count))) + 1)
+            edges = np.linspace(low, high if high > low else low + 1, bins + 1)
+        values, counts = sketch.buckets()
+        # Bucket representatives can sit just outside the exact range
+        counts, edges = np.histogram(np.clip(values, edges[0], edges[-1]), bins=edges, weights=counts)
+        return counts.astype(np.int64), edges
+
+
+class StreamingAnalysis:
+    """Statistics of a dataset seen one chunk at a time.
+
+    Offers the attributes of :class:`~heart_failure.analytics.DatasetAnalysis`
+    that the Data Analysis page reads, except ``frame``, which is None:
+    only the first :data:`HEAD_ROWS` rows are kept.
+    """
+
+    frame = None
+
+    def __init__(self, target=TARGET_COLUMN, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.target_name = target
+        self.relative_accuracy = relative_accuracy
+        self.columns = None
+        self.summary_columns = None
+        self.overall = None
+        self.by_class = {}
+        self.first_rows = None
+        self.n_rows = 0
+        self.missing_count = 0
+        self._distributions = {}
+
+    def update(self, chunk):
+        """Add one DataFrame chunk; every chunk must have the first one's columns."""
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            numeric = chunk.select_dtypes(include=[np.number]).columns
+            self.summary_columns = list(numeric)
+            self.overall = ColumnSummary(self.summary_columns, self.relative_accuracy)
+            self.first_rows = chunk.head(HEAD_ROWS).copy()
+        elif len(self.first_rows) < HEAD_ROWS:
+            import pandas as pd
+
+            self.first_rows = pd.concat([self.first_rows, chunk.head(HEAD_ROWS - len(self.first_rows))])
+        self.n_rows += len(chunk)
+        self.missing_count += int(chunk.isnull().sum().sum())
+        X = chunk[self.summary_columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        self.overall.update(X)
+        if self.target_name in self.summary_columns:
+            labels = X[:, self.summary_columns.index(self.target_name)]
+            for label in np.unique(labels[~np.isnan(labels)]):
+                key = int(label) if float(label).is_integer() else float(label)
+                if key not in self.by_class:
+                    self.by_class[key] = ColumnSummary(self.summary_columns, self.relative_accuracy)
+                self.by_class[key].update(X[labels == label])
+        self._distributions.clear()
+        return self
+
+    def merge(self, other):
+        """Fold in the summary of a later part of the same file."""
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.__dict__.update(other.__dict__)
+            return self
+        if len(self.first_rows) < HEAD_ROWS:
+            import pandas as pd
+
+            self.first_rows = pd.concat([self.first_rows, other.first_rows.head(HEAD_ROWS - len(self.first_rows))])
+        self.n_rows += other.n_rows
+        self.missing_count += other.missing_count
+        self.overall.merge(other.overall)
+        for key, summary in other.by_class.items():
+            if key in self.by_class:
+                self.by_class[key].merge(summary)
+            else:
+                self.by_class[key] = summary
+        self._distributions.clear()
+        return self
+
+    # ---- DatasetAnalysis interface ----
+
+    @property
+    def target(self):
+        return self.target_name if self.summary_columns and self.target_name in self.summary_columns else None
+
+    @property
+    def shape(self):
+        return self.n_rows, len(self.columns or [])
+
+    def head(self, n=HEAD_ROWS):
+        return self.first_rows.head(n)
+
+    @property
+    def numeric_columns(self):
+        return [c for c in self.summary_columns if c != self.target]
+
+    @property
+    def describe(self):
+        return self.overall.describe()
+
+    @property
+    def corr(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.overall.moments.correlation(),
+                            index=self.summary_columns, columns=self.summary_columns)
+
+    @property
+    def class_describe(self):
+        return {key: self.by_class[key].describe(self.numeric_columns) for key in sorted(self.by_class)}
+
+    @property
+    def class_counts(self):
+        if not self.target:
+            return None
+        import pandas as pd
+
+        j = self.summary_columns.index(self.target)
+        keys = sorted(self.by_class)
+        return pd.Series([int(self.by_class[k].moments.count[j]) for k in keys], index=keys, name='count')
+
+    @property
+    def target_rate(self):
+        if not self.target:
+            return None
+        return float(self.overall.moments.means[self.summary_columns.index(self.target)])
+
+    @property
+    def target_corr(self):
+        return self.corr[self.target].drop(self.target).sort_values(ascending=False)
+
+    @property
+    def nbytes(self):
+        summaries = [self.overall, *self.by_class.values()]
+        sketch_bytes = sum(s.nbytes for summary in summaries for s in summary.sketches)
+        k = len(self.summary_columns or [])
+        return int(self.first_rows.memory_usage(deep=True).sum()) + sketch_bytes + len(summaries) * 4 * 8 * k * k
+
+    def distribution(self, column):
+        """Histogram plus overall and per-class box statistics for ``column``, memoized."""
+        if column not in self._distributions:
+            j = self.summary_columns.index(column)
+            self._distributions[column] = {
+                'histogram': self.overall.histogram(j),
+                'box': self.overall.box(j),
+                'box_by_class': {key: self.by_class[key].box(j) for key in sorted(self.by_class)},
+            }
+        return self._distributions[column]
+
+
+def summarize_chunks(chunks, target=TARGET_COLUMN):
+    """:class:`StreamingAnalysis` of an iterable of DataFrames."""
+    analysis = StreamingAnalysis(target)
+    for chunk in chunks:
+        analysis.update(chunk)
+    return analysis
+
+
+# ======================== FILES ========================
+
+def _summarize_block(task):
+    """Summary of one block of a file; runs in a worker process."""
+    import io
+
+    from heart_failure.columnar import ColumnarFile
+    from heart_failure.schema import compact, read_patient_csv
+
+    path, fmt, header, start, stop = task
+    if fmt == 'csv':
+        with open(path, 'rb') as f:
+            f.seek(start)
+            frame = read_patient_csv(io.BytesIO(header + f.read(stop - start)))
+    else:
+        frame = compact(ColumnarFile(path, fmt).read_parts(start, stop).to_pandas())
+    return StreamingAnalysis().update(frame)
+
+
+def summarize_file(path, workers=1, block_bytes=None):
+    """Summarize a CSV, Parquet or Arrow file block by block, in ``workers`` processes.
+
+    Blocks are merged in file order, so the result does not depend on
+    ``workers``; peak memory is about one block per worker.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from heart_failure.batch import DEFAULT_BLOCK_BYTES, plan_blocks
+    from heart_failure.columnar import file_format
+
+    fmt = file_format(path)
+    header, ranges, _ = plan_blocks(path, fmt, block_bytes or DEFAULT_BLOCK_BYTES, require_features=False)
+    tasks = [(os.fspath(path), fmt, header, start, stop) for start, stop in ranges]
+    analysis = StreamingAnalysis()
+    if workers <= 1:
+        for task in tasks:
+            analysis.merge(_summarize_block(task))
+        return analysis
+    with ProcessPoolExecutor(workers) as executor:
+        for part in executor.map(_summarize_block, tasks):
+            analysis.merge(part)
+    return analysis
+
+
+def main(argv=None):
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Summary statistics of a file of any size in one pass")
+    parser.add_argument('input', help="CSV, Parquet or Arrow/Feather file")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--block-mb', type=float, default=32)
+    parser.add_argument('--json', help="Also write describe/corr/per-class tables to this file")
+    args = parser.parse_args(argv)
+
+    analysis = summarize_file(args.input, args.workers, int(args.block_mb * 2**20))
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.precision', 3):
+        print(f"{analysis.n_rows:,} rows, {analysis.missing_count:,} missing values\n")
+        print(analysis.describe, end='\n\n')
+        print(analysis.corr)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'rows': analysis.n_rows,
+                'missing': analysis.missing_count,
+                'describe': analysis.describe.to_dict(),
+                'corr': analysis.corr.to_dict(),
+                'by_class': {str(k): v.to_dict() for k, v in analysis.class_describe.items()},
+            }, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+"""Synthetic patient populations for scale and load testing.
+
+A Gaussian copula is fitted to the bundled 299-row dataset: every column
+keeps its own empirical marginal, and the latent normal correlation is
+calibrated so the synthetic rows reproduce the dataset's rank (Spearman)
+correlations, including those of the 0/1 flags. Sampling draws correlated
+normals, maps them through the standard normal CDF and reads each column's
+value at that quantile. Discrete columns (the flags, ``DEATH_EVENT``) only take
+observed values; continuous ones interpolate between observed values and
+are rounded to the source's precision.
+
+Rows are produced in fixed-size chunks from one seeded generator, so
+memory is bounded by the chunk size and a given seed yields the same rows
+whatever the chunk size::
+
+    python -m heart_failure.synthetic population.parquet --rows 100000000 --seed 7
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from heart_failure.model import DATASET_PATH, FEATURE_COLUMNS, TARGET_COLUMN
+from heart_failure.schema import compact
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+# Columns with at most this many distinct values are sampled as discrete
+MAX_DISCRETE_VALUES = 10
+CALIBRATION_ROWS = 100_000
+CALIBRATION_ITERATIONS = 8
+
+
+def _nearest_correlation(matrix, floor=1e-6):
+    """``matrix`` made a valid correlation matrix: symmetric, unit diagonal, positive definite."""
+    matrix = np.clip((matrix + matrix.T) / 2, -0.999, 0.999)
+    np.fill_diagonal(matrix, 1.0)
+    eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+    matrix = (eigenvectors * np.maximum(eigenvalues, floor)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(matrix))
+    return matrix / np.outer(scale, scale)
+
+
+def _decimals(values, max_decimals=3):
+    """Fewest decimals that represent every value of ``values`` exactly."""
+    for decimals in range(max_decimals + 1):
+        if np.allclose(np.round(values, decimals), values, rtol=0, atol=1e-9):
+            return decimals
+    return max_decimals
+
+
+class PopulationModel:
+    """Gaussian copula over empirical marginals, fitted with :meth:`fit`."""
+
+    def __init__(self, columns, sorted_values, discrete, decimals, cholesky):
+        self.columns = list(columns)
+        self.sorted_values = sorted_values  # per column, ascending observed values
+        self.discrete = discrete            # per column, sample observed values only
+        self.decimals = decimals            # per column, rounding of interpolated values
+        self.cholesky = cholesky            # lower factor of the latent normal correlation
+
+    @classmethod
+    def fit(cls, frame, calibration_rows=CALIBRATION_ROWS, iterations=CALIBRATION_ITERATIONS, seed=0):
+        """Fit marginals, then the latent correlation that reproduces ``frame``'s rank correlations.
+
+        For continuous columns Spearman's rho maps to the normal correlation
+        as ``2 sin(pi rho / 6)``. Cutting normals back to 0/1 flags weakens
+        their correlation, so the latent matrix is then corrected for
+        ``iterations`` rounds against a ``calibration_rows`` sample.
+        """
+        from scipy.stats import spearmanr
+
+        values = frame.to_numpy(dtype=np.float64)
+        if np.isnan(values).any():
+            raise ValueError("The copula is fitted on complete rows only; drop missing values first")
+        target = spearmanr(values).statistic
+        model = cls(
+            frame.columns,
+            [np.sort(values[:, j]) for j in range(values.shape[1])],
+            [len(np.unique(values[:, j])) <= MAX_DISCRETE_VALUES for j in range(values.shape[1])],
+            [_decimals(values[:, j]) for j in range(values.shape[1])],
+            None,
+        )
+        latent = 2 * np.sin(np.pi * target / 6)
+        rng = np.random.default_rng(seed)
+        for _ in range(iterations):
+            model.cholesky = np.linalg.cholesky(_nearest_correlation(latent))
+            achieved = spearmanr(model.sample(calibration_rows, rng).to_numpy(dtype=np.float64)).statistic
+            latent = latent + (target - achieved)
+        model.cholesky = np.linalg.cholesky(_nearest_correlation(latent))
+        return model
+
+    def sample(self, n_rows, rng):
+        """DataFrame of ``n_rows`` synthetic patients drawn with ``rng``."""
+        import pandas as pd
+        from scipy.special import ndtr
+
+        # float32 throughout: the quantiles only index a few hundred observed values
+        z = rng.standard_normal((n_rows, len(self.columns)), dtype=np.float32)
+        z = z @ self.cholesky.T.astype(np.float32)
+        u = ndtr(np.ascontiguousarray(z.T))  # one contiguous row per column
+        data = {}
+        for j, column in enumerate(self.columns):
+            observed = self.sorted_values[j]
+            if self.discrete[j]:
+                # Inverse empirical CDF: the smallest observed value with F(x) >= u
+                index = np.minimum((u[j] * len(observed)).astype(np.int64), len(observed) - 1)
+                data[column] = observed[index]
+            else:
+                position = u[j] * (len(observed) - 1)
+                data[column] = np.round(np.interp(position, np.arange(len(observed)), observed),
+                                        self.decimals[j])
+        return compact(pd.DataFrame(data))
+
+
+def fit_population(dataset_path=DATASET_PATH):
+    """:class:`PopulationModel` of the 12 features and the target in ``dataset_path``."""
+    import pandas as pd
+
+    frame = pd.read_csv(dataset_path)
+    return PopulationModel.fit(frame[FEATURE_COLUMNS + [TARGET_COLUMN]])
+
+
+def generate(n_rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS, model=None):
+    """Yield DataFrames of at most ``chunk_rows`` synthetic rows, ``n_rows`` in total."""
+    model = model or fit_population()
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_rows, chunk_rows):
+        yield model.sample(min(chunk_rows, n_rows - start), rng)
+
+
+def write_population(destination, n_rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS, progress=None):
+    """Stream ``n_rows`` synthetic rows to a CSV, Parquet or Arrow file."""
+    from heart_failure.columnar import ResultWriter
+
+    with ResultWriter(destination) as writer:
+        for chunk in generate(n_rows, seed, chunk_rows):
+            writer.write(chunk)
+            if progress is not None:
+                progress(writer.rows)
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic patient population")
+    parser.add_argument('output', help=".csv, .parquet, .arrow or .feather")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    def report(rows_done):
+        print(f"\r{rows_done / max(args.rows, 1):6.1%}  {rows_done:,} rows", end='', flush=True)
+
+    rows = write_population(args.output, args.rows, args.seed, args.chunk_rows, progress=report)
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(args.output) / 1e6
+    print(f"\nwrote {rows:,} rows ({size_mb:,.1f} MB) in {elapsed:.2f} s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/s) -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""Model definitions shared by the evaluation, cross-validation and tuning jobs.
+
+The ANN mirrors the notebook's Keras network and training cell; the other
+estimators are the scikit-learn models the app compares against. Heavy
+libraries are imported inside the functions so importing this module
+stays cheap.
+"""
+
+import numpy as np
+
+from heart_failure.model import FEATURE_COLUMNS
+
+# The notebook's architecture and training settings
+ANN_DEFAULTS = {
+    'units': (16, 8),
+    'dropout': (0.5, 0.2),
+    'learning_rate': 1e-3,
+    'batch_size': 25,
+    'epochs': 80,
+    'patience': 5,
+    'validation_split': 0.25,
+}
+
+MODEL_NAMES = ('SVM', 'ANN', 'Random Forest', 'Logistic Regression')
+
+
+def build_ann(units=ANN_DEFAULTS['units'], dropout=ANN_DEFAULTS['dropout'],
+              learning_rate=ANN_DEFAULTS['learning_rate']):
+    """Dense -> BatchNormalization -> Dropout blocks and a sigmoid output."""
+    from tensorflow import keras
+
+    layers = [keras.Input(shape=(len(FEATURE_COLUMNS),))]
+    for width, rate in zip(units, dropout):
+        layers += [
+            keras.layers.Dense(width, activation='relu'),
+            keras.layers.BatchNormalization(),
+            keras.layers.Dropout(rate),
+        ]
+    layers.append(keras.layers.Dense(1, activation='sigmoid'))
+    model = keras.Sequential(layers)
+    model.compile(optimizer=keras.optimizers.Adam(learning_rate), loss='binary_crossentropy',
+                  metrics=['accuracy'])
+    return model
+
+
+def fit_ann(X, y, seed=42, validation_data=None, verbose=0, **params):
+    """Train with the notebook's early stopping; returns ``(model, history)``.
+
+    Without ``validation_data`` the last ``validation_split`` of the rows is
+    held out, as in the notebook.
+    """
+    from tensorflow import keras
+
+    params = dict(ANN_DEFAULTS, **params)
+    keras.utils.set_random_seed(seed)
+    model = build_ann(params['units'], params['dropout'], params['learning_rate'])
+    early_stopping = keras.callbacks.EarlyStopping(
+        patience=params['patience'], min_delta=0.001, restore_best_weights=True
+    )
+    history = model.fit(
+        X, y,
+        batch_size=params['batch_size'],
+        epochs=params['epochs'],
+        validation_split=0.0 if validation_data is not None else params['validation_split'],
+        validation_data=validation_data,
+        callbacks=[early_stopping],
+        verbose=verbose,
+    )
+    curves = {name: np.asarray(values, dtype=np.float64) for name, values in history.history.items()}
+    return model, curves
+
+
+def fit_model(name, X, y, seed=42):
+    """Fit one of :data:`MODEL_NAMES` and return a ``scores(X)`` callable.
+
+    Scores rank patients by risk (probability or decision value); the class
+    prediction is ``scores >= threshold`` with the threshold also returned.
+    """
+    if name == 'ANN':
+        model, _ = fit_ann(X, y, seed=seed)
+        return (lambda X_: model.predict(X_, verbose=0)[:, 0]), 0.5
+
+    if name == 'SVM':
+        from sklearn.svm import SVC
+
+        model = SVC(random_state=seed).fit(X, y)
+        return model.decision_function, 0.0
+    if name == 'Random Forest':
+        from sklearn.ensemble import RandomForestClassifier
+
+        model = RandomForestClassifier(random_state=seed, n_jobs=1).fit(X, y)
+    elif name == 'Logistic Regression':
+        from sklearn.linear_model import LogisticRegression
+
+        model = LogisticRegression(max_iter=1000, random_state=seed).fit(X, y)
+    else:
+        raise ValueError(f"Unknown model {name!r}; expected one of {', '.join(MODEL_NAMES)}")
+    return (lambda X_: model.predict_proba(X_)[:, 1]), 0.5
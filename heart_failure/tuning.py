@@ -0,0 +1,277 @@
+"""Successive-halving hyperparameter search for the ANN.
+
+Trials sample layer widths, dropout rates, learning rate and batch size
+from :data:`SEARCH_SPACE`. Every trial is scored by stratified k-fold
+ROC AUC on the held-out folds, reusing the memory-mapped folds of
+:mod:`heart_failure.cv`; early stopping only sees the training rows.
+Successive halving gives all trials a small epoch budget, keeps the best
+``1 / eta`` and multiplies the budget by ``eta`` until the survivors
+train for the notebook's full 80 epochs, so most of the compute goes to
+promising configurations.
+
+Each ``(trial, fold)`` fit is one task for a pool of spawned worker
+processes. Each worker is pinned to its own core and limited to one
+BLAS/TensorFlow thread, and seeds depend only on the trial and fold, so
+results do not depend on the number of workers. The winning configuration
+is retrained on the whole dataset and written to the model bundle, with
+the search summary in its metadata::
+
+    python -m heart_failure.tuning --trials 27 --eta 3 --workers 8
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from heart_failure.bundle import BUNDLE_PATH, build_bundle, save_bundle
+from heart_failure.cv import _limit_threads, prepare_folds
+from heart_failure.evaluation import threshold_curves
+from heart_failure.model import DATA_DIR, DATASET_PATH, FEATURE_COLUMNS, TARGET_COLUMN, reference_scaler
+from heart_failure.training import ANN_DEFAULTS, fit_ann
+
+TUNING_RESULTS_PATH = DATA_DIR / 'tuning_results.json'
+TUNED_MODEL_PATH = DATA_DIR / 'model_tuned.h5'
+DEFAULT_TRIALS = 27
+DEFAULT_ETA = 3
+DEFAULT_MIN_EPOCHS = 10
+DEFAULT_FOLDS = 3
+DEFAULT_SEED = 42
+
+# Discrete choices are sampled uniformly, (low, high) ranges log-uniformly for
+# the learning rate and uniformly otherwise
+SEARCH_SPACE = {
+    'units': [(8, 4), (16, 8), (32, 16), (32, 8), (64, 32), (64, 16)],
+    'dropout_1': (0.0, 0.5),
+    'dropout_2': (0.0, 0.5),
+    'learning_rate': (1e-4, 1e-2),
+    'batch_size': [16, 25, 32, 64],
+}
+
+
+def sample_config(rng, space=SEARCH_SPACE):
+    """One configuration in :func:`~heart_failure.training.fit_ann` keywords."""
+    low, high = space['learning_rate']
+    return {
+        'units': list(space['units'][rng.integers(len(space['units']))]),
+        'dropout': [round(float(rng.uniform(*space['dropout_1'])), 2),
+                    round(float(rng.uniform(*space['dropout_2'])), 2)],
+        'learning_rate': float(np.exp(rng.uniform(np.log(low), np.log(high)))),
+        'batch_size': int(space['batch_size'][rng.integers(len(space['batch_size']))]),
+    }
+
+
+def rung_budgets(min_epochs=DEFAULT_MIN_EPOCHS, max_epochs=ANN_DEFAULTS['epochs'], eta=DEFAULT_ETA):
+    """Epoch budget of every rung: ``min_epochs * eta**i``, the last one ``max_epochs``."""
+    budgets = []
+    epochs = min_epochs
+    while epochs < max_epochs:
+        budgets.append(int(epochs))
+        epochs *= eta
+    return budgets + [max_epochs]
+
+
+# ======================== WORKERS ========================
+
+def _init_worker(cores):
+    """Pin this worker to the next free core, then cap every thread pool at one."""
+    core = cores.get()
+    if core is not None and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {core})
+    _limit_threads()
+    # Keep TensorFlow's start-up banner out of the job's output
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+
+def _run_trial_fold(task):
+    """Fit one configuration on one fold's training rows for ``epochs``; score its test rows.
+
+    Early stopping watches a stratified quarter of the training rows (the
+    notebook's ``validation_split``), so the test rows are used only for
+    the score the trial is ranked by.
+    """
+    from sklearn.model_selection import train_test_split
+
+    trial, fold, config, epochs, directory, seed = task
+    X = np.load(os.path.join(directory, 'X.npy'), mmap_mode='r')[fold]
+    y = np.load(os.path.join(directory, 'y.npy'), mmap_mode='r')
+    test = np.load(os.path.join(directory, 'fold_id.npy'), mmap_mode='r') == fold
+
+    start = time.perf_counter()
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        np.asarray(X[~test]), np.asarray(y[~test]), test_size=ANN_DEFAULTS['validation_split'],
+        stratify=np.asarray(y[~test]), random_state=seed,
+    )
+    X_test, y_test = np.asarray(X[test]), np.asarray(y[test])
+    model, curves = fit_ann(X_fit, y_fit, seed=seed, validation_data=(X_val, y_val),
+                            epochs=epochs, **config)
+    scores = model.predict(X_test, verbose=0)[:, 0].astype(np.float64)
+    return trial, fold, {
+        'roc_auc': float(threshold_curves(y_test, scores)['roc_auc']),
+        'val_loss': float(np.min(curves['val_loss'])),
+        'epochs_run': int(len(curves['loss'])),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _worker_cores(workers):
+    """Cores to pin ``workers`` processes to; None entries leave a worker unpinned."""
+    if not hasattr(os, 'sched_getaffinity'):
+        return [None] * workers
+    cores = sorted(os.sched_getaffinity(0))
+    return [cores[i % len(cores)] for i in range(workers)]
+
+
+# ======================== SEARCH ========================
+
+def successive_halving(X, y, n_trials=DEFAULT_TRIALS, eta=DEFAULT_ETA, min_epochs=DEFAULT_MIN_EPOCHS,
+                       max_epochs=ANN_DEFAULTS['epochs'], n_folds=DEFAULT_FOLDS, workers=None,
+                       seed=DEFAULT_SEED, log=print):
+    """Search :data:`SEARCH_SPACE`; returns a report with every rung and the best configuration.
+
+    Trials are ranked by mean test-fold ROC AUC, ties by the mean
+    validation loss early stopping saw.
+    """
+    import multiprocessing
+
+    workers = workers or os.cpu_count() or 1
+    rng = np.random.default_rng(seed)
+    configs = [sample_config(rng) for _ in range(n_trials)]
+    budgets = rung_budgets(min_epochs, max_epochs, eta)
+    directory = tempfile.mkdtemp(prefix='heart_failure_tuning_')
+    rungs = []
+    survivors = list(range(n_trials))
+    start = time.perf_counter()
+    try:
+        prepare_folds(X, y, n_folds, seed, directory)
+        # Workers are spawned rather than forked so TensorFlow starts cleanly in each
+        context = multiprocessing.get_context('spawn')
+        cores = context.Queue()
+        for core in _worker_cores(workers):
+            cores.put(core)
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(cores,)) as executor:
+            for rung, epochs in enumerate(budgets):
+                rung_start = time.perf_counter()
+                # Seeds depend only on (trial, fold), so a survivor replays its earlier fits
+                tasks = [(trial, fold, configs[trial], epochs, directory, seed + 1000 * trial + fold)
+                         for trial in survivors for fold in range(n_folds)]
+                by_trial = {}
+                for trial, _, result in executor.map(_run_trial_fold, tasks):
+                    by_trial.setdefault(trial, []).append(result)
+                scores = {
+                    trial: {
+                        'roc_auc': float(np.mean([r['roc_auc'] for r in results])),
+                        'val_loss': float(np.mean([r['val_loss'] for r in results])),
+                        'epochs_run': float(np.mean([r['epochs_run'] for r in results])),
+                    }
+                    for trial, results in by_trial.items()
+                }
+                ranked = sorted(survivors, key=lambda t: (-scores[t]['roc_auc'], scores[t]['val_loss']))
+                keep = ranked[:max(1, math.floor(len(ranked) / eta))] if rung < len(budgets) - 1 else ranked[:1]
+                rungs.append({
+                    'epochs': epochs,
+                    'seconds': time.perf_counter() - rung_start,
+                    'trials': [dict(scores[t], trial=t) for t in ranked],
+                    'promoted': keep,
+                })
+                log(f"rung {rung}: {len(survivors)} trials x {epochs} epochs, "
+                    f"best AUC {scores[ranked[0]]['roc_auc']:.3f} (trial {ranked[0]}), "
+                    f"{rungs[-1]['seconds']:.1f} s")
+                survivors = keep
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    best = survivors[0]
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'n_trials': n_trials,
+        'eta': eta,
+        'budgets': budgets,
+        'n_folds': n_folds,
+        'n_rows': int(len(y)),
+        'seed': seed,
+        'workers': workers,
+        'elapsed_seconds': time.perf_counter() - start,
+        'configs': configs,
+        'rungs': rungs,
+        'best_trial': best,
+        'best_config': dict(configs[best], epochs=budgets[-1]),
+        'best_score': rungs[-1]['trials'][0],
+    }
+
+
+def train_best(report, dataset_path=DATASET_PATH, model_path=TUNED_MODEL_PATH,
+               bundle_path=BUNDLE_PATH, seed=DEFAULT_SEED):
+    """Retrain the best configuration on the whole dataset and save it as the bundle.
+
+    The recipe is the notebook's: features scaled with the full-dataset
+    scaler, last quarter held out for early stopping.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(dataset_path)
+    mean, scale = reference_scaler(dataset_path)
+    X = (df[FEATURE_COLUMNS].to_numpy(dtype=np.float64) - mean) / scale
+    model, _ = fit_ann(X, df[TARGET_COLUMN].to_numpy(), seed=seed, **report['best_config'])
+    model.save(os.fspath(model_path))
+
+    bundle = build_bundle(model_path, dataset_path)
+    bundle.metadata['hyperparameters'] = report['best_config']
+    bundle.metadata['tuning'] = {
+        'created': report['created'],
+        'roc_auc': report['best_score']['roc_auc'],
+        'n_trials': report['n_trials'],
+        'n_folds': report['n_folds'],
+        'budgets': report['budgets'],
+    }
+    return save_bundle(bundle, bundle_path)
+
+
+def main(argv=None):
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Successive-halving search over the ANN's hyperparameters")
+    parser.add_argument('--data', default=str(DATASET_PATH), help="CSV with features and DEATH_EVENT")
+    parser.add_argument('--trials', type=int, default=DEFAULT_TRIALS)
+    parser.add_argument('--eta', type=int, default=DEFAULT_ETA, help="Keep 1/eta of the trials per rung")
+    parser.add_argument('--min-epochs', type=int, default=DEFAULT_MIN_EPOCHS)
+    parser.add_argument('--max-epochs', type=int, default=ANN_DEFAULTS['epochs'])
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('-o', '--output', default=str(TUNING_RESULTS_PATH), help="Search report (JSON)")
+    parser.add_argument('--bundle', default=str(BUNDLE_PATH), help="Bundle to write the retrained best model to")
+    parser.add_argument('--model-output', default=str(TUNED_MODEL_PATH),
+                        help="Keras file of the retrained best model")
+    parser.add_argument('--no-bundle', action='store_true', help="Only write the report")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.data)
+    report = successive_halving(
+        df[FEATURE_COLUMNS].to_numpy(), df[TARGET_COLUMN].to_numpy(),
+        args.trials, args.eta, args.min_epochs, args.max_epochs, args.folds, args.workers, args.seed,
+    )
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    best = report['best_config']
+    print(f"best trial {report['best_trial']}: AUC {report['best_score']['roc_auc']:.3f} with "
+          f"units={best['units']} dropout={best['dropout']} lr={best['learning_rate']:.2g} "
+          f"batch_size={best['batch_size']} ({report['elapsed_seconds']:.1f} s, "
+          f"{report['workers']} workers) -> {args.output}")
+
+    if not args.no_bundle:
+        bundle = train_best(report, args.data, args.model_output, args.bundle, args.seed)
+        print(f"wrote {args.bundle} (version {bundle.version})")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,159 @@
+"""Vectorized validation of patient records before batch scoring.
+
+Every feature column is checked once over the whole frame with boolean
+masks: non-numeric values, missing values, and values outside the accepted
+range (or not 0/1 for the flags). The masks are OR-ed in place into one
+row mask, and error text is only built for the failing rows.
+
+Missing columns are a schema error for the whole file and raise
+:class:`SchemaError` before any row is read.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from heart_failure.model import FEATURE_COLUMNS
+
+# The single-patient form's input bounds; platelets is widened to cover
+# every record in the bundled training data (25,100-850,000).
+VALID_RANGES = {
+    'age': (20, 100),
+    'anaemia': (0, 1),
+    'creatinine_phosphokinase': (0, 10_000),
+    'diabetes': (0, 1),
+    'ejection_fraction': (10, 80),
+    'high_blood_pressure': (0, 1),
+    'platelets': (25_000, 850_000),
+    'serum_creatinine': (0, 10),
+    'serum_sodium': (100, 150),
+    'sex': (0, 1),
+    'smoking': (0, 1),
+    'time': (1, 365),
+}
+FLAG_COLUMNS = ['anaemia', 'diabetes', 'high_blood_pressure', 'sex', 'smoking']
+ROW_COLUMN = 'Row'
+ERROR_COLUMN = 'Validation_Errors'
+
+
+class SchemaError(ValueError):
+    """The file cannot be validated row by row, e.g. a required column is missing."""
+
+
+class Validation(NamedTuple):
+    """Per-row outcome of :func:`validate_frame`."""
+    invalid: np.ndarray     # True where any feature failed
+    reasons: list           # per column: (missing, non-numeric, out-of-range) masks or None
+
+    @property
+    def valid(self):
+        return ~self.invalid
+
+    @property
+    def n_invalid(self):
+        return int(np.count_nonzero(self.invalid))
+
+
+def check_schema(columns):
+    missing = [c for c in FEATURE_COLUMNS if c not in columns]
+    if missing:
+        raise SchemaError(f"Missing required columns: {', '.join(missing)}")
+
+
+def _numeric(series):
+    """``(values, missing, non_numeric)`` for one column; masks are None when impossible.
+
+    NumPy-typed numeric columns are checked in place without a copy.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iub':
+        return series.to_numpy(), None, None
+    if isinstance(dtype, np.dtype) and dtype.kind == 'f':
+        values = series.to_numpy()
+        return values, np.isnan(values), None
+    missing = series.isna().to_numpy()
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return values, missing, np.isnan(values) & ~missing
+
+
+def validate_frame(frame):
+    """Check every feature of every row of ``frame`` in one pass per column."""
+    check_schema(frame.columns)
+    invalid = np.zeros(len(frame), dtype=bool)
+    reasons = []
+    for column in FEATURE_COLUMNS:
+        values, missing, non_numeric = _numeric(frame[column])
+        low, high = VALID_RANGES[column]
+        # NaN compares False, so missing values are not also counted as out of range
+        out_of_range = (values < low) | (values > high)
+        if column in FLAG_COLUMNS and values.dtype.kind == 'f':
+            out_of_range |= values != np.round(values)
+        for mask in (out_of_range, missing, non_numeric):
+            if mask is not None:
+                np.logical_or(invalid, mask, out=invalid)
+        reasons.append((missing, non_numeric, out_of_range))
+    return Validation(invalid, reasons)
+
+
+def _describe(column):
+    low, high = VALID_RANGES[column]
+    if column in FLAG_COLUMNS:
+        return f"{column}: must be 0 or 1"
+    return f"{column}: outside {low:,}-{high:,}"
+
+
+def matrix_errors(X):
+    """``{row: reasons}`` for the invalid rows of an ``(N, 12)`` float matrix.
+
+    The checks of :func:`validate_frame` for input that is already numeric
+    (NaN counts as missing), without building a DataFrame.
+    """
+    low = np.array([VALID_RANGES[column][0] for column in FEATURE_COLUMNS])
+    high = np.array([VALID_RANGES[column][1] for column in FEATURE_COLUMNS])
+    flags = np.isin(FEATURE_COLUMNS, FLAG_COLUMNS)
+    missing, infinite = np.isnan(X), np.isinf(X)
+    out_of_range = ~infinite & ((X < low) | (X > high) | (flags & (X != np.round(X))))
+    errors = {}
+    for row in np.flatnonzero((missing | infinite | out_of_range).any(axis=1)):
+        reasons = []
+        for j, column in enumerate(FEATURE_COLUMNS):
+            if missing[row, j]:
+                reasons.append(f"{column}: missing")
+            elif infinite[row, j]:
+                reasons.append(f"{column}: not a finite number")
+            elif out_of_range[row, j]:
+                reasons.append(_describe(column))
+        errors[int(row)] = '; '.join(reasons)
+    return errors
+
+
+def error_report(frame, validation, row_offset=0):
+    """The invalid rows of ``frame`` with their 1-based input row and reasons."""
+    rows = np.flatnonzero(validation.invalid)
+    report = frame.iloc[rows].copy()
+    messages = pd.Series('', index=report.index, dtype=object)
+    for column, (missing, non_numeric, out_of_range) in zip(FEATURE_COLUMNS, validation.reasons):
+        for mask, text in ((missing, f"{column}: missing"), (non_numeric, f"{column}: not a number"),
+                           (out_of_range, _describe(column))):
+            if mask is None:
+                continue
+            hit = mask[rows]
+            if hit.any():
+                messages[hit] += text + '; '
+    report.insert(0, ROW_COLUMN, rows + row_offset + 1)
+    report[ERROR_COLUMN] = messages.str.rstrip('; ')
+    return report
+
+
+def split_valid(frame, row_offset=0):
+    """``(valid_rows, error_report)`` for one chunk; valid rows keep their dtypes."""
+    validation = validate_frame(frame)
+    if validation.n_invalid == 0:
+        return frame, None
+    valid = frame.loc[validation.valid]
+    for column in FEATURE_COLUMNS:
+        # A column that needed coercion is numeric once its bad rows are gone
+        if valid[column].dtype.kind not in 'iufb':
+            valid = valid.assign(**{column: pd.to_numeric(valid[column]).astype(np.float32)})
+    return valid, error_report(frame, validation, row_offset)
@@ -0,0 +1,140 @@
+"""What-if analysis around one patient.
+
+:func:`sensitivity_grid` varies two features over a dense grid while the
+other ten stay at the patient's values. :func:`partial_dependence` varies
+every feature on its own. Both build the whole input matrix up front
+(70 x 100 = 7,000 rows for a grid, 12 x 50 for the curves) and score it
+with one ``predict_proba`` call, so a panel costs two batched inferences
+instead of one rerun per slider position.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from heart_failure.attribution import FEATURE_LABELS
+from heart_failure.model import FEATURE_COLUMNS
+from heart_failure.validation import FLAG_COLUMNS, VALID_RANGES
+
+GRID_SHAPE = (70, 100)   # (y points, x points)
+CURVE_POINTS = 50
+
+
+class SensitivityGrid(NamedTuple):
+    """Risk over a 2-D grid; ``probabilities[i, j]`` is at ``(x_values[j], y_values[i])``."""
+    x_feature: str
+    y_feature: str
+    x_values: np.ndarray
+    y_values: np.ndarray
+    probabilities: np.ndarray
+
+
+def feature_values(column, points):
+    """``points`` evenly spaced values over ``column``'s accepted range; 0 and 1 for flags."""
+    if column in FLAG_COLUMNS:
+        return np.array([0.0, 1.0])
+    low, high = VALID_RANGES[column]
+    return np.linspace(low, high, points)
+
+
+def _base_row(features):
+    return np.array([float(features[column]) for column in FEATURE_COLUMNS])
+
+
+def sensitivity_grid(model, features, x_feature, y_feature, shape=GRID_SHAPE):
+    """Score the patient ``features`` with ``x_feature``/``y_feature`` swept over a grid."""
+    if x_feature == y_feature:
+        raise ValueError("Choose two different features")
+    x_values = feature_values(x_feature, shape[1])
+    y_values = feature_values(y_feature, shape[0])
+    X = np.tile(_base_row(features), (len(y_values) * len(x_values), 1))
+    X[:, FEATURE_COLUMNS.index(x_feature)] = np.tile(x_values, len(y_values))
+    X[:, FEATURE_COLUMNS.index(y_feature)] = np.repeat(y_values, len(x_values))
+    probabilities = np.asarray(model.predict_proba(X), dtype=np.float64)
+    return SensitivityGrid(x_feature, y_feature, x_values, y_values,
+                           probabilities.reshape(len(y_values), len(x_values)))
+
+
+def partial_dependence(model, features, points=CURVE_POINTS):
+    """``{column: (values, probabilities)}`` with each feature varied alone, in one call."""
+    base = _base_row(features)
+    sweeps = [(j, feature_values(column, points)) for j, column in enumerate(FEATURE_COLUMNS)]
+    X = np.tile(base, (sum(len(values) for _, values in sweeps), 1))
+    start = 0
+    for j, values in sweeps:
+        X[start:start + len(values), j] = values
+        start += len(values)
+    probabilities = np.asarray(model.predict_proba(X), dtype=np.float64)
+
+    curves = {}
+    start = 0
+    for j, values in sweeps:
+        curves[FEATURE_COLUMNS[j]] = (values, probabilities[start:start + len(values)])
+        start += len(values)
+    return curves
+
+
+# ======================== FIGURES ========================
+
+def sensitivity_figure(grid, features):
+    """Contour plot of risk (%) over the grid, with the patient marked."""
+    import plotly.graph_objects as go
+
+    x_label, y_label = FEATURE_LABELS[grid.x_feature], FEATURE_LABELS[grid.y_feature]
+    fig = go.Figure(go.Contour(
+        x=grid.x_values,
+        y=grid.y_values,
+        z=grid.probabilities * 100,
+        colorscale='RdYlGn_r',
+        zmin=0,
+        zmax=100,
+        contours=dict(showlabels=True, labelfont=dict(color='white')),
+        colorbar=dict(title='Risk %'),
+        hovertemplate=f"{x_label}: %{{x}}<br>{y_label}: %{{y}}<br>Risk: %{{z:.1f}}%<extra></extra>",
+    ))
+    fig.add_trace(go.Scatter(
+        x=[features[grid.x_feature]],
+        y=[features[grid.y_feature]],
+        mode='markers',
+        marker=dict(symbol='x', size=14, color='black'),
+        name='This patient',
+    ))
+    fig.update_layout(
+        title=f"Risk as {x_label} and {y_label} Change",
+        xaxis_title=x_label,
+        yaxis_title=y_label,
+        height=500,
+        showlegend=False,
+    )
+    return fig
+
+
+def dependence_figure(curves, features, probability, columns=4):
+    """One small risk curve per feature, with the patient's current value marked."""
+    from plotly.subplots import make_subplots
+    import plotly.graph_objects as go
+
+    names = list(curves)
+    rows = -(-len(names) // columns)
+    fig = make_subplots(rows=rows, cols=columns, subplot_titles=[FEATURE_LABELS[n] for n in names],
+                        vertical_spacing=0.12, horizontal_spacing=0.06)
+    for i, name in enumerate(names):
+        values, probabilities = curves[name]
+        row, col = i // columns + 1, i % columns + 1
+        fig.add_trace(go.Scatter(
+            x=values, y=probabilities * 100, mode='lines' if len(values) > 2 else 'lines+markers',
+            line=dict(color='#667eea'), hovertemplate="%{x}: %{y:.1f}%<extra></extra>",
+        ), row=row, col=col)
+        fig.add_trace(go.Scatter(
+            x=[features[name]], y=[probability * 100], mode='markers',
+            marker=dict(color='#FF6B6B', size=8), hoverinfo='skip',
+        ), row=row, col=col)
+    fig.update_yaxes(range=[0, 100])
+    fig.update_layout(
+        title="Risk (%) as Each Feature Changes Alone",
+        height=220 * rows + 80,
+        showlegend=False,
+        plot_bgcolor='white',
+        margin=dict(t=90),
+    )
+    return fig